@@ -19,17 +19,19 @@ from trivia_api.config import get_settings
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. Skipped when the app runs migrations
+# in-process so its own logging configuration is kept.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-from trivia_api.schemas import TriviaSessionORM, AttemptRecordORM, UserScoreORM
+from trivia_api.schemas import TriviaSessionORM, AttemptRecordORM, UserScoreORM, LeaderboardSnapshotORM
 
 target_metadata = Base.metadata
 settings = get_settings()
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# The app passes each shard's URL when migrating in-process
+config.set_main_option("sqlalchemy.url", config.attributes.get("database_url", settings.DATABASE_URL))
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -0,0 +1,30 @@
+"""Unique attempt per session and user
+
+Revision ID: 5b1e7c9d3a42
+Revises: 22c4d80f2edf
+Create Date: 2026-10-19 09:00:00.000000
+
+Lets workers skip the duplicate-answer SELECT and rely on the index to reject
+answers recorded concurrently by another worker. Upgrading fails if the table
+already holds more than one attempt for a (session_id, username) pair; remove
+those rows first.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c9d3a42'
+down_revision: Union[str, None] = '22c4d80f2edf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('uq_attempt_records_session_username', 'attempt_records', ['session_id', 'username'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_attempt_records_session_username', table_name='attempt_records')
@@ -0,0 +1,77 @@
+"""Reference users by user_id in attempt_records
+
+Revision ID: 8d3f2a6b1c07
+Revises: 5b1e7c9d3a42
+Create Date: 2026-10-19 10:00:00.000000
+
+Replaces the repeated username string (and its index) with an integer
+foreign key to user_scores. Users that only ever answered incorrectly get a
+user_scores row with a zero score so every attempt can be backfilled.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f2a6b1c07'
+down_revision: Union[str, None] = '5b1e7c9d3a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every username in attempt_records needs a user_scores row
+    op.execute(
+        """
+        INSERT INTO user_scores (username, cumulative_score, last_updated)
+        SELECT a.username, 0, MAX(a.submitted_at)
+        FROM attempt_records a
+        WHERE NOT EXISTS (SELECT 1 FROM user_scores u WHERE u.username = a.username)
+        GROUP BY a.username
+        """
+    )
+
+    op.add_column('attempt_records', sa.Column('user_id', sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE attempt_records
+        SET user_id = (SELECT u.user_id FROM user_scores u WHERE u.username = attempt_records.username)
+        """
+    )
+
+    op.drop_index('uq_attempt_records_session_username', table_name='attempt_records')
+    op.drop_index(op.f('ix_attempt_records_username'), table_name='attempt_records')
+    op.drop_index(op.f('ix_attempt_records_session_id'), table_name='attempt_records')
+
+    with op.batch_alter_table('attempt_records') as batch_op:
+        batch_op.drop_column('username')
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_attempt_records_user_id', 'user_scores', ['user_id'], ['user_id'])
+
+    op.create_index(op.f('ix_attempt_records_user_id'), 'attempt_records', ['user_id'], unique=False)
+    op.create_index('uq_attempt_records_session_user', 'attempt_records', ['session_id', 'user_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_attempt_records_session_user', table_name='attempt_records')
+    op.drop_index(op.f('ix_attempt_records_user_id'), table_name='attempt_records')
+
+    op.add_column('attempt_records', sa.Column('username', sa.String(length=100), nullable=True))
+    op.execute(
+        """
+        UPDATE attempt_records
+        SET username = (SELECT u.username FROM user_scores u WHERE u.user_id = attempt_records.user_id)
+        """
+    )
+
+    with op.batch_alter_table('attempt_records') as batch_op:
+        batch_op.drop_constraint('fk_attempt_records_user_id', type_='foreignkey')
+        batch_op.drop_column('user_id')
+        batch_op.alter_column('username', existing_type=sa.String(length=100), nullable=False)
+
+    op.create_index(op.f('ix_attempt_records_session_id'), 'attempt_records', ['session_id'], unique=False)
+    op.create_index(op.f('ix_attempt_records_username'), 'attempt_records', ['username'], unique=False)
+    op.create_index('uq_attempt_records_session_username', 'attempt_records', ['session_id', 'username'], unique=True)
@@ -0,0 +1,29 @@
+"""Add user_scores ranking index
+
+Revision ID: a7c3e9f2b614
+Revises: f1d6b3a8e925
+Create Date: 2026-10-19 14:00:00.000000
+
+Composite (cumulative_score, first_correct_timestamp) index in leaderboard
+order, so batch rank lookups count users per score and within a tie with
+index range scans instead of scanning the table.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9f2b614'
+down_revision: Union[str, None] = 'f1d6b3a8e925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_scores_ranking', 'user_scores', ['cumulative_score', 'first_correct_timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_scores_ranking', table_name='user_scores')
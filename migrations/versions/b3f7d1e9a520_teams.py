@@ -0,0 +1,64 @@
+"""Add teams, team_members and team_scores
+
+Revision ID: b3f7d1e9a520
+Revises: a7c3e9f2b614
+Create Date: 2026-10-19 18:00:00.000000
+
+Team membership and incrementally maintained team scores for the team
+leaderboard. team_members and team_scores live next to user_scores (on the
+user shards); teams stays in the main database.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7d1e9a520'
+down_revision: Union[str, None] = 'a7c3e9f2b614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Timestamps are epoch microseconds on SQLite (see c41a9e7f5d28)
+    if op.get_bind().dialect.name == 'sqlite':
+        timestamp_type = sa.BigInteger()
+    else:
+        timestamp_type = sa.DateTime(timezone=True)
+
+    op.create_table(
+        'teams',
+        sa.Column('team_id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('created_at', timestamp_type, nullable=False),
+        sa.PrimaryKeyConstraint('team_id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_table(
+        'team_members',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user_scores.user_id'], ),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index('ix_team_members_team_id', 'team_members', ['team_id'], unique=False)
+    op.create_table(
+        'team_scores',
+        sa.Column('team_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('reached_at', timestamp_type, nullable=True),
+        sa.Column('member_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('team_id'),
+    )
+    op.create_index('ix_team_scores_ranking', 'team_scores', ['score', 'reached_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_team_scores_ranking', table_name='team_scores')
+    op.drop_table('team_scores')
+    op.drop_index('ix_team_members_team_id', table_name='team_members')
+    op.drop_table('team_members')
+    op.drop_table('teams')
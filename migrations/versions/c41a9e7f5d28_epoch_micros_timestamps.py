@@ -0,0 +1,83 @@
+"""Store timestamps as epoch microseconds on SQLite
+
+Revision ID: c41a9e7f5d28
+Revises: 8d3f2a6b1c07
+Create Date: 2026-10-19 11:00:00.000000
+
+SQLite stores DateTime as 26-character text. Timestamp columns become BIGINT
+microseconds since the Unix epoch (UTC), matching trivia_api.schemas.types.
+UTCDateTime. Other databases switch to TIMESTAMP WITH TIME ZONE instead.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a9e7f5d28'
+down_revision: Union[str, None] = '8d3f2a6b1c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = {
+    'trivia_sessions': [('started_at', False), ('ended_at', True)],
+    'attempt_records': [('submitted_at', False)],
+    'user_scores': [('first_correct_timestamp', True), ('last_updated', False)],
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        for table, columns in TIMESTAMP_COLUMNS.items():
+            for column, nullable in columns:
+                op.alter_column(
+                    table, column,
+                    existing_type=sa.DateTime(), type_=sa.DateTime(timezone=True),
+                    existing_nullable=nullable,
+                    postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                )
+        return
+
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        for column, _nullable in columns:
+            # 'YYYY-MM-DD HH:MM:SS.ffffff' (UTC) -> whole seconds * 1e6 + microseconds
+            op.execute(
+                f"UPDATE {table} SET {column} = "
+                f"CAST(strftime('%s', {column}) AS INTEGER) * 1000000 "
+                f"+ CAST(substr({column}, 21, 6) AS INTEGER) "
+                f"WHERE typeof({column}) = 'text'"
+            )
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(
+                    column, existing_type=sa.DateTime(), type_=sa.BigInteger(), existing_nullable=nullable
+                )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        for table, columns in TIMESTAMP_COLUMNS.items():
+            for column, nullable in columns:
+                op.alter_column(
+                    table, column,
+                    existing_type=sa.DateTime(timezone=True), type_=sa.DateTime(),
+                    existing_nullable=nullable,
+                    postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                )
+        return
+
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(
+                    column, existing_type=sa.BigInteger(), type_=sa.DateTime(), existing_nullable=nullable
+                )
+        for column, _nullable in columns:
+            op.execute(
+                f"UPDATE {table} SET {column} = "
+                f"strftime('%Y-%m-%d %H:%M:%S', {column} / 1000000, 'unixepoch') "
+                f"|| '.' || printf('%06d', {column} % 1000000) "
+                f"WHERE typeof({column}) = 'integer'"
+            )
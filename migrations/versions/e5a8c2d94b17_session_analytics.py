@@ -0,0 +1,31 @@
+"""Add analytics to trivia_sessions
+
+Revision ID: e5a8c2d94b17
+Revises: c41a9e7f5d28
+Create Date: 2026-10-19 12:30:00.000000
+
+Stores the answer analytics summary (wrong-answer top-K, per-second counts,
+correct ratio) captured when a session ends.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a8c2d94b17'
+down_revision: Union[str, None] = 'c41a9e7f5d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('trivia_sessions') as batch_op:
+        batch_op.add_column(sa.Column('analytics', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('trivia_sessions') as batch_op:
+        batch_op.drop_column('analytics')
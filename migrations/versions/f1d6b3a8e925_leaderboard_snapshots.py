@@ -0,0 +1,47 @@
+"""Add leaderboard_snapshots
+
+Revision ID: f1d6b3a8e925
+Revises: e5a8c2d94b17
+Create Date: 2026-10-19 13:00:00.000000
+
+One row per ended session holding packed arrays of user keys, ranks and the
+ranks from the previous snapshot, for rank-movement lookups.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1d6b3a8e925'
+down_revision: Union[str, None] = 'e5a8c2d94b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Timestamps are epoch microseconds on SQLite (see c41a9e7f5d28)
+    if op.get_bind().dialect.name == 'sqlite':
+        timestamp_type = sa.BigInteger()
+    else:
+        timestamp_type = sa.DateTime(timezone=True)
+
+    op.create_table(
+        'leaderboard_snapshots',
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('captured_at', timestamp_type, nullable=False),
+        sa.Column('user_count', sa.Integer(), nullable=False),
+        sa.Column('user_keys', sa.LargeBinary(), nullable=False),
+        sa.Column('ranks', sa.LargeBinary(), nullable=False),
+        sa.Column('previous_ranks', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['trivia_sessions.session_id'], ),
+        sa.PrimaryKeyConstraint('session_id'),
+    )
+    op.create_index('ix_leaderboard_snapshots_captured_at', 'leaderboard_snapshots', ['captured_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leaderboard_snapshots_captured_at', table_name='leaderboard_snapshots')
+    op.drop_table('leaderboard_snapshots')
@@ -0,0 +1,5 @@
+"""Trivia API package."""
+import time
+
+# Reference point for measuring application import time at startup
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,38 @@
+"""Answer analytics API endpoints."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from trivia_api.database import get_db
+from trivia_api.errors import TriviaAPIException
+from trivia_api.models.analytics import SessionAnalyticsResponse
+from trivia_api.services.session_service import SessionService
+from trivia_api.utils.auth import require_admin_scope
+
+router = APIRouter(prefix="/api/trivia", tags=["Analytics"])
+
+
+@router.get(
+    "/analytics",
+    response_model=SessionAnalyticsResponse,
+    dependencies=[Depends(require_admin_scope("analytics"))],
+)
+async def get_session_analytics(
+    session_id: Optional[str] = Query(None, description="Session to report on (default: active session)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get answer analytics for a session: most common wrong answers, answers per
+    second and the correct ratio.
+
+    Live for the active session (as seen by the worker serving the request);
+    ended sessions return the analytics stored when they ended.
+    Requires an admin key with the "analytics" scope via X-API-Key header.
+    """
+    try:
+        analytics = SessionService.get_session_analytics(db, session_id)
+
+        return SessionAnalyticsResponse(status="success", **analytics)
+    except TriviaAPIException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
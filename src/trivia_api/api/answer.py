@@ -1,12 +1,21 @@
 """Answer submission API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-from trivia_api.database import get_db
+from trivia_api.database import get_db, remember_write
 from trivia_api.errors import TriviaAPIException
-from trivia_api.models.answer import AnswerSubmitRequest, AnswerResponse
+from trivia_api.models.answer import (
+    AnswerBatchRequest,
+    AnswerBatchResponse,
+    AnswerBatchResult,
+    AnswerResponse,
+    AnswerSubmitRequest,
+)
 from trivia_api.services.answer_service import AnswerService
-from trivia_api.services.user_score_service import UserScoreService
+from trivia_api.utils.idempotency import get_answer_idempotency
+from trivia_api.utils.rate_limit import get_answer_rate_limiter, get_client_ip
 
 router = APIRouter(prefix="/api/trivia", tags=["Answer Submission"])
 
@@ -14,27 +23,134 @@ router = APIRouter(prefix="/api/trivia", tags=["Answer Submission"])
 @router.post("/answer", response_model=AnswerResponse)
 async def submit_answer(
     request: AnswerSubmitRequest,
+    http_request: Request,
+    response: Response,
     db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
 ):
     """
     Submit an answer to the current active question.
 
     Returns immediate feedback with correctness and updated score if correct.
+    Rate limited per username and client IP when RATE_LIMIT_ENABLED is set.
+    Retries sending the same Idempotency-Key get the original result back.
     """
+    idempotency = get_answer_idempotency() if idempotency_key else None
     try:
-        result = AnswerService.submit_answer(db, request.username, request.answer)
+        if idempotency is not None:
+            # Replays skip rate limiting and all database work
+            original = idempotency.begin(idempotency_key, request.username, request.answer)
+            if original is not None:
+                return AnswerResponse(status="success", **original)
+
+        try:
+            # Reject floods before any database work
+            limiter = get_answer_rate_limiter()
+            if limiter is not None:
+                limiter.check(request.username, get_client_ip(http_request))
+
+            # Records the attempt and, if correct, increments the score
+            result = AnswerService.submit_answer(db, request.username, request.answer)
+        except BaseException:
+            # Nothing was recorded for this key; let the client retry it
+            if idempotency is not None:
+                idempotency.release(idempotency_key, request.username)
+            raise
 
-        # If answer was correct, increment score
-        score = None
-        if result["is_correct"]:
-            user_score = UserScoreService.increment_score(db, request.username)
-            score = user_score.cumulative_score
+        if idempotency is not None:
+            idempotency.complete(idempotency_key, request.username, request.answer, result)
+        remember_write(response)
 
         return AnswerResponse(
             status="success",
             is_correct=result["is_correct"],
             message=result["message"],
-            score=score,
+            score=result["score"],
         )
     except TriviaAPIException as e:
-        raise HTTPException(status_code=e.status_code, detail=e.message)
+        raise HTTPException(status_code=e.status_code, detail=e.message, headers=e.headers)
+
+
+def _rejected(error: TriviaAPIException) -> AnswerBatchResult:
+    retry_after = (error.headers or {}).get("Retry-After")
+    return AnswerBatchResult(
+        status="error",
+        status_code=error.status_code,
+        message=error.message,
+        retry_after=int(retry_after) if retry_after is not None else None,
+    )
+
+
+def _admit(item, idempotency, limiter, client_ip: Optional[str]) -> Optional[AnswerBatchResult]:
+    """Replay or rate-limit one batch item; None when it should be submitted."""
+    keyed = idempotency is not None and bool(item.idempotency_key)
+    if keyed:
+        try:
+            original = idempotency.begin(item.idempotency_key, item.username, item.answer)
+        except TriviaAPIException as e:
+            return _rejected(e)
+        if original is not None:
+            return AnswerBatchResult(status="success", status_code=200, **original)
+    if limiter is not None:
+        try:
+            limiter.check(item.username, client_ip)
+        except TriviaAPIException as e:
+            # Nothing was recorded for this key; let the client retry it
+            if keyed:
+                idempotency.release(item.idempotency_key, item.username)
+            return _rejected(e)
+    return None
+
+
+def _settle_keys(idempotency, items: list, outcomes: list) -> None:
+    """Store submitted items' results under their keys; release keys without one."""
+    if idempotency is None:
+        return
+    for item, outcome in zip(items, outcomes, strict=True):
+        if not item.idempotency_key:
+            continue
+        if isinstance(outcome, dict):
+            idempotency.complete(item.idempotency_key, item.username, item.answer, outcome)
+        else:
+            idempotency.release(item.idempotency_key, item.username)
+
+
+@router.post("/answers", response_model=AnswerBatchResponse)
+async def submit_answers(
+    request: AnswerBatchRequest,
+    http_request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    """
+    Submit up to 100 answers at once, e.g. from a bot relaying many players.
+
+    Each answer gets its own result, with the status code the single-answer
+    endpoint would have returned; rejected answers do not affect the others.
+    Accepted answers are committed together. Rate limits and per-answer
+    idempotency keys apply as for single answers.
+    """
+    idempotency = get_answer_idempotency()
+    limiter = get_answer_rate_limiter()
+    client_ip = get_client_ip(http_request)
+    results: list = [_admit(item, idempotency, limiter, client_ip) for item in request.answers]
+
+    pending = [index for index, result in enumerate(results) if result is None]
+    items = [request.answers[index] for index in pending]
+    outcomes: list = [None] * len(pending)
+    try:
+        outcomes = AnswerService.submit_answers(db, [(item.username, item.answer) for item in items])
+    finally:
+        # Claimed keys without a stored result can be retried
+        _settle_keys(idempotency, items, outcomes)
+
+    for index, outcome in zip(pending, outcomes, strict=True):
+        if isinstance(outcome, TriviaAPIException):
+            results[index] = _rejected(outcome)
+        else:
+            results[index] = AnswerBatchResult(status="success", status_code=200, **outcome)
+
+    if any(isinstance(outcome, dict) for outcome in outcomes):
+        remember_write(response)
+
+    return AnswerBatchResponse(status="success", results=results)
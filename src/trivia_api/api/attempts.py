@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from trivia_api.database import get_db
+from trivia_api.database import get_read_db, release_connections
 from trivia_api.models.attempt import AttemptsResponse
 from trivia_api.services.attempt_service import AttemptService
 
@@ -10,16 +10,19 @@ router = APIRouter(prefix="/api/trivia", tags=["Attempt History"])
 
 
 @router.get("/attempts", response_model=AttemptsResponse)
-async def get_all_attempts(db: Session = Depends(get_db)):
+async def get_all_attempts(db: Session = Depends(get_read_db)):
     """
     Retrieve all answer attempts across all sessions.
 
     Attempts are ordered chronologically (most recent first).
     Includes username, correctness status, and ISO 8601 timestamp.
     """
-    attempts = AttemptService.get_all_attempts(db)
+    try:
+        attempts = AttemptService.get_all_attempts(db)
 
-    return AttemptsResponse(
-        status="success",
-        attempts=attempts,
-    )
+        return AttemptsResponse(
+            status="success",
+            attempts=attempts,
+        )
+    finally:
+        release_connections(db)
@@ -0,0 +1,45 @@
+"""Bulk export API endpoints."""
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+
+from trivia_api.errors import TriviaAPIException
+from trivia_api.services.export_service import ExportService
+from trivia_api.utils.auth import require_admin_scope
+
+router = APIRouter(prefix="/api/trivia", tags=["Export"])
+
+
+@router.get(
+    "/export/{table}",
+    response_class=StreamingResponse,
+    dependencies=[Depends(require_admin_scope("export"))],
+)
+async def export_table(
+    table: Literal["attempts", "scores", "sessions"] = Path(description="Table to export"),
+    format: Literal["csv", "parquet"] = Query("csv", description="Output format"),
+    gzip: bool = Query(False, description="Gzip-compress CSV output"),
+    since: Optional[datetime] = Query(None, description="Only rows at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only rows before this time"),
+    session_id: Optional[str] = Query(None, description="Only rows for this session"),
+):
+    """
+    Stream a table as CSV or Parquet for offline analysis.
+
+    Rows are fetched and encoded in batches, so exports of any size run in
+    bounded memory. Time filters apply to submitted_at (attempts),
+    last_updated (scores) or started_at (sessions).
+    Requires an admin key with the "export" scope via X-API-Key header.
+    """
+    try:
+        stream = ExportService.export(table, format, gzip, since, until, session_id)
+    except TriviaAPIException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message, headers=e.headers)
+
+    return StreamingResponse(
+        stream,
+        media_type=stream.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{stream.filename}"'},
+    )
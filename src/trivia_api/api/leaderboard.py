@@ -1,19 +1,32 @@
 """Leaderboard API endpoints."""
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
-from trivia_api.database import get_db
-from trivia_api.models.leaderboard import LeaderboardResponse
+from trivia_api.database import get_read_db, last_write_time, release_connections
+from trivia_api.errors import TriviaAPIException
+from trivia_api.models.leaderboard import (
+    LeaderboardResponse,
+    RankLookupRequest,
+    RankLookupResponse,
+    RankMovementResponse,
+)
 from trivia_api.services.leaderboard_service import LeaderboardService
+from trivia_api.models.team import TeamLeaderboardResponse
+from trivia_api.services.rank_snapshot_service import RankSnapshotService
+from trivia_api.services.shared_leaderboard import get_shared_leaderboard
+from trivia_api.services.team_service import TeamService
 
 router = APIRouter(prefix="/api/trivia", tags=["Leaderboard"])
 
 
 @router.get("/leaderboard", response_model=LeaderboardResponse)
 async def get_leaderboard(
+    request: Request,
     limit: int = Query(10, ge=1, le=100, description="Maximum entries to return"),
     offset: int = Query(0, ge=0, description="Number of entries to skip"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Retrieve the leaderboard with top scorers.
@@ -22,9 +35,82 @@ async def get_leaderboard(
     For users with identical scores, ordering is by earliest score acquisition timestamp (ascending).
     Supports pagination via limit and offset query parameters.
     """
-    leaderboard = LeaderboardService.get_leaderboard(db, limit=limit, offset=offset)
+    shared = get_shared_leaderboard()
+    if shared is not None:
+        page = shared.read_page(offset, limit, last_write_time(request))
+        if page is not None:
+            # Pre-encoded entries from the shared snapshot, passed through as-is
+            return Response(
+                b'{"status":"success","leaderboard":[' + page + b"]}",
+                media_type="application/json",
+            )
+
+    try:
+        leaderboard = LeaderboardService.get_leaderboard(db, limit=limit, offset=offset)
+
+        return LeaderboardResponse(
+            status="success",
+            leaderboard=leaderboard,
+        )
+    finally:
+        release_connections(db)
+
+
+@router.get("/leaderboard/teams", response_model=TeamLeaderboardResponse)
+async def get_team_leaderboard(
+    limit: int = Query(10, ge=1, le=100, description="Maximum entries to return"),
+    offset: int = Query(0, ge=0, description="Number of entries to skip"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Retrieve the team leaderboard.
+
+    Teams are ranked by the sum of their members' scores (descending); ties go
+    to the team that reached its score first. Team scores are maintained as
+    members answer, so no aggregation runs per request.
+    """
+    try:
+        leaderboard = TeamService.get_team_leaderboard(db, limit=limit, offset=offset)
+
+        return TeamLeaderboardResponse(status="success", leaderboard=leaderboard)
+    finally:
+        release_connections(db)
+
+
+@router.get("/leaderboard/movement", response_model=RankMovementResponse)
+async def get_rank_movement(
+    username: str = Query(..., min_length=1, max_length=100, description="Username to look up"),
+    session_id: Optional[str] = Query(None, description="Ended session (default: most recent)"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Get a user's rank after a session ended and how many places it moved
+    since the previous session.
+
+    Ranks come from the leaderboard snapshot captured when the session ended.
+    Rank and delta are null if the user had no score at that point.
+    """
+    try:
+        movement = RankSnapshotService.get_rank_movement(db, username, session_id)
+
+        return RankMovementResponse(status="success", **movement)
+    except TriviaAPIException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    finally:
+        release_connections(db)
+
+
+@router.post("/leaderboard/ranks", response_model=RankLookupResponse)
+async def get_user_ranks(request: RankLookupRequest, db: Session = Depends(get_read_db)):
+    """
+    Look up the score and rank of up to 500 users at once (e.g. a friend list).
+
+    Runs a fixed number of queries regardless of how many usernames are sent.
+    Unknown or unscored users are returned with score 0 and a null rank.
+    """
+    try:
+        ranks = LeaderboardService.get_user_ranks(db, request.usernames)
 
-    return LeaderboardResponse(
-        status="success",
-        leaderboard=leaderboard,
-    )
+        return RankLookupResponse(status="success", ranks=ranks)
+    finally:
+        release_connections(db)
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from trivia_api.database import get_db
+from trivia_api.database import get_read_db, release_connections
 from trivia_api.models.session import QuestionResponse
 from trivia_api.services.session_service import SessionService
 
@@ -10,7 +10,7 @@ router = APIRouter(prefix="/api/trivia", tags=["Questions"])
 
 
 @router.get("/question", response_model=QuestionResponse)
-async def get_question(db: Session = Depends(get_db)):
+async def get_question(db: Session = Depends(get_read_db)):
     """
     Retrieve the currently active trivia question.
 
@@ -18,7 +18,10 @@ async def get_question(db: Session = Depends(get_db)):
     If a session has ended, the correct answer is included.
     Returns null question if no session exists.
     """
-    question_data = SessionService.get_current_question(db, reveal_answer=False)
+    try:
+        question_data = SessionService.get_current_question(db, reveal_answer=False)
+    finally:
+        release_connections(db)
 
     if not question_data:
         return QuestionResponse(
@@ -1,9 +1,9 @@
 """Session management API endpoints."""
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from sqlalchemy.orm import Session
 
-from trivia_api.database import get_db
+from trivia_api.database import get_db, remember_write
 from trivia_api.errors import TriviaAPIException
 from trivia_api.models.session import (
     SessionStartRequest,
@@ -11,30 +11,30 @@ from trivia_api.models.session import (
     SessionEndResponse,
 )
 from trivia_api.services.session_service import SessionService
-from trivia_api.utils.auth import verify_admin_api_key
+from trivia_api.utils.auth import require_admin_scope
 from trivia_api.utils.timestamps import to_iso8601
 
 router = APIRouter(prefix="/api/trivia", tags=["Session Management"])
 
 
-@router.post("/session/start", response_model=SessionStartResponse)
+@router.post(
+    "/session/start",
+    response_model=SessionStartResponse,
+    dependencies=[Depends(require_admin_scope("start"))],
+)
 async def start_session(
     request: SessionStartRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    x_api_key: str = Header(None),
 ):
     """
     Start a new trivia session.
 
-    Requires admin authentication via X-API-Key header.
+    Requires an admin key with the "start" scope via X-API-Key header.
     """
-    try:
-        verify_admin_api_key(x_api_key)
-    except TriviaAPIException as e:
-        raise HTTPException(status_code=e.status_code, detail=e.message)
-
     try:
         session = SessionService.start_session(db, request.question, request.correct_answer)
+        remember_write(response)
 
         return SessionStartResponse(
             status="success",
@@ -46,23 +46,23 @@ async def start_session(
         raise HTTPException(status_code=e.status_code, detail=e.message)
 
 
-@router.post("/session/end", response_model=SessionEndResponse)
+@router.post(
+    "/session/end",
+    response_model=SessionEndResponse,
+    dependencies=[Depends(require_admin_scope("end"))],
+)
 async def end_session(
+    response: Response,
     db: Session = Depends(get_db),
-    x_api_key: str = Header(None),
 ):
     """
     End the current trivia session and reveal the answer.
 
-    Requires admin authentication via X-API-Key header.
+    Requires an admin key with the "end" scope via X-API-Key header.
     """
-    try:
-        verify_admin_api_key(x_api_key)
-    except TriviaAPIException as e:
-        raise HTTPException(status_code=e.status_code, detail=e.message)
-
     try:
         session = SessionService.end_session(db)
+        remember_write(response)
         successful_attempts = SessionService.get_successful_attempts(
             db, session.session_id
         )
@@ -0,0 +1,51 @@
+"""Team management API endpoints."""
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from sqlalchemy.orm import Session
+
+from trivia_api.database import get_db, remember_write
+from trivia_api.errors import InvalidTeamImportError, TriviaAPIException
+from trivia_api.models.team import TeamImportRequest, TeamImportResponse
+from trivia_api.services.team_service import TeamService
+from trivia_api.utils.auth import require_admin_scope
+
+router = APIRouter(prefix="/api/trivia", tags=["Teams"])
+
+
+@router.post(
+    "/teams/import",
+    response_model=TeamImportResponse,
+    dependencies=[Depends(require_admin_scope("import"))],
+)
+async def import_teams(
+    request: TeamImportRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    """
+    Create teams and set their members in bulk.
+
+    Each listed team's membership is replaced by the listed usernames, and
+    listed users leave any other team. The affected team scores are
+    recomputed from the members' current scores.
+
+    Requires an admin key with the "import" scope via X-API-Key header.
+    """
+    try:
+        teams: dict = {}
+        for team in request.teams:
+            if team.name in teams:
+                raise InvalidTeamImportError(f"Team {team.name!r} is listed more than once")
+            teams[team.name] = list(dict.fromkeys(team.members))
+
+        members = TeamService.import_members(db, teams)
+        remember_write(response)
+
+        return TeamImportResponse(
+            status="success",
+            message="Team memberships imported",
+            teams=len(teams),
+            members=members,
+        )
+    except TriviaAPIException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
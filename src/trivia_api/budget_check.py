@@ -0,0 +1,197 @@
+"""Query budget check for every budgeted endpoint.
+
+Plays a short game against the real application with the query budget
+detector in ``raise`` mode, on a fresh file-backed SQLite database, so each
+endpoint runs its most expensive path at least once: first answers from new
+users (correct, wrong and batched), returning users, team members, ended
+sessions with rank snapshots, a read replica that has not caught up, and so
+on. The check fails when
+
+- a request exceeds its budget (the detector answers it with a 500 error);
+- a request repeats a statement;
+- an endpoint in ``DEFAULT_QUERY_BUDGETS`` was never exercised; or
+- a budget is higher than the most queries its endpoint used, since slack
+  would hide the next redundant query.
+
+Environment variables must be set before the application is imported, so
+``run`` configures them and imports ``trivia_api.main`` lazily.
+"""
+import logging
+import os
+import secrets
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class BudgetCheckReport:
+    """Outcome of a budget check."""
+
+    used: dict = field(default_factory=dict)  # endpoint -> most queries per request
+    budgets: dict = field(default_factory=dict)
+    violations: list = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True if every endpoint used exactly its budget and nothing was repeated."""
+        return not self.violations
+
+    def summary(self) -> str:
+        """Human-readable summary."""
+        lines = [
+            f"{endpoint}: {self.used.get(endpoint, '-')} of {budget} queries"
+            for endpoint, budget in sorted(self.budgets.items())
+        ]
+        if self.violations:
+            lines.append(f"{len(self.violations)} budget violations:")
+            lines.extend(f"  - {violation}" for violation in self.violations)
+        else:
+            lines.append("all budgets hold")
+        return "\n".join(lines)
+
+
+class _ReportCollector(logging.Handler):
+    """Collects the detector's reports of repeated statements."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.reports: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.reports.append(record.getMessage())
+
+
+def configure_environment(database_path: str, admin_key: str) -> None:
+    """Point the application at the check database with the detector in raise mode."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    os.environ["SHARD_DATABASE_URLS"] = ""
+    os.environ["READ_REPLICA_URL"] = ""
+    # A replica copied once at startup, so it never sees the game's writes
+    os.environ["READ_REPLICA_SNAPSHOT_PATH"] = f"{database_path}.replica"
+    os.environ["READ_REPLICA_REFRESH_SECONDS"] = "3600"
+    os.environ["READ_REPLICA_MAX_STALENESS_SECONDS"] = "3600"
+    os.environ["SHARED_LEADERBOARD_PATH"] = ""
+    os.environ["STORAGE_ENGINE"] = "sql"
+    os.environ["DB_STARTUP_MODE"] = "create_all"
+    os.environ["DB_STARTUP_LOCK_PATH"] = f"{database_path}.startup.lock"
+    os.environ["ADMIN_API_KEY"] = admin_key
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["METRICS_ENABLED"] = "true"
+    os.environ["QUERY_BUDGET_MODE"] = "raise"
+    os.environ["QUERY_BUDGET_OVERRIDES"] = ""
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def run(database_path: Optional[str] = None) -> BudgetCheckReport:
+    """
+    Exercise every budgeted endpoint and compare its query counts with its budget.
+
+    Args:
+        database_path: SQLite file to use (default: a new temporary file)
+
+    Returns:
+        BudgetCheckReport with the most queries used per endpoint and any violations
+    """
+    if database_path is None:
+        database_path = os.path.join(tempfile.mkdtemp(prefix="trivia-budgets-"), "budgets.db")
+    admin_key = secrets.token_hex(16)
+    configure_environment(database_path, admin_key)
+
+    from fastapi.testclient import TestClient
+
+    from trivia_api.main import app
+    from trivia_api.services.rank_snapshot_service import RankSnapshotService
+    from trivia_api.services.user_id_cache import user_ids
+    from trivia_api.utils.metrics import DB_QUERIES_PER_REQUEST
+    from trivia_api.utils.query_budget import DEFAULT_QUERY_BUDGETS
+
+    report = BudgetCheckReport(budgets=dict(DEFAULT_QUERY_BUDGETS))
+    used: dict = defaultdict(int)
+    admin = {"X-API-Key": admin_key}
+    collector = _ReportCollector()
+    detector_logger = logging.getLogger("trivia_api.middleware.query_budget")
+    detector_logger.addHandler(collector)
+
+    def call(method: str, route: str, path: Optional[str] = None, **kwargs):
+        before = DB_QUERIES_PER_REQUEST.sum(method, route)
+        response = client.request(method, path or route, **kwargs)
+        endpoint = f"{method} {route}"
+        used[endpoint] = max(used[endpoint], int(DB_QUERIES_PER_REQUEST.sum(method, route) - before))
+        if response.status_code >= 500:
+            report.violations.append(f"{endpoint} failed: {response.json().get('message')}")
+        return response
+
+    def start(correct_answer: str) -> str:
+        response = call(
+            "POST",
+            "/api/trivia/session/start",
+            json={"question": "Q?", "correct_answer": correct_answer},
+            headers=admin,
+        )
+        return response.json().get("session_id", "")
+
+    def answer(username: str, text: str) -> None:
+        call("POST", "/api/trivia/answer", json={"username": username, "answer": text})
+
+    try:
+        with TestClient(app) as client:
+            call(
+                "POST",
+                "/api/trivia/teams/import",
+                json={"teams": [{"name": "red", "members": ["carol"]}]},
+                headers=admin,
+            )
+            session_ids = []
+            for session_index in range(2):
+                session_ids.append(start("paris"))
+                call("GET", "/api/trivia/question")
+                # New users (correct, wrong, team member), then a returning one
+                answer(f"new-{session_index}", "Paris")
+                answer(f"wrong-{session_index}", "Lyon")
+                answer("carol", "paris")
+                answer("alice", "PARIS")
+                call(
+                    "POST",
+                    "/api/trivia/answers",
+                    json={"answers": [
+                        {"username": f"batch-{session_index}-{index}", "answer": "paris" if index % 2 else "rome"}
+                        for index in range(4)
+                    ] + [{"username": "carol", "answer": "paris"}]},
+                )
+                call("GET", "/api/trivia/analytics", headers=admin)
+                call("POST", "/api/trivia/session/end", headers=admin)
+
+            call("GET", "/api/trivia/leaderboard")
+            call("GET", "/api/trivia/leaderboard/teams")
+            call("GET", "/api/trivia/attempts")
+            call(
+                "GET",
+                "/api/trivia/analytics",
+                f"/api/trivia/analytics?session_id={session_ids[0]}",
+                headers=admin,
+            )
+            call("POST", "/api/trivia/leaderboard/ranks", json={"usernames": ["alice", "carol", "nobody"]})
+            # As served to a client that has not written (so reads go to the
+            # lagging replica) by a worker that has not cached the snapshot
+            # or the user's id
+            client.cookies.clear()
+            RankSnapshotService._cache.clear()
+            user_ids.clear()
+            movement = "/api/trivia/leaderboard/movement?username=alice"
+            call("GET", "/api/trivia/leaderboard/movement", movement)
+            call("GET", "/api/trivia/leaderboard/movement", f"{movement}&session_id={session_ids[0]}")
+    finally:
+        detector_logger.removeHandler(collector)
+
+    report.used = dict(used)
+    report.violations.extend(collector.reports)
+    for endpoint, budget in sorted(DEFAULT_QUERY_BUDGETS.items()):
+        if endpoint not in used:
+            report.violations.append(f"{endpoint} was not exercised")
+        elif used[endpoint] < budget:
+            report.violations.append(
+                f"{endpoint} used at most {used[endpoint]} queries but its budget is {budget}; lower the budget"
+            )
+    return report
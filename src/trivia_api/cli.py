@@ -0,0 +1,314 @@
+"""Command-line tools for operating the trivia API."""
+import argparse
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from trivia_api.config import get_settings
+from trivia_api.errors import TriviaAPIException
+
+
+def _timestamp(value: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ISO 8601 timestamp: {value!r}") from None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    from trivia_api.services.export_service import ExportService
+
+    if get_settings().STORAGE_ENGINE == "memory":
+        print(
+            "export: the in-memory engine is owned by the server; use GET /api/trivia/export",
+            file=sys.stderr,
+        )
+        return 2
+
+    try:
+        stream = ExportService.export(
+            args.table,
+            args.format,
+            args.gzip,
+            args.since,
+            args.until,
+            args.session_id,
+            limit_concurrency=False,
+        )
+        output = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+        try:
+            for chunk in stream:
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+    except TriviaAPIException as e:
+        print(f"export: {e.message}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _cmd_stress(args: argparse.Namespace) -> int:
+    from trivia_api import stress
+
+    report = stress.run(
+        users=args.users,
+        answers_per_user=args.answers_per_user,
+        sessions=args.sessions,
+        threads=args.threads,
+        tasks=args.tasks,
+        processes=args.processes,
+        database_path=args.database,
+        seed=args.seed,
+    )
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+def _cmd_check_budgets(args: argparse.Namespace) -> int:
+    from trivia_api import budget_check
+
+    report = budget_check.run(database_path=args.database)
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+def _cmd_replay(args: argparse.Namespace) -> int:
+    from trivia_api import replay
+
+    try:
+        report = replay.run(
+            args.captures,
+            speed=args.speed,
+            url=args.url,
+            admin_key=args.admin_key,
+            directory=args.directory,
+            max_in_flight=args.max_in_flight,
+            limit=args.limit,
+        )
+    except (OSError, ValueError) as e:
+        print(f"replay: {e}", file=sys.stderr)
+        return 2
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+def _cmd_generate(args: argparse.Namespace) -> int:
+    from trivia_api import generate
+
+    logging.basicConfig(level=get_settings().LOG_LEVEL)
+    spec = generate.GenerateSpec(
+        users=args.users,
+        sessions=args.sessions,
+        attempts=args.attempts,
+        zipf=args.zipf,
+        correct_ratio=args.correct_ratio,
+        days=args.days,
+        seed=args.seed,
+    )
+    try:
+        report = generate.run(spec, processes=args.processes, snapshot=args.snapshot)
+    except (OSError, ValueError) as e:
+        print(f"generate: {e}", file=sys.stderr)
+        return 2
+    print(report.summary())
+    return 0
+
+
+def _cmd_reconcile_teams(args: argparse.Namespace) -> int:
+    from trivia_api.database import SessionLocal, close_session, get_engine, get_shard_engines
+    from trivia_api.services.team_service import TeamService
+    from trivia_api.startup import prepare_database
+
+    settings = get_settings()
+    if settings.STORAGE_ENGINE == "memory":
+        print(
+            "reconcile-teams: the in-memory engine recomputes team scores when it loads",
+            file=sys.stderr,
+        )
+        return 2
+
+    prepare_database(settings, [get_engine(), *get_shard_engines()])
+    db = SessionLocal()
+    try:
+        written = TeamService.reconcile(db)
+    finally:
+        close_session(db)
+    print(f"reconciled {written} team score rows")
+    return 0
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    from trivia_api import server
+
+    logging.basicConfig(level=get_settings().LOG_LEVEL)
+    options = server.ServeOptions(
+        host=args.host,
+        port=args.port,
+        uds=args.uds,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        preload=args.preload,
+        graceful_timeout=args.graceful_timeout,
+        backlog=args.backlog,
+        keep_alive=args.keep_alive,
+        access_log=args.access_log,
+    )
+    try:
+        return server.serve(options)
+    except ValueError as e:
+        print(f"serve: {e}", file=sys.stderr)
+        return 2
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the ``trivia-api`` argument parser."""
+    parser = argparse.ArgumentParser(prog="trivia-api", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser(
+        "export",
+        help="Stream a table to a CSV or Parquet file",
+        description="Export a table from DATABASE_URL (and user shards) in bounded memory.",
+    )
+    export.add_argument("table", choices=["attempts", "scores", "sessions"])
+    export.add_argument("-f", "--format", choices=["csv", "parquet"], default="csv")
+    export.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    export.add_argument("--gzip", action="store_true", help="Gzip-compress CSV output")
+    export.add_argument("--since", type=_timestamp, help="Only rows at or after this ISO 8601 time")
+    export.add_argument("--until", type=_timestamp, help="Only rows before this ISO 8601 time")
+    export.add_argument("--session-id", help="Only rows for this session")
+    export.set_defaults(handler=_cmd_export)
+
+    stress = commands.add_parser(
+        "stress",
+        help="Fire concurrent answers at the app and check score invariants",
+        description=(
+            "Submit answers from threads, asyncio tasks and worker processes at once "
+            "against a file-backed SQLite database, then verify attempts, scores and ranks. "
+            "Exits non-zero on any violation or server error."
+        ),
+    )
+    stress.add_argument("--users", type=int, default=200, help="Users per session")
+    stress.add_argument("--answers-per-user", type=int, default=3, help="Submissions per user per session")
+    stress.add_argument("--sessions", type=int, default=3, help="Sessions to play")
+    stress.add_argument("--threads", type=int, default=16, help="Threads (per process)")
+    stress.add_argument("--tasks", type=int, default=64, help="Concurrent asyncio tasks")
+    stress.add_argument("--processes", type=int, default=4, help="Worker processes (0 to disable)")
+    stress.add_argument("--database", help="SQLite file to use (default: a new temporary file)")
+    stress.add_argument("--seed", type=int, default=0, help="Workload random seed")
+    stress.set_defaults(handler=_cmd_stress)
+
+    check_budgets = commands.add_parser(
+        "check-budgets",
+        help="Check every endpoint's SQL query count against its budget",
+        description=(
+            "Exercise every endpoint in DEFAULT_QUERY_BUDGETS against a fresh SQLite database "
+            "with QUERY_BUDGET_MODE=raise. Fails if a request exceeds its budget or repeats a "
+            "statement, or if a budget is higher than the queries its endpoint needs."
+        ),
+    )
+    check_budgets.add_argument("--database", help="SQLite file to use (default: a temporary file)")
+    check_budgets.set_defaults(handler=_cmd_check_budgets)
+
+    replay = commands.add_parser(
+        "replay",
+        help="Replay captured requests and compare latencies",
+        description=(
+            "Re-issue requests captured with CAPTURE_DIR at their original pace (or faster) "
+            "against the app on a scratch database, or against --url, and report each "
+            "route's latency deviation. Exits non-zero if requests fail that succeeded when captured."
+        ),
+    )
+    replay.add_argument("captures", nargs="+", help="Capture files or directories")
+    replay.add_argument("--speed", type=float, default=1.0, help="Replay speed, e.g. 2 for 2x (default: 1)")
+    replay.add_argument("--url", help="Replay against this running server instead of an in-process app")
+    replay.add_argument("--admin-key", help="Admin key for admin requests with --url")
+    replay.add_argument("--directory", help="Scratch directory (default: a new temporary directory)")
+    replay.add_argument("--max-in-flight", type=int, default=512, help="Most requests outstanding at once")
+    replay.add_argument("--limit", type=int, help="Replay only the first N requests")
+    replay.set_defaults(handler=_cmd_replay)
+
+    generate = commands.add_parser(
+        "generate",
+        help="Fill an empty database with a synthetic dataset",
+        description=(
+            "Generate sessions, users and attempts with Zipfian user activity into "
+            "DATABASE_URL (and SHARD_DATABASE_URLS) using parallel bulk loads, then "
+            "rebuild indexes, session analytics and the latest leaderboard snapshot."
+        ),
+    )
+    generate.add_argument("--users", type=int, default=100_000, help="Users (default: 100000)")
+    generate.add_argument("--sessions", type=int, default=200, help="Sessions (default: 200)")
+    generate.add_argument("--attempts", type=int, default=2_000_000, help="Attempts in total (default: 2000000)")
+    generate.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of user activity (default: 1.1)")
+    generate.add_argument(
+        "--correct-ratio", type=float, default=0.35, help="Average share of correct answers (default: 0.35)"
+    )
+    generate.add_argument("--days", type=float, default=30.0, help="Days the sessions span (default: 30)")
+    generate.add_argument("--seed", type=int, default=0, help="Random seed")
+    generate.add_argument(
+        "--processes", type=int, help="Worker processes (default: one per CPU; 0 to generate in-process)"
+    )
+    generate.add_argument(
+        "--no-snapshot", dest="snapshot", action="store_false", help="Skip the leaderboard snapshot"
+    )
+    generate.set_defaults(handler=_cmd_generate)
+
+    reconcile_teams = commands.add_parser(
+        "reconcile-teams",
+        help="Recompute every team score from membership and user scores",
+        description=(
+            "Rebuild team_scores on every shard from team_members and user_scores. "
+            "Run after restoring or bulk-loading user scores or memberships outside the API."
+        ),
+    )
+    reconcile_teams.set_defaults(handler=_cmd_reconcile_teams)
+
+    serve = commands.add_parser(
+        "serve",
+        help="Run the API with pre-forked workers",
+        description=(
+            "Run the API on one shared TCP or Unix socket with one worker per CPU core, "
+            "uvloop and httptools when installed, the app preloaded before forking, "
+            "and graceful draining on SIGTERM."
+        ),
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8000, help="Bind port (default: 8000)")
+    serve.add_argument("--uds", help="Bind to this Unix domain socket instead of host/port")
+    serve.add_argument(
+        "-w", "--workers", type=int, help="Worker processes (default: SERVER_WORKERS or one per core)"
+    )
+    serve.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default="auto")
+    serve.add_argument("--http", choices=["auto", "h11", "httptools"], default="auto")
+    serve.add_argument(
+        "--no-preload",
+        dest="preload",
+        action="store_false",
+        help="Import the app in each worker instead of once before forking",
+    )
+    serve.add_argument(
+        "--graceful-timeout",
+        type=float,
+        help="Seconds to finish in-flight requests on SIGTERM (default: SERVER_GRACEFUL_TIMEOUT_SECONDS)",
+    )
+    serve.add_argument("--backlog", type=int, default=2048, help="Listen backlog")
+    serve.add_argument("--keep-alive", type=int, default=5, help="Keep-alive timeout in seconds")
+    serve.add_argument("--no-access-log", dest="access_log", action="store_false")
+    serve.set_defaults(handler=_cmd_serve)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Entry point for the ``trivia-api`` command."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
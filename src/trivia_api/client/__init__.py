@@ -0,0 +1,8 @@
+"""Async Python client for the Trivia API (requires httpx)."""
+from trivia_api.client.client import RetryPolicy, TriviaClient, TriviaClientError
+
+__all__ = [
+    "RetryPolicy",
+    "TriviaClient",
+    "TriviaClientError",
+]
@@ -0,0 +1,82 @@
+"""Coalescing of concurrent answer submissions into batch requests."""
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from trivia_api.models.answer import AnswerBatchResult
+
+SendBatch = Callable[[list[dict]], Awaitable[list[AnswerBatchResult]]]
+
+
+class AnswerBatcher:
+    """
+    Collects answers submitted concurrently and sends them as one batch.
+
+    A batch is sent when ``max_batch_size`` answers are waiting or ``window``
+    seconds after the first one arrived, whichever comes first. Several
+    batches can be in flight at once; each caller gets the result for its
+    own answer.
+    """
+
+    def __init__(self, send: SendBatch, max_batch_size: int, window: float):
+        self.send = send
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def submit(self, item: dict) -> AnswerBatchResult:
+        """
+        Queue an answer and wait for its result.
+
+        Args:
+            item: Batch item (username, answer, idempotency_key)
+
+        Returns:
+            The answer's result from the batch response
+
+        Raises:
+            TriviaClientError: If the whole batch request failed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Send the waiting answers now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def aclose(self) -> None:
+        """Send the waiting answers and wait for every batch in flight."""
+        self.flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _send(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            results = await self.send([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():  # The caller may have been cancelled
+                future.set_result(result)
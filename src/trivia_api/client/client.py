@@ -0,0 +1,415 @@
+"""Async client for the Trivia API."""
+import asyncio
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+try:
+    import httpx
+except ImportError:
+    raise ImportError(
+        "trivia_api.client requires httpx; install it with: pip install 'trivia-api[client]'"
+    ) from None
+
+from trivia_api.client.batching import AnswerBatcher
+from trivia_api.models.analytics import SessionAnalyticsResponse
+from trivia_api.models.answer import MAX_ANSWER_BATCH, AnswerBatchResponse, AnswerBatchResult, AnswerResponse
+from trivia_api.models.attempt import AttemptsResponse
+from trivia_api.models.leaderboard import (
+    MAX_RANK_LOOKUP_USERNAMES,
+    LeaderboardResponse,
+    RankLookupResponse,
+    RankMovementResponse,
+)
+from trivia_api.models.session import QuestionResponse, SessionEndResponse, SessionStartResponse
+
+API_PREFIX = "/api/trivia"
+
+
+class TriviaClientError(Exception):
+    """An error response (or exhausted retries) from the Trivia API."""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(f"{status_code}: {message}")
+
+
+@dataclass
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a request.
+
+    Responses with a status in ``retry_statuses`` (rate limiting and load
+    shedding, which the server sends before doing any work) are retried after
+    the server's Retry-After, or after exponential backoff with full jitter.
+    Connection errors are retried only for requests that are safe to repeat:
+    reads, and answers, which always carry an idempotency key.
+    """
+
+    max_attempts: int = 4
+    backoff: float = 0.1  # Upper bound of the first jittered delay, in seconds
+    max_backoff: float = 5.0
+    max_retry_after: float = 30.0  # Give up if the server asks to wait longer
+    retry_statuses: tuple[int, ...] = (429, 503)
+
+    def should_retry(self, attempt: int, status_code: int, retry_after: Optional[float]) -> bool:
+        """Whether a response to the given attempt (0-based) is retried."""
+        return (
+            attempt + 1 < self.max_attempts
+            and status_code in self.retry_statuses
+            and (retry_after is None or retry_after <= self.max_retry_after)
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retrying after the given attempt (0-based)."""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form; not sent by this API
+
+
+def _error(response: httpx.Response) -> TriviaClientError:
+    try:
+        body = response.json()
+        # Service errors carry "message"; framework errors (e.g. auth) carry "detail"
+        message = body.get("message") or body.get("detail") or response.reason_phrase
+    except (ValueError, AttributeError):
+        message = response.text or response.reason_phrase
+    return TriviaClientError(response.status_code, message, _retry_after(response))
+
+
+class TriviaClient:
+    """
+    Async client covering every Trivia API endpoint, with typed responses.
+
+    One client keeps a pool of keep-alive connections; share it across tasks
+    and close it with ``aclose()`` or ``async with``. Answers submitted
+    concurrently through ``submit_answer`` are coalesced into batch requests
+    (``POST /answers``), falling back to one request per answer against
+    servers without the batch endpoint. Every answer carries an idempotency
+    key, so retries never record it twice.
+
+    Args:
+        base_url: Server URL, without the /api/trivia prefix
+        api_key: Admin API key for session, analytics and export calls
+        timeout: Per-request timeout in seconds
+        max_connections: Most concurrent connections to the server
+        max_keepalive_connections: Idle connections kept open for reuse
+        retry: Retry policy (default: RetryPolicy())
+        batch_answers: Coalesce concurrent answer submissions
+        max_batch_size: Most answers per batch request (at most 100)
+        batch_window: Seconds to wait for more answers before sending a batch
+        transport: Custom httpx transport (e.g. httpx.ASGITransport for tests)
+
+    Example:
+        async with TriviaClient("http://localhost:8000", api_key="...") as trivia:
+            await trivia.start_session("Capital of France?", "Paris")
+            results = await asyncio.gather(
+                *(trivia.submit_answer(name, "Paris") for name in players)
+            )
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: Optional[str] = None,
+        *,
+        timeout: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        retry: Optional[RetryPolicy] = None,
+        batch_answers: bool = True,
+        max_batch_size: int = MAX_ANSWER_BATCH,
+        batch_window: float = 0.005,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.retry = retry or RetryPolicy()
+        self._admin_headers = {"X-API-Key": api_key} if api_key else {}
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + API_PREFIX,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            transport=transport,
+        )
+        self._batch_supported = True
+        self._batcher: Optional[AnswerBatcher] = None
+        if batch_answers:
+            self._batcher = AnswerBatcher(
+                self._send_answer_batch, min(max_batch_size, MAX_ANSWER_BATCH), batch_window
+            )
+
+    async def __aenter__(self) -> "TriviaClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Send any queued answers, then close all connections."""
+        if self._batcher is not None:
+            await self._batcher.aclose()
+        await self._http.aclose()
+
+    # Sessions
+
+    async def start_session(self, question: str, correct_answer: str) -> SessionStartResponse:
+        """Start a session (requires the "start" scope)."""
+        response = await self._request(
+            "POST",
+            "/session/start",
+            json={"question": question, "correct_answer": correct_answer},
+            headers=self._admin_headers,
+        )
+        return SessionStartResponse.model_validate_json(response.content)
+
+    async def end_session(self) -> SessionEndResponse:
+        """End the active session and reveal the answer (requires the "end" scope)."""
+        response = await self._request("POST", "/session/end", headers=self._admin_headers)
+        return SessionEndResponse.model_validate_json(response.content)
+
+    async def get_question(self) -> QuestionResponse:
+        """Get the current question."""
+        response = await self._request("GET", "/question", safe=True)
+        return QuestionResponse.model_validate_json(response.content)
+
+    # Answers
+
+    async def submit_answer(
+        self, username: str, answer: str, idempotency_key: Optional[str] = None
+    ) -> AnswerResponse:
+        """
+        Submit an answer for a user.
+
+        Args:
+            username: Username of participant
+            answer: Answer text
+            idempotency_key: Key identifying this answer across retries
+                (default: a new random key)
+
+        Returns:
+            AnswerResponse with correctness and updated score
+
+        Raises:
+            TriviaClientError: If the answer was rejected (e.g. 400 for a
+                duplicate answer or no active session)
+        """
+        idempotency_key = idempotency_key or uuid.uuid4().hex
+        if self._batcher is None:
+            response = await self._request(
+                "POST",
+                "/answer",
+                json={"username": username, "answer": answer},
+                headers={"Idempotency-Key": idempotency_key},
+                safe=True,
+            )
+            return AnswerResponse.model_validate_json(response.content)
+
+        item = {"username": username, "answer": answer, "idempotency_key": idempotency_key}
+        for attempt in range(self.retry.max_attempts):
+            result = await self._batcher.submit(item)
+            if result.status == "success":
+                return AnswerResponse(
+                    status="success", is_correct=result.is_correct, message=result.message, score=result.score
+                )
+            if not self.retry.should_retry(attempt, result.status_code, result.retry_after):
+                break
+            await asyncio.sleep(self.retry.delay(attempt, result.retry_after))
+        raise TriviaClientError(result.status_code, result.message, result.retry_after)
+
+    async def submit_answers(self, answers: list[tuple[str, str]]) -> list[AnswerBatchResult]:
+        """
+        Submit many answers, in batch requests of up to 100.
+
+        Unlike ``submit_answer``, rejected answers are returned rather than
+        raised, and are not retried individually.
+
+        Args:
+            answers: (username, answer) pairs
+
+        Returns:
+            One result per answer, in order
+        """
+        items = [
+            {"username": username, "answer": answer, "idempotency_key": uuid.uuid4().hex}
+            for username, answer in answers
+        ]
+        chunks = [items[start:start + MAX_ANSWER_BATCH] for start in range(0, len(items), MAX_ANSWER_BATCH)]
+        results = await asyncio.gather(*(self._send_answer_batch(chunk) for chunk in chunks))
+        return [result for chunk in results for result in chunk]
+
+    async def _send_answer_batch(self, items: list[dict]) -> list[AnswerBatchResult]:
+        if not self._batch_supported:
+            return await self._send_answers_singly(items)
+        try:
+            response = await self._request("POST", "/answers", json={"answers": items}, safe=True)
+        except TriviaClientError as e:
+            if e.status_code not in (404, 405):
+                raise
+            # Server predates the batch endpoint
+            self._batch_supported = False
+            return await self._send_answers_singly(items)
+        return AnswerBatchResponse.model_validate_json(response.content).results
+
+    async def _send_answers_singly(self, items: list[dict]) -> list[AnswerBatchResult]:
+        async def send(item: dict) -> AnswerBatchResult:
+            response = await self._http.post(
+                "/answer",
+                json={"username": item["username"], "answer": item["answer"]},
+                headers={"Idempotency-Key": item["idempotency_key"]},
+            )
+            if response.status_code == 200:
+                return AnswerBatchResult(status_code=200, **response.json())
+            error = _error(response)
+            retry_after = int(error.retry_after) if error.retry_after is not None else None
+            return AnswerBatchResult(
+                status="error", status_code=error.status_code, message=error.message, retry_after=retry_after
+            )
+
+        return list(await asyncio.gather(*(send(item) for item in items)))
+
+    # History and rankings
+
+    async def get_attempts(self) -> AttemptsResponse:
+        """Get every answer attempt, most recent first."""
+        response = await self._request("GET", "/attempts", safe=True)
+        return AttemptsResponse.model_validate_json(response.content)
+
+    async def get_leaderboard(self, limit: int = 10, offset: int = 0) -> LeaderboardResponse:
+        """Get a page of the leaderboard."""
+        response = await self._request(
+            "GET", "/leaderboard", params={"limit": limit, "offset": offset}, safe=True
+        )
+        return LeaderboardResponse.model_validate_json(response.content)
+
+    async def get_rank_movement(
+        self, username: str, session_id: Optional[str] = None
+    ) -> RankMovementResponse:
+        """Get a user's rank after a session and its change since the previous one."""
+        params = {"username": username}
+        if session_id is not None:
+            params["session_id"] = session_id
+        response = await self._request("GET", "/leaderboard/movement", params=params, safe=True)
+        return RankMovementResponse.model_validate_json(response.content)
+
+    async def get_user_ranks(self, usernames: list[str]) -> RankLookupResponse:
+        """Look up the score and rank of many users, 500 per request."""
+        chunks = [
+            usernames[start:start + MAX_RANK_LOOKUP_USERNAMES]
+            for start in range(0, len(usernames), MAX_RANK_LOOKUP_USERNAMES)
+        ]
+        responses = await asyncio.gather(
+            *(self._request("POST", "/leaderboard/ranks", json={"usernames": chunk}, safe=True) for chunk in chunks)
+        )
+        ranks = [
+            entry
+            for response in responses
+            for entry in RankLookupResponse.model_validate_json(response.content).ranks
+        ]
+        return RankLookupResponse(status="success", ranks=ranks)
+
+    # Operations
+
+    async def get_analytics(self, session_id: Optional[str] = None) -> SessionAnalyticsResponse:
+        """Get answer analytics for a session (requires the "analytics" scope)."""
+        params = {"session_id": session_id} if session_id is not None else None
+        response = await self._request(
+            "GET", "/analytics", params=params, headers=self._admin_headers, safe=True
+        )
+        return SessionAnalyticsResponse.model_validate_json(response.content)
+
+    async def export(
+        self,
+        table: str,
+        format: str = "csv",
+        gzip: bool = False,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        session_id: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a table export (requires the "export" scope).
+
+        Yields the encoded file in chunks as they arrive; see
+        ``GET /api/trivia/export/{table}`` for the parameters.
+        """
+        params = {"format": format, "gzip": gzip}
+        if since is not None:
+            params["since"] = since.isoformat()
+        if until is not None:
+            params["until"] = until.isoformat()
+        if session_id is not None:
+            params["session_id"] = session_id
+
+        for attempt in range(self.retry.max_attempts):
+            async with self._http.stream(
+                "GET", f"/export/{table}", params=params, headers=self._admin_headers
+            ) as response:
+                if response.status_code < 400:
+                    async for chunk in response.aiter_bytes():
+                        yield chunk
+                    return
+                await response.aread()
+                error = _error(response)
+            if not self.retry.should_retry(attempt, error.status_code, error.retry_after):
+                raise error
+            await asyncio.sleep(self.retry.delay(attempt, error.retry_after))
+
+    async def get_metrics(self) -> str:
+        """Get server metrics in Prometheus text format."""
+        response = await self._http.get(self._http.base_url.copy_with(path="/metrics"))
+        if response.status_code >= 400:
+            raise _error(response)
+        return response.text
+
+    # Transport
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json=None,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        safe: bool = False,
+    ) -> httpx.Response:
+        """
+        Send a request, retrying per the retry policy.
+
+        Args:
+            safe: The request can be repeated without side effects, so
+                connection errors are retried too
+
+        Raises:
+            TriviaClientError: For error responses, once retries are exhausted
+            httpx.TransportError: For connection errors, once retries are exhausted
+        """
+        for attempt in range(self.retry.max_attempts):
+            try:
+                response = await self._http.request(method, path, json=json, params=params, headers=headers)
+            except httpx.TransportError:
+                if not safe or attempt + 1 == self.retry.max_attempts:
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                continue
+
+            if response.status_code < 400:
+                return response
+            error = _error(response)
+            if not self.retry.should_retry(attempt, error.status_code, error.retry_after):
+                raise error
+            await asyncio.sleep(self.retry.delay(attempt, error.retry_after))
@@ -11,12 +11,110 @@ class Settings(BaseSettings):
     # Server
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
+    # trivia-api serve: worker processes (0 = one per CPU core, or 1 for the
+    # memory engine) and how long SIGTERM waits for in-flight requests
+    SERVER_WORKERS: int = 0
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: float = 30.0
 
     # Database
     DATABASE_URL: str = "sqlite:///./trivia.db"
+    # Schema handling at startup: "create_all", "migrate", "check" or "none"
+    DB_STARTUP_MODE: str = "create_all"
+    DB_STARTUP_LOCK_PATH: str = "./.trivia-startup.lock"
+    ALEMBIC_CONFIG: str = "alembic.ini"
+    # Comma-separated URLs; user_scores and attempt_records rows are spread over
+    # these databases by username hash (sessions stay in DATABASE_URL)
+    SHARD_DATABASE_URLS: str = ""
+    # Journal mode set on file-based SQLite databases (main and shards) when
+    # connecting. WAL lets readers (exports, replica copies) run alongside
+    # answer writes instead of blocking them; "" keeps each file's mode
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    # Read-only endpoints can use a replica: an external READ_REPLICA_URL, or a
+    # SQLite copy of DATABASE_URL refreshed every READ_REPLICA_REFRESH_SECONDS
+    READ_REPLICA_URL: str = ""
+    READ_REPLICA_SNAPSHOT_PATH: str = ""
+    READ_REPLICA_REFRESH_SECONDS: float = 1.0
+    READ_REPLICA_MAX_STALENESS_SECONDS: float = 5.0
+
+    # Top-N leaderboard published by one worker per host in a memory-mapped file
+    # and served by every worker without a query ("" disables)
+    SHARED_LEADERBOARD_PATH: str = ""
+    SHARED_LEADERBOARD_SIZE: int = 1000  # Entries published
+    SHARED_LEADERBOARD_REFRESH_MS: float = 200.0  # How often the writer checks for changes
+    SHARED_LEADERBOARD_MAX_STALENESS_SECONDS: float = 2.0  # Fall back to the DB beyond this
+
+    # Storage engine: "sql" (DATABASE_URL) or "memory" (single worker; state is
+    # persisted to an event log and snapshots in MEMORY_DATA_DIR)
+    STORAGE_ENGINE: str = "sql"
+    MEMORY_DATA_DIR: str = "./memory-data"
+    MEMORY_FSYNC_INTERVAL_MS: float = 10.0  # Max window of events lost on power failure
+    MEMORY_SNAPSHOT_EVERY: int = 100_000  # Events between snapshots
 
     # Admin authentication
-    ADMIN_API_KEY: str = "your-super-secret-admin-key-here"
+    ADMIN_API_KEY: str = "your-super-secret-admin-key-here"  # All scopes; "" to disable
+    # Comma-separated "<sha256-hex>[:scope+scope]" entries; scopes: start, end, analytics, export, import
+    ADMIN_API_KEY_HASHES: str = ""
+
+    # Answer submission rate limiting (token buckets per username and client IP)
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_USER_PER_SECOND: float = 1.0
+    RATE_LIMIT_USER_BURST: int = 5
+    RATE_LIMIT_IP_PER_SECOND: float = 20.0
+    RATE_LIMIT_IP_BURST: int = 50
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_IDLE_SECONDS: float = 300.0
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per worker) or "sqlite" (shared)
+    RATE_LIMIT_SQLITE_PATH: str = "./rate_limits.db"
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Use X-Forwarded-For behind a proxy
+    # Proxies in front of the app that append to X-Forwarded-For; the client is
+    # the entry this many from the right (entries further left are client-supplied)
+    RATE_LIMIT_TRUSTED_PROXIES: int = 1
+
+    # Admission control for /api routes (admin session routes are admitted first)
+    ADMISSION_ENABLED: bool = False
+    ADMISSION_MAX_IN_FLIGHT: int = 32
+    ADMISSION_MAX_QUEUE: int = 256
+    ADMISSION_QUEUE_TIMEOUT_MS: float = 500.0  # Shed requests that would wait longer
+
+    # Per-route time budgets: SQL still running when a request's budget is used up
+    # is cancelled and the request fails with 504 (budgets per route in utils/deadline.py)
+    TIME_BUDGET_ENABLED: bool = False
+    TIME_BUDGET_DEFAULT_MS: float = 2000.0  # Routes without a listed budget
+    TIME_BUDGET_OVERRIDES: str = ""  # e.g. "GET /api/trivia/leaderboard=500"; 0 = unbounded
+
+    # Live answer analytics (per worker, folded into the session at end)
+    ANALYTICS_TRACKED_ANSWERS: int = 200  # Distinct wrong answers tracked per session
+    ANALYTICS_TOP_ANSWERS: int = 10  # Wrong answers reported
+    ANALYTICS_MAX_SECONDS: int = 3600  # Per-second buckets kept per session
+
+    # Bulk exports (admin endpoint and CLI)
+    EXPORT_BATCH_ROWS: int = 10_000  # Rows fetched and encoded at a time
+    EXPORT_MAX_CONCURRENT: int = 1  # Concurrent API exports per worker
+
+    # Idempotency-Key replay for answer retries
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: float = 600.0  # How long a result can be replayed
+    IDEMPOTENCY_PENDING_SECONDS: float = 30.0  # Claim lifetime if a worker dies mid-request
+    IDEMPOTENCY_MAX_KEYS: int = 100_000
+    IDEMPOTENCY_BACKEND: str = "memory"  # "memory" (per worker) or "sqlite" (shared)
+    IDEMPOTENCY_SQLITE_PATH: str = "./idempotency.db"
+
+    # Observability
+    METRICS_ENABLED: bool = True
+    PROFILE_SLOW_REQUEST_MS: float = 0.0  # 0 disables the sampling profiler
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILE_OUTPUT_DIR: str = "./profiles"
+
+    # Request capture for trivia-api replay: each worker appends NDJSON to
+    # CAPTURE_DIR ("" disables); session routes are always captured
+    CAPTURE_DIR: str = ""
+    CAPTURE_SAMPLE_RATE: float = 1.0  # Fraction of other API requests captured
+    CAPTURE_MAX_BODY_BYTES: int = 65536  # Larger request bodies are not kept
+
+    # Query budgets (dev/test): "off", "warn" (log) or "raise" (fail the request)
+    QUERY_BUDGET_MODE: str = "off"
+    QUERY_BUDGET_DEFAULT: int = 10
+    QUERY_BUDGET_OVERRIDES: str = ""  # e.g. "POST /api/trivia/answer=6"
 
     class Config:
         env_file = ".env"
@@ -1,29 +1,454 @@
 """Database configuration and session management."""
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
 
-from trivia_api.config import get_settings
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+
+from trivia_api.config import Settings, get_settings
+from trivia_api.utils.deadline import bind_deadline
+from trivia_api.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
 
 # Base class for ORM models (must be defined before engine for imports)
 Base = declarative_base()
 
-settings = get_settings()
+_engine: Optional[Engine] = None
+_shard_engines: Optional[list[Engine]] = None
+_engine_lock = threading.Lock()
+
+
+def _create_engine(url: str, set_journal_mode: bool = True) -> Engine:
+    settings = get_settings()
+    # Create engine with proper SQLite configuration
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        echo=settings.DEBUG,
+    )
+    parsed = make_url(url)
+    if (
+        set_journal_mode
+        and settings.SQLITE_JOURNAL_MODE
+        and parsed.get_backend_name() == "sqlite"
+        and parsed.database not in (None, "", ":memory:")
+    ):
+        mode = settings.SQLITE_JOURNAL_MODE
+
+        @event.listens_for(engine, "connect")
+        def _set_journal_mode(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA journal_mode={mode}")
+            cursor.close()
+
+    return engine
+
+
+def get_engine() -> Engine:
+    """
+    Get the application engine, creating it on first use.
+
+    Deferring creation keeps imports free of settings and connection-pool work,
+    so tools that only need the models (Alembic, scripts) start quickly.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(get_settings().DATABASE_URL)
+    return _engine
+
+
+def get_shard_engines() -> list[Engine]:
+    """
+    Get one engine (and connection pool) per configured user shard.
+
+    Returns:
+        Shard engines in SHARD_DATABASE_URLS order, or an empty list when
+        user data lives in the main database
+    """
+    global _shard_engines
+    if _shard_engines is None:
+        with _engine_lock:
+            if _shard_engines is None:
+                urls = get_settings().SHARD_DATABASE_URLS
+                _shard_engines = [
+                    _create_engine(url) for url in filter(None, (u.strip() for u in urls.split(",")))
+                ]
+    return _shard_engines
 
-# Create engine with proper SQLite configuration
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=settings.DEBUG,
+
+def shard_index(username: str, shard_count: int) -> int:
+    """
+    Map a username to a shard.
+
+    Uses CRC-32 rather than ``hash()``, which is randomized per process.
+
+    Args:
+        username: Username
+        shard_count: Number of shards
+
+    Returns:
+        Shard index in ``range(shard_count)``
+    """
+    return zlib.crc32(username.encode()) % shard_count
+
+
+class LazyBindSession(Session):
+    """Session that binds to the application engine when first used."""
+
+    def get_bind(self, mapper=None, **kwargs):
+        if self.bind is None:
+            return get_engine()
+        return super().get_bind(mapper, **kwargs)
+
+
+# Session factory. Objects stay loaded after commit so services can return them
+# without a refresh() round trip per write.
+SessionLocal = sessionmaker(
+    class_=LazyBindSession, autocommit=False, autoflush=False, expire_on_commit=False
 )
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def shard_session(db: Session, username: str) -> Session:
+    """
+    Get the session holding a user's user_scores and attempt_records rows.
+
+    Shard sessions are opened on first use and kept in ``db.info`` so one
+    request reuses them; they are closed together with ``db`` by ``get_db``.
+
+    Args:
+        db: Request session on the main database
+        username: Username the rows belong to
+
+    Returns:
+        The shard's session, or ``db`` itself when sharding is off
+    """
+    engines = get_shard_engines()
+    if not engines:
+        return db
+    return _shard_sessions(db, [shard_index(username, len(engines))])[0]
 
-def get_db():
-    """Get database session for dependency injection."""
+
+def all_shard_sessions(db: Session) -> list[Session]:
+    """
+    Get a session for every shard, for queries that fan out across users.
+
+    Args:
+        db: Request session on the main database
+
+    Returns:
+        One session per shard, or ``[db]`` when sharding is off
+    """
+    engines = get_shard_engines()
+    if not engines:
+        return [db]
+    return _shard_sessions(db, range(len(engines)))
+
+
+def _shard_sessions(db: Session, indexes) -> list[Session]:
+    # Shard sessions passed back in resolve through the request session
+    root = db.info.get("parent", db)
+    sessions = root.info.setdefault("shard_sessions", {})
+    for index in indexes:
+        if index not in sessions:
+            sessions[index] = SessionLocal(bind=get_shard_engines()[index], info={"parent": root})
+    return [sessions[index] for index in indexes]
+
+
+def close_session(db: Session) -> None:
+    """Close a request session and any shard sessions it opened."""
+    for shard in db.info.pop("shard_sessions", {}).values():
+        shard.close()
+    db.close()
+
+
+def release_connections(db: Session) -> None:
+    """
+    End open transactions on a request session and its shard sessions.
+
+    Returns their connections to the pools right away rather than at request
+    teardown, which async routes only reach after further awaits. A route that
+    blocks the event loop waiting for a pooled connection could otherwise wait
+    on connections held by requests queued behind it on the same loop.
+    """
+    for shard in db.info.get("shard_sessions", {}).values():
+        shard.rollback()
+    db.rollback()
+
+
+def get_db(request: Request):
+    """Get a session on the primary database for dependency injection."""
+    bind_deadline(request)
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        close_session(db)
+
+
+# Read replicas
+
+# Cookie holding the time of the client's last write, for read-your-writes
+LAST_WRITE_COOKIE = "trivia_last_write"
+
+READ_ROUTING = registry.counter(
+    "trivia_read_sessions_total",
+    "Read-only request sessions by the database that served them",
+    ("target",),
+)
+
+
+class ReadReplica:
+    """
+    A read-only copy of the main database and a bound on how stale it is.
+
+    Subclasses report ``consistent_as_of()``: the wall-clock time up to which
+    every write is known to be visible on the replica.
+    """
+
+    def __init__(self, engine: Engine, max_staleness: float):
+        self.engine = engine
+        self.max_staleness = max_staleness
+
+    def consistent_as_of(self) -> Optional[float]:
+        raise NotImplementedError
+
+    def serves(self, last_write: Optional[float]) -> bool:
+        """
+        Decide whether a read can go to the replica.
+
+        Args:
+            last_write: Time of the client's last write, if known
+
+        Returns:
+            True if the replica is within the staleness bound and already
+            reflects the client's last write
+        """
+        as_of = self.consistent_as_of()
+        if as_of is None or time.time() - as_of > self.max_staleness:
+            return False
+        return last_write is None or last_write < as_of
+
+    def start(self) -> None:
+        """Begin keeping the replica current."""
+
+    def stop(self) -> None:
+        """Stop background work and release connections."""
+        self.engine.dispose()
+
+
+class URLReadReplica(ReadReplica):
+    """
+    Externally replicated database reached through READ_REPLICA_URL.
+
+    Replication lag is not observable from here, so it is assumed to stay
+    within the staleness bound; clients that wrote within that window read
+    from the primary.
+    """
+
+    def consistent_as_of(self) -> Optional[float]:
+        return time.time() - self.max_staleness
+
+
+class SnapshotReadReplica(ReadReplica):
+    """
+    Copy of a SQLite primary refreshed with the online backup API.
+
+    A background thread copies the primary into a temporary file and renames
+    it over the replica path, so readers always see a complete snapshot, and
+    records when the copy started as the replica's consistency point.
+
+    The copy is one read transaction on the primary. In WAL mode (see
+    SQLITE_JOURNAL_MODE) answer writes continue while it runs; in
+    rollback-journal mode they wait for it. Copies take at most a fifth of
+    the time: the next refresh waits for the longer of
+    ``refresh_interval`` and four times the last copy's duration.
+    """
+
+    # Wait between copies, as a multiple of how long the last copy took
+    _IDLE_FACTOR = 4
+
+    def __init__(self, source_path: str, path: str, refresh_interval: float, max_staleness: float):
+        super().__init__(_create_engine(f"sqlite:///{path}", set_journal_mode=False), max_staleness)
+        self.source_path = source_path
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self._as_of: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def consistent_as_of(self) -> Optional[float]:
+        return self._as_of
+
+    def refresh(self) -> None:
+        """Copy the primary and swap the copy in."""
+        started = time.time()
+        tmp_path = f"{self.path}.tmp"
+        source = sqlite3.connect(self.source_path)
+        try:
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(target)
+                # Self-contained file: no -wal/-shm files that could outlive the rename
+                target.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                target.close()
+        finally:
+            source.close()
+        os.replace(tmp_path, self.path)
+        # Pooled connections still have the previous file open
+        self.engine.dispose()
+        self._as_of = started
+
+    def start(self) -> None:
+        self.refresh()
+        self._thread = threading.Thread(target=self._refresh_loop, name="read-replica-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        super().stop()
+
+    def _refresh_loop(self) -> None:
+        delay = self.refresh_interval
+        while not self._stopped.wait(delay):
+            started = time.monotonic()
+            try:
+                self.refresh()
+            except sqlite3.Error:
+                # Reads fall back to the primary once the copy exceeds the staleness bound
+                logger.exception("Read replica refresh failed")
+            delay = max(self.refresh_interval, (time.monotonic() - started) * self._IDLE_FACTOR)
+
+
+_read_replica: Optional[ReadReplica] = None
+
+
+def get_read_replica() -> Optional[ReadReplica]:
+    """Get the running read replica, or None when reads use the primary."""
+    return _read_replica
+
+
+def start_read_replica(settings: Settings) -> Optional[ReadReplica]:
+    """
+    Start the read replica configured by settings, if any.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        The running replica, or None when no replica is configured
+
+    Raises:
+        ValueError: If a snapshot replica is requested for a non-SQLite primary
+    """
+    global _read_replica
+    if settings.READ_REPLICA_URL:
+        replica = URLReadReplica(
+            _create_engine(settings.READ_REPLICA_URL),
+            settings.READ_REPLICA_MAX_STALENESS_SECONDS,
+        )
+    elif settings.READ_REPLICA_SNAPSHOT_PATH:
+        url = make_url(settings.DATABASE_URL)
+        if url.get_backend_name() != "sqlite" or not url.database:
+            raise ValueError("READ_REPLICA_SNAPSHOT_PATH requires a file-based SQLite DATABASE_URL")
+        replica = SnapshotReadReplica(
+            url.database,
+            settings.READ_REPLICA_SNAPSHOT_PATH,
+            settings.READ_REPLICA_REFRESH_SECONDS,
+            settings.READ_REPLICA_MAX_STALENESS_SECONDS,
+        )
+    else:
+        return None
+    replica.start()
+    _read_replica = replica
+    return replica
+
+
+def stop_read_replica() -> None:
+    """Stop the running read replica, if any."""
+    global _read_replica
+    if _read_replica is not None:
+        _read_replica.stop()
+        _read_replica = None
+
+
+def remember_write(response: Response) -> None:
+    """
+    Tell the client when it last wrote, so its next reads see the write.
+
+    Set whenever a read path can lag behind the primary: the read replica
+    and the shared leaderboard both skip data older than the cookie.
+
+    Args:
+        response: Response of a write endpoint
+    """
+    # Imported here: the shared leaderboard reads through this module
+    from trivia_api.services.shared_leaderboard import get_shared_leaderboard
+
+    lagging = [reader for reader in (get_read_replica(), get_shared_leaderboard()) if reader is not None]
+    if not lagging:
+        return
+    response.set_cookie(
+        LAST_WRITE_COOKIE,
+        f"{time.time():.6f}",
+        max_age=int(max(reader.max_staleness for reader in lagging)) + 1,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def last_write_time(request: Request) -> Optional[float]:
+    """
+    Get when the client last wrote, from the cookie set by ``remember_write``.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        Epoch seconds of the client's last write, or None if unknown
+    """
+    try:
+        return float(request.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_read_db(request: Request):
+    """
+    Get a session for read-only endpoints.
+
+    Uses the read replica when one is configured, is within its staleness
+    bound and already contains the client's last write; otherwise the primary.
+    """
+    bind_deadline(request)
+    replica = get_read_replica()
+    if replica is not None and replica.serves(last_write_time(request)):
+        db = SessionLocal(bind=replica.engine)
+        READ_ROUTING.inc("replica")
+    else:
+        db = SessionLocal()
+        READ_ROUTING.inc("primary")
+    try:
+        yield db
+    finally:
+        close_session(db)
+
+
+def __getattr__(name: str):
+    # Backwards compatibility for ``from trivia_api.database import engine``
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,16 @@
 """Custom exception classes for the Trivia API."""
+import math
+from typing import Optional
 
 
 class TriviaAPIException(Exception):
     """Base exception for Trivia API."""
 
-    def __init__(self, message: str, status_code: int = 400):
+    def __init__(self, message: str, status_code: int = 400, headers: Optional[dict] = None):
         """Initialize exception."""
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(message)
 
 
@@ -25,6 +28,20 @@ class NoActiveSessionError(TriviaAPIException):
         super().__init__("No active trivia session", 400)
 
 
+class SessionNotFoundError(TriviaAPIException):
+    """Raised when a requested session does not exist."""
+
+    def __init__(self):
+        super().__init__("Trivia session not found", 404)
+
+
+class SnapshotNotFoundError(TriviaAPIException):
+    """Raised when no leaderboard snapshot exists for the requested session."""
+
+    def __init__(self):
+        super().__init__("Leaderboard snapshot not found", 404)
+
+
 class DuplicateAnswerError(TriviaAPIException):
     """Raised when user tries to answer the same question twice."""
 
@@ -37,3 +54,92 @@ class InvalidAPIKeyError(TriviaAPIException):
 
     def __init__(self):
         super().__init__("Admin access required", 403)
+
+
+class RateLimitExceededError(TriviaAPIException):
+    """Raised when a client submits answers faster than its rate limit allows."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            "Too many requests, please slow down",
+            429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class ServiceOverloadedError(TriviaAPIException):
+    """Raised when admission control sheds a request under load."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            "Server is busy, please retry shortly",
+            503,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class IdempotencyKeyInUseError(TriviaAPIException):
+    """Raised when a retry arrives while the original request is still being processed."""
+
+    def __init__(self):
+        super().__init__(
+            "A request with this Idempotency-Key is still in progress",
+            409,
+            headers={"Retry-After": "1"},
+        )
+
+
+class IdempotencyKeyMismatchError(TriviaAPIException):
+    """Raised when an Idempotency-Key is reused for a different request."""
+
+    def __init__(self):
+        super().__init__("Idempotency-Key was already used for a different answer", 422)
+
+
+class InvalidExportRequestError(TriviaAPIException):
+    """Raised when an export names an unknown table or format, or an unsupported filter."""
+
+    def __init__(self, message: str):
+        super().__init__(message, 400)
+
+
+class ExportFormatUnavailableError(TriviaAPIException):
+    """Raised when an export format needs an optional dependency that is not installed."""
+
+    def __init__(self, fmt: str):
+        super().__init__(f"{fmt} export requires pyarrow (pip install 'trivia-api[export]')", 501)
+
+
+class ExportLimitError(TriviaAPIException):
+    """Raised when the maximum number of concurrent exports is already running."""
+
+    def __init__(self):
+        super().__init__(
+            "Too many exports in progress, please retry later",
+            429,
+            headers={"Retry-After": "30"},
+        )
+
+
+class InvalidTeamImportError(TriviaAPIException):
+    """Raised when a team membership import is inconsistent."""
+
+    def __init__(self, message: str):
+        super().__init__(message, 400)
+
+
+class QueryBudgetExceededError(TriviaAPIException):
+    """Raised in dev/test mode when a request executes more SQL than its budget allows."""
+
+    def __init__(self, report: str):
+        super().__init__(f"Query budget exceeded: {report}", 500)
+
+
+class DeadlineExceededError(TriviaAPIException):
+    """Raised when a request's SQL is cancelled because it ran past its time budget."""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        super().__init__(f"Request exceeded its time budget of {budget * 1000:.0f} ms", 504)
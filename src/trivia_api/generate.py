@@ -0,0 +1,709 @@
+"""Synthetic data generator for production-scale performance testing.
+
+Writes sessions, users and attempts straight into the tables, bypassing the
+services, with realistic shapes:
+
+- user activity is Zipfian: the r-th most active user plays about
+  ``C / r ** zipf`` sessions (at least one, at most all of them), with
+  activity ranks scattered over user ids;
+- each user has a skill drawn from a Beta distribution around
+  ``correct_ratio`` and each session a difficulty, which together give the
+  chance of a correct answer;
+- sessions have log-normal popularity and length, and answers arrive in a
+  burst when the question opens followed by a long tail of late answers;
+- wrong answers come from a small vocabulary with Zipfian popularity.
+
+The result satisfies the invariants the API maintains (one attempt per user
+and session, ``cumulative_score`` equal to the correct attempts,
+``first_correct_timestamp`` at the first correct attempt), with analytics
+stored for every session and a leaderboard snapshot for the latest one.
+
+Users are generated in fixed-size chunks by worker processes, each chunk from
+its own seed, so the data depends only on the seed and sizes, not on the
+number of processes. Rows are loaded with COPY on PostgreSQL, through
+per-chunk SQLite files merged with ``INSERT ... SELECT`` on SQLite, and with
+executemany elsewhere. Secondary indexes on the user tables are dropped for
+the load and rebuilt afterwards.
+"""
+import io
+import logging
+import math
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Optional
+
+from sqlalchemy import bindparam, create_engine, func, insert, make_url, select, text, update
+from sqlalchemy.engine import Engine
+
+from trivia_api.config import get_settings
+from trivia_api.database import (
+    SessionLocal,
+    close_session,
+    get_engine,
+    get_shard_engines,
+    shard_index,
+)
+from trivia_api.schemas import AttemptRecordORM, SessionStatus, TriviaSessionORM, UserScoreORM
+from trivia_api.startup import prepare_database
+from trivia_api.utils.timestamps import from_epoch_micros
+from trivia_api.utils.validators import normalize_answer
+
+logger = logging.getLogger(__name__)
+
+# Users per chunk; a chunk is the unit of work and of seeding
+CHUNK_USERS = 20_000
+# Rows buffered per worker before they are written
+FLUSH_ROWS = 100_000
+# Multiplier scattering activity ranks over user ids (coprime with the user count)
+_RANK_MULTIPLIER = 2_654_435_761
+
+VOCABULARY = [
+    "Paris", "London", "Berlin", "Madrid", "Rome", "Vienna", "Lisbon", "Dublin",
+    "Oslo", "Helsinki", "Warsaw", "Prague", "Athens", "Cairo", "Nairobi", "Lagos",
+    "Tokyo", "Seoul", "Beijing", "Delhi", "Jakarta", "Manila", "Sydney", "Auckland",
+    "Ottawa", "Lima", "Santiago", "Bogota", "Havana", "Mexico City",
+    "Ada Lovelace", "Alan Turing", "Grace Hopper", "Marie Curie", "Isaac Newton",
+    "Albert Einstein", "Jupiter", "Saturn", "Mars", "Venus", "Mercury", "Neptune",
+]
+WRONG_ANSWERS_PER_SESSION = 8
+# Spellings of the correct answer as users type them (all normalize to it)
+_CORRECT_VARIANTS = (
+    (0.70, lambda answer: answer),
+    (0.85, str.lower),
+    (0.93, str.upper),
+    (1.00, lambda answer: f" {answer.lower()} "),
+)
+
+
+@dataclass
+class GenerateSpec:
+    """Dataset shape."""
+
+    users: int = 100_000
+    sessions: int = 200
+    attempts: int = 2_000_000
+    zipf: float = 1.1
+    correct_ratio: float = 0.35
+    days: float = 30.0
+    seed: int = 0
+
+
+@dataclass
+class SessionPlan:
+    """A generated session, shared with every worker."""
+
+    session_id: str
+    question: str
+    correct_answer: str
+    started_us: int
+    duration_us: int
+    difficulty: float
+    wrong_answers: list
+    wrong_weights: list
+
+
+@dataclass
+class GenerateReport:
+    """Outcome of a generator run."""
+
+    users: int = 0
+    sessions: int = 0
+    attempts: int = 0
+    correct: int = 0
+    phases: dict = field(default_factory=dict)
+
+    def summary(self) -> str:
+        """Human-readable summary."""
+        ratio = self.correct / self.attempts * 100 if self.attempts else 0.0
+        total = sum(self.phases.values())
+        return "\n".join(
+            [
+                f"generated {self.users} users, {self.sessions} sessions and {self.attempts} attempts "
+                f"({ratio:.1f}% correct) in {total:.1f}s "
+                f"({self.attempts / total if total else 0:.0f} attempts/s)",
+                "  " + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in self.phases.items()),
+            ]
+        )
+
+
+def activity_scale(spec: GenerateSpec) -> float:
+    """
+    Find C such that users playing ``clamp(C / rank ** zipf, 1, sessions)`` sessions
+    add up to ``spec.attempts``.
+
+    Ranks past the first 10,000 are summed in 1% buckets, which keeps this
+    fast for tens of millions of users.
+    """
+    buckets = [(rank, 1) for rank in range(1, min(spec.users, 10_000) + 1)]
+    low = len(buckets) + 1
+    while low <= spec.users:
+        high = min(spec.users, int(low * 1.01) + 1)
+        buckets.append(((low + high) / 2, high - low + 1))
+        low = high + 1
+
+    def expected(scale: float) -> float:
+        return sum(
+            count * min(spec.sessions, max(1.0, scale / rank ** spec.zipf)) for rank, count in buckets
+        )
+
+    low_scale, high_scale = 1.0, float(spec.sessions) * spec.users ** spec.zipf
+    for _ in range(100):
+        middle = math.sqrt(low_scale * high_scale)
+        if expected(middle) < spec.attempts:
+            low_scale = middle
+        else:
+            high_scale = middle
+    return high_scale
+
+
+def plan_sessions(spec: GenerateSpec, now_us: int) -> tuple[list, list]:
+    """
+    Lay out the sessions evenly over the last ``spec.days`` days.
+
+    Returns:
+        Session plans in start order, and cumulative popularity weights
+    """
+    rng = random.Random(f"{spec.seed}:sessions")
+    interval_us = int(spec.days * 86_400_000_000 / spec.sessions)
+    first_start = now_us - spec.sessions * interval_us
+    plans = []
+    popularity = []
+    for index in range(spec.sessions):
+        correct = rng.choice(VOCABULARY)
+        wrong = rng.sample([answer for answer in VOCABULARY if answer != correct], WRONG_ANSWERS_PER_SESSION)
+        duration_us = int(min(rng.lognormvariate(math.log(300), 0.6) * 1_000_000, interval_us * 0.8))
+        plans.append(
+            SessionPlan(
+                session_id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                question=f"Synthetic question {index + 1}",
+                correct_answer=normalize_answer(correct),
+                started_us=first_start + index * interval_us + int(rng.random() * interval_us * 0.1),
+                duration_us=max(duration_us, 1_000_000),
+                difficulty=rng.uniform(-0.15, 0.15),
+                wrong_answers=wrong,
+                wrong_weights=[sum(1 / (rank + 1) for rank in range(n + 1)) for n in range(len(wrong))],
+            )
+        )
+        popularity.append(rng.lognormvariate(0, 0.5))
+    cumulative = []
+    total = 0.0
+    for weight in popularity:
+        total += weight
+        cumulative.append(total)
+    return plans, cumulative
+
+
+# Row sinks. User rows are (user_id, username, cumulative_score,
+# first_correct_us, last_updated_us); attempt rows are (session_id, user_id,
+# submitted_answer, is_correct, submitted_at_us).
+
+_USER_COLUMNS = "user_id, username, cumulative_score, first_correct_timestamp, last_updated"
+_ATTEMPT_COLUMNS = "session_id, user_id, submitted_answer, is_correct, submitted_at"
+
+
+class _SQLitePartSink:
+    """Writes a chunk's rows to unindexed SQLite files, one per shard."""
+
+    def __init__(self, directory: str, chunk: int):
+        self.directory = directory
+        self.chunk = chunk
+        self.connections: dict = {}
+
+    def _connection(self, shard: int) -> sqlite3.Connection:
+        connection = self.connections.get(shard)
+        if connection is None:
+            path = os.path.join(self.directory, f"part-{self.chunk:06d}-{shard}.db")
+            connection = sqlite3.connect(path, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=OFF")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(f"CREATE TABLE user_scores ({_USER_COLUMNS})")
+            connection.execute(f"CREATE TABLE attempt_records ({_ATTEMPT_COLUMNS})")
+            self.connections[shard] = connection
+        return connection
+
+    def write(self, shard: int, users: list, attempts: list) -> None:
+        connection = self._connection(shard)
+        connection.execute("BEGIN")
+        connection.executemany("INSERT INTO user_scores VALUES (?, ?, ?, ?, ?)", users)
+        connection.executemany("INSERT INTO attempt_records VALUES (?, ?, ?, ?, ?)", attempts)
+        connection.execute("COMMIT")
+
+    def close(self) -> list:
+        parts = []
+        for shard, connection in self.connections.items():
+            parts.append((shard, os.path.join(self.directory, f"part-{self.chunk:06d}-{shard}.db")))
+            connection.close()
+        return parts
+
+
+def _copy_field(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, str):
+        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return str(value)
+
+
+class _CopySink:
+    """Streams rows into PostgreSQL with COPY (psycopg 2 or 3)."""
+
+    def __init__(self, urls: list):
+        self.engines = [create_engine(url) for url in urls]
+
+    def _copy(self, cursor, statement: str, rows: list) -> None:
+        data = "".join("\t".join(_copy_field(value) for value in row) + "\n" for row in rows)
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(statement, io.StringIO(data))
+        else:  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(data)
+
+    def write(self, shard: int, users: list, attempts: list) -> None:
+        as_timestamp = lambda micros: None if micros is None else from_epoch_micros(micros).isoformat()  # noqa: E731
+        connection = self.engines[shard].raw_connection()
+        try:
+            cursor = connection.cursor()
+            self._copy(
+                cursor,
+                f"COPY user_scores ({_USER_COLUMNS}) FROM STDIN",
+                [(u, name, score, as_timestamp(first), as_timestamp(last)) for u, name, score, first, last in users],
+            )
+            self._copy(
+                cursor,
+                f"COPY attempt_records ({_ATTEMPT_COLUMNS}) FROM STDIN",
+                [(s, u, answer, correct, as_timestamp(at)) for s, u, answer, correct, at in attempts],
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    def close(self) -> list:
+        for engine in self.engines:
+            engine.dispose()
+        return []
+
+
+class _ExecutemanySink:
+    """Inserts rows with executemany through SQLAlchemy Core (any other database)."""
+
+    def __init__(self, urls: list):
+        self.engines = [create_engine(url) for url in urls]
+
+    def write(self, shard: int, users: list, attempts: list) -> None:
+        as_datetime = lambda micros: None if micros is None else from_epoch_micros(micros)  # noqa: E731
+        with self.engines[shard].begin() as connection:
+            connection.execute(
+                insert(UserScoreORM.__table__),
+                [
+                    {
+                        "user_id": user_id,
+                        "username": username,
+                        "cumulative_score": score,
+                        "first_correct_timestamp": as_datetime(first),
+                        "last_updated": as_datetime(last),
+                    }
+                    for user_id, username, score, first, last in users
+                ],
+            )
+            connection.execute(
+                insert(AttemptRecordORM.__table__),
+                [
+                    {
+                        "session_id": session_id,
+                        "user_id": user_id,
+                        "submitted_answer": answer,
+                        "is_correct": correct,
+                        "submitted_at": as_datetime(at),
+                    }
+                    for session_id, user_id, answer, correct, at in attempts
+                ],
+            )
+
+    def close(self) -> list:
+        for engine in self.engines:
+            engine.dispose()
+        return []
+
+
+def _loader(engine: Engine) -> str:
+    if engine.dialect.name == "sqlite":
+        return "sqlite"
+    if engine.dialect.name == "postgresql" and engine.dialect.driver in ("psycopg2", "psycopg"):
+        return "copy"
+    return "executemany"
+
+
+# Worker state, set once per process by _init_worker
+_worker: dict = {}
+
+
+def _init_worker(spec: GenerateSpec, plans: list, popularity: list, scale: float,
+                 loader: str, urls: list, part_directory: str) -> None:
+    _worker.update(
+        spec=spec, plans=plans, popularity=popularity, scale=scale,
+        loader=loader, urls=urls, part_directory=part_directory,
+    )
+
+
+def _chunk_sink(chunk: int):
+    if _worker["loader"] == "sqlite":
+        return _SQLitePartSink(_worker["part_directory"], chunk)
+    if _worker["loader"] == "copy":
+        return _CopySink(_worker["urls"])
+    return _ExecutemanySink(_worker["urls"])
+
+
+def _choose_sessions(rng: random.Random, played: int, sessions: int, popularity: list):
+    session_range = range(sessions)
+    if played * 2 >= sessions:
+        return rng.sample(session_range, played)
+    chosen = set()
+    while len(chosen) < played:
+        chosen.update(rng.choices(session_range, cum_weights=popularity, k=played - len(chosen)))
+    return chosen
+
+
+def _generate_chunk(chunk: int) -> dict:
+    """
+    Generate and write the users of one chunk with their attempts.
+
+    Returns:
+        Row counts, per-session analytics counts and any SQLite part files
+    """
+    spec: GenerateSpec = _worker["spec"]
+    plans: list = _worker["plans"]
+    popularity: list = _worker["popularity"]
+    scale: float = _worker["scale"]
+    shard_count = len(_worker["urls"])
+    sink = _chunk_sink(chunk)
+
+    rng = random.Random(f"{spec.seed}:users:{chunk}")
+    skill_a = spec.correct_ratio * 4
+    skill_b = (1 - spec.correct_ratio) * 4
+    # session index -> [total, correct, Counter(wrong answer), {second: [total, correct]}]
+    analytics = defaultdict(lambda: [0, 0, Counter(), defaultdict(lambda: [0, 0])])
+    users = defaultdict(list)
+    attempts = defaultdict(list)
+    buffered = 0
+    attempt_count = correct_count = 0
+
+    first_user = chunk * CHUNK_USERS + 1
+    for user_id in range(first_user, min(first_user + CHUNK_USERS, spec.users + 1)):
+        rank = ((user_id - 1) * _RANK_MULTIPLIER) % spec.users + 1
+        activity = scale / rank ** spec.zipf
+        played = int(activity) + (rng.random() < activity - int(activity))
+        played = min(spec.sessions, max(1, played))
+        chosen = _choose_sessions(rng, played, spec.sessions, popularity)
+
+        username = f"user{user_id:09d}"
+        shard = shard_index(username, shard_count) if shard_count > 1 else 0
+        skill = rng.betavariate(skill_a, skill_b)
+        score = 0
+        first_seen = first_correct = last_correct = None
+        for index in chosen:
+            plan = plans[index]
+            # Beta(1, 8)-shaped delay: a burst at question open and a long tail
+            submitted_at = plan.started_us + int(plan.duration_us * (1.0 - (1.0 - rng.random()) ** 0.125))
+            is_correct = rng.random() < skill + plan.difficulty
+            stats = analytics[index]
+            stats[0] += 1
+            bucket = stats[3][submitted_at // 1_000_000]
+            bucket[0] += 1
+            if is_correct:
+                draw = rng.random()
+                answer = next(variant for limit, variant in _CORRECT_VARIANTS if draw <= limit)(
+                    plan.correct_answer.title()
+                )
+                score += 1
+                stats[1] += 1
+                bucket[1] += 1
+                if first_correct is None or submitted_at < first_correct:
+                    first_correct = submitted_at
+                if last_correct is None or submitted_at > last_correct:
+                    last_correct = submitted_at
+            else:
+                answer = rng.choices(plan.wrong_answers, cum_weights=plan.wrong_weights)[0]
+                stats[2][answer] += 1
+            if first_seen is None or submitted_at < first_seen:
+                first_seen = submitted_at
+            attempts[shard].append((plan.session_id, user_id, answer, is_correct, submitted_at))
+
+        # Mirrors the services: created at the first answer, updated on each correct one
+        users[shard].append((user_id, username, score, first_correct, last_correct or first_seen))
+        attempt_count += played
+        correct_count += score
+        buffered += played + 1
+        if buffered >= FLUSH_ROWS:
+            for shard_rows in list(users):
+                sink.write(shard_rows, users.pop(shard_rows), attempts.pop(shard_rows, []))
+            buffered = 0
+
+    for shard_rows in list(users):
+        sink.write(shard_rows, users.pop(shard_rows), attempts.pop(shard_rows, []))
+    parts = sink.close()
+
+    return {
+        "users": min(first_user + CHUNK_USERS, spec.users + 1) - first_user,
+        "attempts": attempt_count,
+        "correct": correct_count,
+        "analytics": {
+            index: (total, correct, dict(wrong), {second: tuple(counts) for second, counts in seconds.items()})
+            for index, (total, correct, wrong, seconds) in analytics.items()
+        },
+        "parts": parts,
+    }
+
+
+def _merge_sqlite_part(connection: sqlite3.Connection, path: str) -> None:
+    connection.execute("ATTACH DATABASE ? AS part", (path,))
+    try:
+        connection.execute("BEGIN")
+        connection.execute(f"INSERT INTO user_scores ({_USER_COLUMNS}) SELECT * FROM part.user_scores")
+        connection.execute(f"INSERT INTO attempt_records ({_ATTEMPT_COLUMNS}) SELECT * FROM part.attempt_records")
+        connection.execute("COMMIT")
+    finally:
+        connection.execute("DETACH DATABASE part")
+    os.remove(path)
+
+
+def _user_indexes() -> list:
+    return [index for table in (UserScoreORM.__table__, AttemptRecordORM.__table__) for index in table.indexes]
+
+
+def _session_analytics(plan: SessionPlan, counts: list) -> dict:
+    from trivia_api.services.analytics_service import AnswerAnalytics
+
+    analytics = AnswerAnalytics._new(plan.session_id)
+    analytics.total, analytics.correct = counts[0], counts[1]
+    for answer, count in sorted(counts[2].items(), key=lambda item: -item[1]):
+        analytics.wrong_answers.add(normalize_answer(answer), count)
+    for second in sorted(counts[3])[-analytics.max_seconds:]:
+        analytics.per_second[second] = list(counts[3][second])
+    return analytics.summary(get_settings().ANALYTICS_TOP_ANSWERS)
+
+
+def _validate(spec: GenerateSpec) -> None:
+    if get_settings().STORAGE_ENGINE == "memory":
+        raise ValueError("the in-memory engine is owned by the server; generate into a SQL database")
+    if spec.users < 1 or spec.sessions < 1:
+        raise ValueError("users and sessions must be positive")
+    if not spec.users <= spec.attempts <= spec.users * spec.sessions:
+        raise ValueError("attempts must be between users and users x sessions (each user answers at least once and at most once per session)")
+    if not 0 < spec.correct_ratio < 1:
+        raise ValueError("correct_ratio must be between 0 and 1")
+
+
+def _check_empty(main_engine: Engine, user_engines: list) -> None:
+    with main_engine.connect() as connection:
+        if connection.scalar(select(func.count()).select_from(TriviaSessionORM.__table__)):
+            raise ValueError("trivia_sessions is not empty; generate into a new database")
+    for engine in user_engines:
+        with engine.connect() as connection:
+            if connection.scalar(select(func.count()).select_from(UserScoreORM.__table__)):
+                raise ValueError("user_scores is not empty; generate into a new database")
+
+
+def _insert_sessions(main_engine: Engine, plans: list) -> None:
+    with main_engine.begin() as connection:
+        connection.execute(
+            insert(TriviaSessionORM.__table__),
+            [
+                {
+                    "session_id": plan.session_id,
+                    "question": plan.question,
+                    "correct_answer": plan.correct_answer,
+                    "status": SessionStatus.ENDED,
+                    "started_at": from_epoch_micros(plan.started_us),
+                    "ended_at": from_epoch_micros(plan.started_us + plan.duration_us),
+                }
+                for plan in plans
+            ],
+        )
+
+
+def _drop_indexes(user_engines: list) -> None:
+    for engine in user_engines:
+        for index in _user_indexes():
+            index.drop(bind=engine, checkfirst=True)
+
+
+def _rebuild_indexes(user_engines: list) -> None:
+    for engine in user_engines:
+        for index in _user_indexes():
+            index.create(bind=engine, checkfirst=True)
+        with engine.begin() as connection:
+            if engine.dialect.name == "postgresql":
+                connection.execute(
+                    text(
+                        "SELECT setval(pg_get_serial_sequence('user_scores', 'user_id'), "
+                        "(SELECT MAX(user_id) FROM user_scores))"
+                    )
+                )
+            connection.execute(text("ANALYZE"))
+
+
+def _sqlite_targets(urls: list) -> list:
+    targets = []
+    try:
+        for url in urls:
+            database = make_url(url).database
+            if not database or database == ":memory:":
+                raise ValueError("generating into SQLite needs a file database")
+            target = sqlite3.connect(database, isolation_level=None, timeout=60)
+            target.execute("PRAGMA synchronous=OFF")
+            targets.append(target)
+    except BaseException:
+        for target in targets:
+            target.close()
+        raise
+    return targets
+
+
+def _collect(report: GenerateReport, session_counts: dict, targets: list, result: dict) -> None:
+    report.users += result["users"]
+    report.attempts += result["attempts"]
+    report.correct += result["correct"]
+    for index, (total, correct, wrong, seconds) in result["analytics"].items():
+        counts = session_counts.setdefault(index, [0, 0, Counter(), Counter(), Counter()])
+        counts[0] += total
+        counts[1] += correct
+        counts[2].update(wrong)
+        for second, (second_total, second_correct) in seconds.items():
+            counts[3][second] += second_total
+            counts[4][second] += second_correct
+    for shard, path in result["parts"]:
+        _merge_sqlite_part(targets[shard], path)
+
+
+def _load_users(spec: GenerateSpec, processes: int, init_args: tuple, collect) -> None:
+    chunks = range(math.ceil(spec.users / CHUNK_USERS))
+    if not processes:
+        _init_worker(*init_args)
+        for chunk in chunks:
+            collect(_generate_chunk(chunk))
+        return
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=init_args,
+    ) as pool:
+        futures = [pool.submit(_generate_chunk, chunk) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), 1):
+            collect(future.result())
+            if done % max(1, len(futures) // 10) == 0:
+                logger.info("Loaded %d/%d chunks", done, len(futures))
+
+
+def _store_analytics(main_engine: Engine, plans: list, session_counts: dict) -> None:
+    rows = []
+    for index, plan in enumerate(plans):
+        total, correct, wrong, second_totals, second_correct = session_counts.get(
+            index, [0, 0, Counter(), Counter(), Counter()]
+        )
+        seconds = {second: (second_totals[second], second_correct[second]) for second in second_totals}
+        rows.append(
+            {"id": plan.session_id, "analytics": _session_analytics(plan, [total, correct, wrong, seconds])}
+        )
+    with main_engine.begin() as connection:
+        connection.execute(
+            update(TriviaSessionORM.__table__)
+            .where(TriviaSessionORM.__table__.c.session_id == bindparam("id"))
+            .values(analytics=bindparam("analytics")),
+            rows,
+        )
+
+
+def _capture_snapshot(session_id: str) -> None:
+    from trivia_api.services.rank_snapshot_service import RankSnapshotService
+
+    db = SessionLocal()
+    try:
+        RankSnapshotService.capture(db, session_id)
+        db.commit()
+    finally:
+        close_session(db)
+
+
+def run(spec: GenerateSpec, processes: Optional[int] = None, snapshot: bool = True) -> GenerateReport:
+    """
+    Generate a dataset into DATABASE_URL (and SHARD_DATABASE_URLS).
+
+    The schema is prepared according to DB_STARTUP_MODE; the tables must be empty.
+
+    Args:
+        spec: Dataset shape and seed
+        processes: Worker processes (default: one per CPU; 0 generates in this process)
+        snapshot: Capture a leaderboard snapshot for the latest session
+
+    Returns:
+        GenerateReport with row counts and phase timings
+
+    Raises:
+        ValueError: If the spec is invalid, the memory engine is configured or
+            the database already holds data
+    """
+    _validate(spec)
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    report = GenerateReport(sessions=spec.sessions)
+    started = time.perf_counter()
+
+    def phase(name: str) -> None:
+        nonlocal started
+        now = time.perf_counter()
+        report.phases[name] = now - started
+        started = now
+
+    main_engine = get_engine()
+    user_engines = get_shard_engines() or [main_engine]
+    prepare_database(get_settings(), [main_engine, *get_shard_engines()])
+    _check_empty(main_engine, user_engines)
+
+    plans, popularity = plan_sessions(spec, int(time.time() * 1_000_000))
+    _insert_sessions(main_engine, plans)
+    scale = activity_scale(spec)
+    phase("sessions")
+
+    _drop_indexes(user_engines)
+    phase("drop indexes")
+
+    loader = _loader(main_engine)
+    urls = [engine.url.render_as_string(hide_password=False) for engine in user_engines]
+    targets = _sqlite_targets(urls) if loader == "sqlite" else []
+    part_directory = tempfile.mkdtemp(prefix="trivia-generate-")
+    session_counts: dict = {}
+    try:
+        _load_users(
+            spec,
+            processes,
+            (spec, plans, popularity, scale, loader, urls, part_directory),
+            lambda result: _collect(report, session_counts, targets, result),
+        )
+    finally:
+        for target in targets:
+            target.close()
+        shutil.rmtree(part_directory, ignore_errors=True)
+    phase("users and attempts")
+
+    _rebuild_indexes(user_engines)
+    phase("indexes")
+
+    _store_analytics(main_engine, plans, session_counts)
+    if snapshot:
+        _capture_snapshot(plans[-1].session_id)
+    phase("analytics and snapshot")
+
+    return report
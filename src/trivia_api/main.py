@@ -1,5 +1,6 @@
 """FastAPI application initialization and configuration."""
 import logging
+import time
 from contextlib import asynccontextmanager
 
 
@@ -8,10 +9,35 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from trivia_api import IMPORT_STARTED
 from trivia_api.config import get_settings
-from trivia_api.database import Base, engine
+from trivia_api.database import (
+    SessionLocal,
+    close_session,
+    get_engine,
+    get_shard_engines,
+    start_read_replica,
+    stop_read_replica,
+)
 from trivia_api.errors import TriviaAPIException
-from trivia_api.api import session, question, answer, attempts, leaderboard
+from trivia_api.api import session, question, answer, attempts, leaderboard, analytics, export, metrics, teams
+from trivia_api.services.answered_users_cache import answered_users
+from trivia_api.services.session_service import SessionService
+from trivia_api.services.shared_leaderboard import start_shared_leaderboard, stop_shared_leaderboard
+from trivia_api.storage import close_memory_engine, open_memory_engine
+from trivia_api.middleware.admission import AdmissionControlMiddleware
+from trivia_api.middleware.capture import RequestCaptureMiddleware
+from trivia_api.middleware.deadline import DeadlineMiddleware
+from trivia_api.middleware.metrics import MetricsMiddleware
+from trivia_api.middleware.query_budget import QueryBudgetMiddleware
+from trivia_api.utils.admission import AdmissionController
+from trivia_api.utils.auth import get_admin_keyring
+from trivia_api.utils.capture import RequestRecorder
+from trivia_api.utils.deadline import TimeBudget, install_deadline_enforcement
+from trivia_api.utils.metrics import install_query_listeners
+from trivia_api.utils.profiling import SlowRequestProfiler
+from trivia_api.utils.query_budget import QueryBudget, parse_budget_overrides
+from trivia_api.startup import prepare_database, record_startup_phase
 
 # Configure logging
 settings = get_settings()
@@ -23,14 +49,45 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Handle application startup and shutdown."""
     # Startup
-    logger.info("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    get_admin_keyring()  # Hash admin keys once, before the first admin call
+
+    if settings.STORAGE_ENGINE == "memory":
+        logger.info("Loading memory engine from %s...", settings.MEMORY_DATA_DIR)
+        open_memory_engine(settings)
+    elif settings.STORAGE_ENGINE == "sql":
+        logger.info("Preparing database (mode=%s)...", settings.DB_STARTUP_MODE)
+        prepare_database(settings, [get_engine(), *get_shard_engines()])
+
+        # Warm the duplicate-answer filter for a session already in progress
+        db = SessionLocal()
+        try:
+            active_session = SessionService.get_active_session(db)
+            if active_session:
+                answered_users.seed(db, active_session.session_id)
+        finally:
+            close_session(db)
+
+        if start_read_replica(settings) is not None:
+            logger.info("Read-only endpoints use a replica (max staleness %.1fs)",
+                        settings.READ_REPLICA_MAX_STALENESS_SECONDS)
+        if start_shared_leaderboard(settings) is not None:
+            logger.info("Leaderboard pages are served from %s", settings.SHARED_LEADERBOARD_PATH)
+    else:
+        raise ValueError(f"Unknown STORAGE_ENGINE {settings.STORAGE_ENGINE!r}")
+
+    record_startup_phase("startup", time.perf_counter() - started)
     logger.info("Application started")
 
     yield
 
     # Shutdown
     logger.info("Application shutting down")
+    close_memory_engine()
+    if capture_recorder is not None:
+        capture_recorder.close()
+    stop_shared_leaderboard()
+    stop_read_replica()
 
 
 # Create FastAPI app instance
@@ -50,6 +107,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-endpoint query budgets for dev/test runs (inside the metrics middleware)
+if settings.QUERY_BUDGET_MODE != "off":
+    install_query_listeners()
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        budget=QueryBudget(
+            settings.QUERY_BUDGET_DEFAULT,
+            parse_budget_overrides(settings.QUERY_BUDGET_OVERRIDES),
+        ),
+        mode=settings.QUERY_BUDGET_MODE,
+    )
+
+# Load shedding; inside the metrics middleware so 503s are measured
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=AdmissionController(
+            max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+        ),
+    )
+
+# Per-route time budgets; outside admission control so queueing time counts
+if settings.TIME_BUDGET_ENABLED:
+    install_deadline_enforcement()
+    app.add_middleware(
+        DeadlineMiddleware,
+        budget=TimeBudget(
+            settings.TIME_BUDGET_DEFAULT_MS,
+            parse_budget_overrides(settings.TIME_BUDGET_OVERRIDES, cast=float),
+        ),
+    )
+
+# Per-route latency and DB usage metrics, with optional slow-request profiling
+if settings.METRICS_ENABLED:
+    install_query_listeners()
+    profiler = None
+    if settings.PROFILE_SLOW_REQUEST_MS > 0:
+        profiler = SlowRequestProfiler(
+            threshold=settings.PROFILE_SLOW_REQUEST_MS / 1000,
+            interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000,
+            output_dir=settings.PROFILE_OUTPUT_DIR,
+        )
+    app.add_middleware(MetricsMiddleware, profiler=profiler)
+
+# Request capture for trivia-api replay; outermost so durations include queueing
+capture_recorder = None
+if settings.CAPTURE_DIR:
+    capture_recorder = RequestRecorder(
+        settings.CAPTURE_DIR,
+        sample_rate=settings.CAPTURE_SAMPLE_RATE,
+        max_body_bytes=settings.CAPTURE_MAX_BODY_BYTES,
+    )
+    app.add_middleware(RequestCaptureMiddleware, recorder=capture_recorder)
+
 
 @app.exception_handler(TriviaAPIException)
 async def trivia_api_exception_handler(request: Request, exc: TriviaAPIException):
@@ -60,6 +173,7 @@ async def trivia_api_exception_handler(request: Request, exc: TriviaAPIException
             "status": "error",
             "message": exc.message,
         },
+        headers=exc.headers,
     )
 
 
@@ -94,5 +208,11 @@ app.include_router(question.router)
 app.include_router(answer.router)
 app.include_router(attempts.router)
 app.include_router(leaderboard.router)
+app.include_router(analytics.router)
+app.include_router(export.router)
+app.include_router(teams.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
+record_startup_phase("import", time.perf_counter() - IMPORT_STARTED)
 logger.info("FastAPI application initialized")
@@ -0,0 +1,52 @@
+"""ASGI middleware applying admission control to API routes."""
+import json
+import time
+
+from trivia_api.errors import ServiceOverloadedError
+from trivia_api.utils.admission import PRIORITY_ADMIN, PRIORITY_NORMAL, AdmissionController
+
+# Session start/end keep working while answer traffic is being shed
+ADMIN_PATH_PREFIX = "/api/trivia/session/"
+
+
+class AdmissionControlMiddleware:
+    """
+    Admit API requests through an AdmissionController.
+
+    Requests that cannot be admitted in time are answered with 503 and a
+    Retry-After header before any routing or database work. Paths outside
+    ``/api/`` (health checks, metrics, docs) are never queued.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        priority = PRIORITY_ADMIN if scope["path"].startswith(ADMIN_PATH_PREFIX) else PRIORITY_NORMAL
+        try:
+            await self.controller.acquire(priority)
+        except ServiceOverloadedError as error:
+            await self._send_error(send, error)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.perf_counter() - started)
+
+    @staticmethod
+    async def _send_error(send, error: ServiceOverloadedError) -> None:
+        body = json.dumps({"status": "error", "message": error.message}).encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        headers.extend((name.lower().encode(), value.encode()) for name, value in error.headers.items())
+        await send({"type": "http.response.start", "status": error.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,89 @@
+"""ASGI middleware capturing API requests with their timing for replay."""
+import time
+
+from trivia_api.middleware.metrics import route_label
+from trivia_api.utils.capture import (
+    ALWAYS_CAPTURED_PREFIX,
+    CAPTURED_HEADERS,
+    RequestRecorder,
+    encode_body,
+    session_id_from,
+)
+
+
+def _captured_headers(scope) -> tuple[dict, bool]:
+    """Get the replayed headers and whether an admin key was sent (never its value)."""
+    headers = {}
+    admin = False
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").lower()
+        if name == "x-api-key":
+            admin = True
+        elif name in CAPTURED_HEADERS:
+            headers[name] = value.decode("latin-1")
+    return headers, admin
+
+
+class RequestCaptureMiddleware:
+    """
+    Record every (sampled) API request to a RequestRecorder.
+
+    The request body is copied as the application reads it, and the duration
+    covers the whole request including admission queueing. For session
+    routes the response body is inspected for a ``session_id`` so replay can
+    substitute the ids its own sessions get.
+    """
+
+    def __init__(self, app, recorder: RequestRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.recorder.should_capture(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        response_body = bytearray()
+        status_code = 500
+        inspect_response = scope["path"].startswith(ALWAYS_CAPTURED_PREFIX)
+        max_body_bytes = self.recorder.max_body_bytes
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request" and len(body) <= max_body_bytes:
+                body.extend(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif inspect_response and message["type"] == "http.response.body":
+                response_body.extend(message.get("body", b""))
+            await send(message)
+
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            headers, admin = _captured_headers(scope)
+            entry = {
+                "ts": round(started_at, 6),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "route": route_label(scope),
+                "status": status_code,
+                "duration": round(duration, 6),
+                "admin": admin,
+                "headers": headers,
+            }
+            entry.update(encode_body(bytes(body), max_body_bytes))
+            if inspect_response and status_code == 200:
+                session_id = session_id_from(bytes(response_body))
+                if session_id:
+                    entry["session_id"] = session_id
+            self.recorder.record(entry)
@@ -0,0 +1,27 @@
+"""ASGI middleware starting each API request's deadline."""
+from trivia_api.utils.deadline import Deadline, TimeBudget, current_deadline
+
+
+class DeadlineMiddleware:
+    """
+    Start the clock for every API request when it arrives.
+
+    Time spent queueing in admission control counts against the budget. The
+    budget itself is bound once the route is known (by the database session
+    dependencies) and enforced on the request's SQL statements.
+    """
+
+    def __init__(self, app, budget: TimeBudget):
+        self.app = app
+        self.budget = budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        token = current_deadline.set(Deadline(self.budget))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_deadline.reset(token)
@@ -0,0 +1,57 @@
+"""ASGI middleware recording per-route latency and database usage."""
+import time
+from typing import Optional
+
+from trivia_api.utils.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    REQUEST_LATENCY,
+    RequestStats,
+    current_request_stats,
+)
+from trivia_api.utils.profiling import SlowRequestProfiler
+
+
+def route_label(scope) -> str:
+    """Return the matched route template, keeping metric label cardinality bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Record latency, query count and query time for every HTTP request."""
+
+    def __init__(self, app, profiler: Optional[SlowRequestProfiler] = None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        trace = self.profiler.start_trace() if self.profiler else None
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            current_request_stats.reset(token)
+
+            method = scope["method"]
+            route = route_label(scope)
+            REQUEST_LATENCY.observe(method, route, str(status_code), value=duration)
+            DB_QUERIES_PER_REQUEST.observe(method, route, value=stats.query_count)
+            DB_TIME_PER_REQUEST.observe(method, route, value=stats.query_time)
+            if trace is not None:
+                self.profiler.finish_trace(trace, duration, f"{method} {route}")
@@ -0,0 +1,78 @@
+"""ASGI middleware enforcing per-endpoint SQL query budgets in dev/test."""
+import json
+import logging
+
+from trivia_api.errors import QueryBudgetExceededError
+from trivia_api.middleware.metrics import route_label
+from trivia_api.utils.metrics import RequestStats, current_request_stats
+from trivia_api.utils.query_budget import QueryBudget
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """
+    Report per-request query counts and repeated statements.
+
+    In ``warn`` mode violations are logged. In ``raise`` mode a request that
+    exceeds its budget is answered with a 500 error instead of its normal
+    response, so the test that issued it fails. Statements executed after the
+    response has started (streaming bodies) are only logged.
+    """
+
+    def __init__(self, app, budget: QueryBudget, mode: str = "warn"):
+        self.app = app
+        self.budget = budget
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Share the metrics middleware's stats when present, otherwise collect our own
+        stats = current_request_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestStats()
+            token = current_request_stats.set(stats)
+        stats.statements = []
+
+        suppressed = False
+
+        async def send_wrapper(message):
+            nonlocal suppressed
+            if message["type"] == "http.response.start":
+                endpoint = f"{scope['method']} {route_label(scope)}"
+                if stats.query_count > self.budget.limit_for(endpoint) and self.mode == "raise":
+                    suppressed = True
+                    await self._send_error(send, self.budget.report(endpoint, stats))
+                    return
+            if not suppressed:
+                await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                current_request_stats.reset(token)
+
+        report = self.budget.report(f"{scope['method']} {route_label(scope)}", stats)
+        if report:
+            logger.warning("Query budget report:\n%s", report)
+
+    @staticmethod
+    async def _send_error(send, report: str) -> None:
+        error = QueryBudgetExceededError(report)
+        body = json.dumps({"status": "error", "message": error.message}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": error.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
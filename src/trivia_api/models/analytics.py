@@ -0,0 +1,50 @@
+"""Pydantic models for answer analytics endpoints."""
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class WrongAnswerCount(BaseModel):
+    """A frequently submitted wrong answer."""
+
+    answer: str = Field(description="Normalized answer text")
+    count: int = Field(description="Number of submissions (upper bound)")
+    max_overcount: int = Field(description="Maximum amount by which count may exceed the true count")
+
+
+class SecondBucket(BaseModel):
+    """Submissions received during one second."""
+
+    timestamp: str = Field(description="ISO 8601 UTC start of the second")
+    total: int = Field(description="Answers submitted")
+    correct: int = Field(description="Correct answers submitted")
+
+
+class SessionAnalyticsResponse(BaseModel):
+    """Response model for session answer analytics."""
+
+    status: str = Field(description="Status of operation")
+    session_id: str = Field(description="Session identifier")
+    is_active: bool = Field(description="Whether the session is still active (live, per-worker data)")
+    total_answers: int = Field(description="Answers submitted")
+    correct_answers: int = Field(description="Correct answers submitted")
+    correct_ratio: Optional[float] = Field(default=None, description="Share of correct answers")
+    top_wrong_answers: list[WrongAnswerCount] = Field(description="Most common wrong answers")
+    answers_per_second: list[SecondBucket] = Field(description="Submission rate over time")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "status": "success",
+                "session_id": "550e8400-e29b-41d4-a716-446655440000",
+                "is_active": False,
+                "total_answers": 3,
+                "correct_answers": 1,
+                "correct_ratio": 0.3333333333333333,
+                "top_wrong_answers": [{"answer": "lyon", "count": 2, "max_overcount": 0}],
+                "answers_per_second": [
+                    {"timestamp": "2025-11-11T14:30:45Z", "total": 3, "correct": 1}
+                ],
+            }
+        }
+    }
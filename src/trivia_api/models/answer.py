@@ -42,3 +42,72 @@ class AnswerResponse(BaseModel):
             },
         }
     }
+
+
+# Most answers accepted by one batch submission
+MAX_ANSWER_BATCH = 100
+
+
+class AnswerBatchItem(AnswerSubmitRequest):
+    """One answer in a batch submission."""
+
+    idempotency_key: Optional[str] = Field(
+        default=None, max_length=255, description="Replays the original result when retried"
+    )
+
+
+class AnswerBatchRequest(BaseModel):
+    """Request model for submitting several answers at once."""
+
+    answers: list[AnswerBatchItem] = Field(
+        ..., min_length=1, max_length=MAX_ANSWER_BATCH, description="Answers, processed in order"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "answers": [
+                    {"username": "john_doe", "answer": "Paris", "idempotency_key": "3f1c9a"},
+                    {"username": "alice_smith", "answer": "Lyon"},
+                ]
+            }
+        }
+    }
+
+
+class AnswerBatchResult(BaseModel):
+    """Outcome of one answer in a batch submission."""
+
+    status: str = Field(description='"success", or "error" if the answer was rejected')
+    status_code: int = Field(description="HTTP status the single-answer endpoint would have returned")
+    message: str = Field(description="Human-readable message")
+    is_correct: Optional[bool] = Field(default=None, description="Whether the answer is correct (if accepted)")
+    score: Optional[int] = Field(default=None, description="Updated score if answer was correct")
+    retry_after: Optional[int] = Field(
+        default=None, description="Seconds to wait before retrying a rejected answer, if retryable"
+    )
+
+
+class AnswerBatchResponse(BaseModel):
+    """Response model for a batch answer submission."""
+
+    status: str = Field(description="Status of operation")
+    results: list[AnswerBatchResult] = Field(
+        default_factory=list, description="One result per submitted answer, in request order"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "status": "success",
+                "results": [
+                    {"status": "success", "status_code": 200, "message": "Correct!", "is_correct": True, "score": 3},
+                    {
+                        "status": "error",
+                        "status_code": 400,
+                        "message": "You have already answered this question",
+                    },
+                ],
+            }
+        }
+    }
@@ -1,6 +1,11 @@
 """Pydantic models for leaderboard endpoints."""
+from typing import Annotated, Optional
+
 from pydantic import BaseModel, Field
 
+# Most usernames accepted by one batch rank lookup
+MAX_RANK_LOOKUP_USERNAMES = 500
+
 
 class LeaderboardEntry(BaseModel):
     """Model for a single leaderboard entry."""
@@ -52,3 +57,80 @@ class LeaderboardResponse(BaseModel):
             }
         }
     }
+
+
+class RankMovementResponse(BaseModel):
+    """Response model for a user's rank movement after a session."""
+
+    status: str = Field(description="Status of operation")
+    session_id: str = Field(description="Session the ranks were captured at")
+    username: str = Field(description="Username")
+    rank: Optional[int] = Field(default=None, description="Rank after the session (null if unranked)")
+    previous_rank: Optional[int] = Field(
+        default=None, description="Rank after the previous session (null if unranked then)"
+    )
+    delta: Optional[int] = Field(
+        default=None, description="Places moved up (negative when moving down)"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "status": "success",
+                "session_id": "550e8400-e29b-41d4-a716-446655440000",
+                "username": "john_doe",
+                "rank": 3,
+                "previous_rank": 15,
+                "delta": 12,
+            }
+        }
+    }
+
+
+class RankLookupRequest(BaseModel):
+    """Request model for looking up several users' ranks at once."""
+
+    usernames: list[Annotated[str, Field(min_length=1, max_length=100)]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_RANK_LOOKUP_USERNAMES,
+        description="Usernames to look up (e.g. a friend list)",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "usernames": ["john_doe", "alice_smith", "new_player"],
+            }
+        }
+    }
+
+
+class UserRankEntry(BaseModel):
+    """Model for one user's score and rank."""
+
+    username: str = Field(description="Username of the participant")
+    score: int = Field(description="Cumulative score across all sessions (0 if unknown)")
+    rank: Optional[int] = Field(default=None, description="Rank position (null if unranked)")
+
+
+class RankLookupResponse(BaseModel):
+    """Response model for a batch rank lookup."""
+
+    status: str = Field(description="Status of operation")
+    ranks: list[UserRankEntry] = Field(
+        default_factory=list, description="One entry per distinct requested username, in request order"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "status": "success",
+                "ranks": [
+                    {"username": "john_doe", "score": 5, "rank": 1},
+                    {"username": "alice_smith", "score": 3, "rank": 2},
+                    {"username": "new_player", "score": 0, "rank": None},
+                ],
+            }
+        }
+    }
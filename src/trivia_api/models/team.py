@@ -0,0 +1,78 @@
+"""Pydantic models for team endpoints."""
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+# Most teams and members accepted by one membership import
+MAX_IMPORT_TEAMS = 1000
+MAX_IMPORT_MEMBERS = 50_000
+
+
+class TeamMembers(BaseModel):
+    """A team and its complete member list."""
+
+    name: str = Field(..., min_length=1, max_length=100, description="Team name")
+    members: list[Annotated[str, Field(min_length=1, max_length=100)]] = Field(
+        default_factory=list,
+        max_length=MAX_IMPORT_MEMBERS,
+        description="Usernames of all members (replaces the current membership)",
+    )
+
+
+class TeamImportRequest(BaseModel):
+    """Request model for importing team memberships."""
+
+    teams: list[TeamMembers] = Field(
+        ..., min_length=1, max_length=MAX_IMPORT_TEAMS, description="Teams to create or update"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "teams": [
+                    {"name": "Platform", "members": ["john_doe", "alice_smith"]},
+                    {"name": "Design", "members": ["bob_jones"]},
+                ]
+            }
+        }
+    }
+
+
+class TeamImportResponse(BaseModel):
+    """Response model for a team membership import."""
+
+    status: str = Field(description="Status of operation")
+    message: str = Field(description="Human-readable message")
+    teams: int = Field(description="Teams imported")
+    members: int = Field(description="Memberships set")
+
+
+class TeamLeaderboardEntry(BaseModel):
+    """Model for a single team leaderboard entry."""
+
+    rank: int = Field(description="Rank position (1-indexed)")
+    team: str = Field(description="Team name")
+    score: int = Field(description="Sum of the members' cumulative scores")
+    members: int = Field(description="Number of members")
+
+
+class TeamLeaderboardResponse(BaseModel):
+    """Response model for the team leaderboard."""
+
+    status: str = Field(description="Status of operation")
+    leaderboard: list[TeamLeaderboardEntry] = Field(
+        default_factory=list,
+        description="Ranked teams, by score descending with ties going to the team that reached its score first",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "status": "success",
+                "leaderboard": [
+                    {"rank": 1, "team": "Platform", "score": 42, "members": 12},
+                    {"rank": 2, "team": "Design", "score": 17, "members": 5},
+                ],
+            }
+        }
+    }
@@ -0,0 +1,324 @@
+"""Replay of captured traffic for offline performance testing.
+
+Reads request logs written by the capture middleware (``CAPTURE_DIR``) and
+re-issues the requests with their original spacing, optionally sped up, then
+compares each route's latency with the captured latency.
+
+By default the requests go to an in-process copy of the application whose
+database and every other persistent store point into a scratch directory, so
+production data is never touched; with ``url`` they go to a running server
+(for example ``trivia-api serve`` on a scratch database) instead.
+
+Causality around sessions is kept: a session start or end waits for the
+requests before it, later requests wait for it, and captured session ids are
+replaced by the ids the replayed sessions got. If the capture begins mid-session, a
+session is started before the replay so answers are not rejected; it has a
+placeholder correct answer, so scores will differ from production.
+
+Environment variables must be set before the application is imported, so
+``run`` configures them and imports ``trivia_api.main`` lazily.
+"""
+import asyncio
+import os
+import secrets
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from trivia_api.utils.capture import ALWAYS_CAPTURED_PREFIX, decode_body, read_captures, session_id_from
+
+SESSION_START_PATH = "/api/trivia/session/start"
+ANSWER_ROUTES = ("/api/trivia/answer", "/api/trivia/answers")
+
+
+@dataclass
+class RouteStats:
+    """Captured and replayed latencies of one route."""
+
+    captured: list = field(default_factory=list)
+    replayed: list = field(default_factory=list)
+    status_mismatches: int = 0
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of a replay."""
+
+    speed: float = 1.0
+    requests: int = 0
+    skipped: int = 0
+    captured_span: float = 0.0
+    elapsed: float = 0.0
+    max_lag: float = 0.0
+    new_server_errors: int = 0
+    transport_errors: int = 0
+    routes: dict = field(default_factory=lambda: defaultdict(RouteStats))
+
+    @property
+    def ok(self) -> bool:
+        """True if every request got a response and none newly failed with 5xx."""
+        return not self.new_server_errors and not self.transport_errors
+
+    def summary(self) -> str:
+        """Human-readable summary with per-route latency deviation."""
+        lines = [
+            f"replayed {self.requests} requests ({self.skipped} skipped) spanning "
+            f"{self.captured_span:.1f}s of capture in {self.elapsed:.1f}s at {self.speed:g}x; "
+            f"max schedule lag {self.max_lag * 1000:.1f}ms",
+            f"{'route':<40} {'n':>6} {'cap p50':>8} {'rep p50':>8} {'Δp50':>6} "
+            f"{'cap p99':>8} {'rep p99':>8} {'Δp99':>6} {'status≠':>7}",
+        ]
+        by_count = sorted(self.routes.items(), key=lambda item: -len(item[1].replayed))
+        for route, stats in by_count:
+            if not stats.replayed:
+                continue
+            captured = [_percentile(stats.captured, p) * 1000 for p in (0.5, 0.99)]
+            replayed = [_percentile(stats.replayed, p) * 1000 for p in (0.5, 0.99)]
+            lines.append(
+                f"{route:<40} {len(stats.replayed):>6} {captured[0]:>8.1f} {replayed[0]:>8.1f} "
+                f"{_change(captured[0], replayed[0]):>6} {captured[1]:>8.1f} {replayed[1]:>8.1f} "
+                f"{_change(captured[1], replayed[1]):>6} {stats.status_mismatches:>7}"
+            )
+        lines.append("latencies in ms; captured times are measured inside the app")
+        if self.new_server_errors:
+            lines.append(f"{self.new_server_errors} requests failed with 5xx that succeeded when captured")
+        if self.transport_errors:
+            lines.append(f"{self.transport_errors} requests failed to connect or timed out")
+        return "\n".join(lines)
+
+
+def configure_scratch(directory: str, admin_key: str) -> None:
+    """
+    Point every persistent store of the application into ``directory``.
+
+    Keeps the other settings (admission control, budgets, idempotency) from
+    the environment so the replayed application matches production, but
+    disables rate limiting (all replayed requests share one client address)
+    and request capture.
+    """
+    from trivia_api.config import get_settings
+
+    settings = get_settings()
+    path = lambda name: os.path.join(directory, name)  # noqa: E731
+    os.environ["DATABASE_URL"] = f"sqlite:///{path('replay.db')}"
+    shard_count = len([url for url in settings.SHARD_DATABASE_URLS.split(",") if url.strip()])
+    os.environ["SHARD_DATABASE_URLS"] = ",".join(
+        f"sqlite:///{path(f'replay-shard{index}.db')}" for index in range(shard_count)
+    )
+    os.environ["DB_STARTUP_MODE"] = "create_all"
+    os.environ["DB_STARTUP_LOCK_PATH"] = path("startup.lock")
+    os.environ["READ_REPLICA_URL"] = ""
+    if settings.READ_REPLICA_SNAPSHOT_PATH:
+        os.environ["READ_REPLICA_SNAPSHOT_PATH"] = path("replica.db")
+    if settings.SHARED_LEADERBOARD_PATH:
+        os.environ["SHARED_LEADERBOARD_PATH"] = path("leaderboard.bin")
+    os.environ["MEMORY_DATA_DIR"] = path("memory-data")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["IDEMPOTENCY_SQLITE_PATH"] = path("idempotency.db")
+    os.environ["PROFILE_OUTPUT_DIR"] = path("profiles")
+    os.environ["CAPTURE_DIR"] = ""
+    os.environ["ADMIN_API_KEY"] = admin_key
+    get_settings.cache_clear()
+
+
+def _substitute(text: str, session_ids: dict) -> str:
+    for captured, replayed in session_ids.items():
+        text = text.replace(captured, replayed)
+    return text
+
+
+class _Replayer:
+    def __init__(self, transport, base_url: str, admin_key: str, speed: float, max_in_flight: int):
+        self.transport = transport
+        self.base_url = base_url.rstrip("/")
+        self.admin_key = admin_key
+        self.speed = speed
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.session_ids: dict = {}
+        self.report = ReplayReport(speed=speed)
+
+    async def send(self, entry: dict) -> tuple:
+        import httpx
+
+        headers = dict(entry.get("headers", {}))
+        if entry.get("admin"):
+            # Keys rejected in production are replayed as rejected keys
+            rejected = entry["status"] in (401, 403)
+            headers["x-api-key"] = "replayed-invalid-key" if rejected else self.admin_key
+        url = self.base_url + _substitute(entry["path"], self.session_ids)
+        if entry.get("query"):
+            url += "?" + _substitute(entry["query"], self.session_ids)
+        content = decode_body(entry)
+        if self.session_ids and "body" in entry:
+            content = _substitute(entry["body"], self.session_ids).encode("utf-8")
+
+        request = httpx.Request(entry["method"], url, headers=headers, content=content)
+        started = time.perf_counter()
+        # The transport is used directly so no cookies carry over between requests
+        response = await self.transport.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        return response.status_code, body, time.perf_counter() - started
+
+    async def replay(self, entry: dict) -> None:
+        import httpx
+
+        try:
+            status, body, latency = await self.send(entry)
+        except httpx.TransportError:
+            self.report.transport_errors += 1
+            return
+        finally:
+            self.semaphore.release()
+        stats = self.report.routes[f"{entry['method']} {entry['route']}"]
+        stats.captured.append(entry["duration"])
+        stats.replayed.append(latency)
+        if status != entry["status"]:
+            stats.status_mismatches += 1
+            if status >= 500 > entry["status"]:
+                self.report.new_server_errors += 1
+        if entry["path"] == SESSION_START_PATH and entry.get("session_id") and status == 200:
+            replayed_id = session_id_from(body)
+            if replayed_id:
+                self.session_ids[entry["session_id"]] = replayed_id
+
+    async def run(self, entries: list) -> None:
+        loop = asyncio.get_running_loop()
+        first_ts = entries[0]["ts"]
+        started = loop.time()
+        tasks = set()
+        for entry in entries:
+            due = started + (entry["ts"] - first_ts) / self.speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.semaphore.acquire()
+            self.report.max_lag = max(self.report.max_lag, loop.time() - due)
+            if entry["path"].startswith(ALWAYS_CAPTURED_PREFIX):
+                # Requests before a session change see the old session, later ones the new
+                if tasks:
+                    await asyncio.gather(*tasks)
+                await self.replay(entry)
+            else:
+                task = asyncio.ensure_future(self.replay(entry))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        self.report.elapsed = loop.time() - started
+
+
+async def _start_placeholder_session(replayer: _Replayer) -> None:
+    import httpx
+
+    request = httpx.Request(
+        "POST",
+        replayer.base_url + SESSION_START_PATH,
+        headers={"x-api-key": replayer.admin_key},
+        json={"question": "Replayed question", "correct_answer": "Replayed answer"},
+    )
+    response = await replayer.transport.handle_async_request(request)
+    await response.aread()
+    if response.status_code not in (200, 400):  # 400: a session is already active
+        raise RuntimeError(f"could not start a session for replay (HTTP {response.status_code})")
+
+
+def _starts_mid_session(entries: list) -> bool:
+    """True if answers were captured before any session was started."""
+    for entry in entries:
+        if entry["path"] == SESSION_START_PATH:
+            return False
+        if entry["method"] == "POST" and entry["route"] in ANSWER_ROUTES:
+            return True
+    return False
+
+
+async def _run(replayer: _Replayer, entries: list, app=None) -> None:
+    starts_mid_session = _starts_mid_session(entries)
+    if app is None:
+        try:
+            if starts_mid_session:
+                await _start_placeholder_session(replayer)
+            await replayer.run(entries)
+        finally:
+            await replayer.transport.aclose()
+        return
+    async with app.router.lifespan_context(app):
+        if starts_mid_session:
+            await _start_placeholder_session(replayer)
+        await replayer.run(entries)
+
+
+def run(
+    paths: Iterable[str],
+    speed: float = 1.0,
+    url: Optional[str] = None,
+    admin_key: Optional[str] = None,
+    directory: Optional[str] = None,
+    max_in_flight: int = 512,
+    limit: Optional[int] = None,
+) -> ReplayReport:
+    """
+    Replay captured requests and compare their latency with the capture.
+
+    Args:
+        paths: Capture files or directories
+        speed: Replay speed relative to the capture (2.0 replays twice as fast)
+        url: Base URL of a running server; default is an in-process application
+            on a scratch database
+        admin_key: Admin key for admin requests when replaying against ``url``
+        directory: Scratch directory for the in-process application (default: a
+            new temporary directory)
+        max_in_flight: Most requests outstanding at once
+        limit: Replay only the first ``limit`` requests
+
+    Returns:
+        ReplayReport with per-route latency deviation
+
+    Raises:
+        ValueError: If the arguments are invalid or no captured requests were found
+    """
+    import httpx
+
+    if speed <= 0:
+        raise ValueError("speed must be positive")
+    entries = read_captures(paths)
+    if limit is not None:
+        entries = entries[:limit]
+    replayable = [entry for entry in entries if not entry.get("truncated")]
+    if not replayable:
+        raise ValueError("no replayable requests in the capture")
+
+    app = None
+    if url is None:
+        directory = directory or tempfile.mkdtemp(prefix="trivia-replay-")
+        os.makedirs(directory, exist_ok=True)
+        admin_key = secrets.token_hex(16)
+        configure_scratch(directory, admin_key)
+
+        from trivia_api.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        url = "http://replay"
+    else:
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+        )
+
+    replayer = _Replayer(transport, url, admin_key or "", speed, max_in_flight)
+    replayer.report.skipped = len(entries) - len(replayable)
+    replayer.report.requests = len(replayable)
+    replayer.report.captured_span = replayable[-1]["ts"] - replayable[0]["ts"]
+    asyncio.run(_run(replayer, replayable, app))
+    return replayer.report
@@ -2,10 +2,16 @@
 from trivia_api.schemas.session import TriviaSessionORM, SessionStatus
 from trivia_api.schemas.attempt import AttemptRecordORM
 from trivia_api.schemas.user_score import UserScoreORM
+from trivia_api.schemas.leaderboard_snapshot import LeaderboardSnapshotORM
+from trivia_api.schemas.team import TeamMemberORM, TeamORM, TeamScoreORM
 
 __all__ = [
     "TriviaSessionORM",
     "SessionStatus",
     "AttemptRecordORM",
     "UserScoreORM",
+    "LeaderboardSnapshotORM",
+    "TeamORM",
+    "TeamMemberORM",
+    "TeamScoreORM",
 ]
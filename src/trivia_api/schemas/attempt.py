@@ -1,28 +1,39 @@
 """SQLAlchemy ORM model for answer attempt records."""
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, ForeignKey
+from sqlalchemy import Boolean, Column, Index, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 
 from trivia_api.database import Base
+from trivia_api.schemas.types import UTCDateTime
 from trivia_api.utils.timestamps import get_utc_now
 
 
 class AttemptRecordORM(Base):
-    """SQLAlchemy ORM model for answer attempt audit trail."""
+    """
+    SQLAlchemy ORM model for answer attempt audit trail.
+
+    Rows live next to the user's score row (on the user's shard), so
+    session_id cannot reference trivia_sessions in the main database.
+    """
 
     __tablename__ = "attempt_records"
+    __table_args__ = (
+        # One answer per user per session, enforced across workers
+        Index("uq_attempt_records_session_user", "session_id", "user_id", unique=True),
+    )
 
     attempt_id = Column(Integer, primary_key=True, autoincrement=True, index=True)
-    session_id = Column(String(36), ForeignKey("trivia_sessions.session_id"), nullable=False, index=True)
-    username = Column(String(100), nullable=False, index=True)
+    # Lookups by session use the (session_id, user_id) unique index
+    session_id = Column(String(36), nullable=False)  # trivia_sessions.session_id in the main database
+    user_id = Column(Integer, ForeignKey("user_scores.user_id"), nullable=False, index=True)
     submitted_answer = Column(String(200), nullable=False)  # Original case preserved
     is_correct = Column(Boolean, nullable=False)
-    submitted_at = Column(DateTime, default=get_utc_now, nullable=False, index=True)
+    submitted_at = Column(UTCDateTime, default=get_utc_now, nullable=False, index=True)
 
     # Relationships
-    session = relationship("TriviaSessionORM", back_populates="attempts")
+    user = relationship("UserScoreORM")
 
     def __repr__(self):
         """String representation."""
-        return f"<AttemptRecordORM attempt_id={self.attempt_id} username={self.username} is_correct={self.is_correct}>"
+        return f"<AttemptRecordORM attempt_id={self.attempt_id} user_id={self.user_id} is_correct={self.is_correct}>"
@@ -0,0 +1,29 @@
+"""SQLAlchemy ORM model for per-session leaderboard snapshots."""
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, String
+
+from trivia_api.database import Base
+from trivia_api.schemas.types import UTCDateTime
+from trivia_api.utils.timestamps import get_utc_now
+
+
+class LeaderboardSnapshotORM(Base):
+    """
+    Ranks of every scoring user captured when a session ends (kept in the
+    main database, next to the session).
+
+    The three arrays are aligned and sorted by user key (see
+    RankSnapshotService), so a user's entry is found by binary search.
+    """
+
+    __tablename__ = "leaderboard_snapshots"
+
+    session_id = Column(String(36), ForeignKey("trivia_sessions.session_id"), primary_key=True)
+    captured_at = Column(UTCDateTime, default=get_utc_now, nullable=False, index=True)
+    user_count = Column(Integer, nullable=False)
+    user_keys = Column(LargeBinary, nullable=False)  # uint64 little-endian
+    ranks = Column(LargeBinary, nullable=False)  # uint32 little-endian
+    previous_ranks = Column(LargeBinary, nullable=False)  # uint32, 0 = not ranked before
+
+    def __repr__(self):
+        """String representation."""
+        return f"<LeaderboardSnapshotORM session_id={self.session_id} user_count={self.user_count}>"
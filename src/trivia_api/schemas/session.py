@@ -1,10 +1,10 @@
 """SQLAlchemy ORM model for trivia sessions."""
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Enum, String, create_engine
-from sqlalchemy.orm import relationship
+from sqlalchemy import JSON, Column, Enum, String, create_engine
 
 from trivia_api.database import Base
+from trivia_api.schemas.types import UTCDateTime
 from trivia_api.utils.timestamps import get_utc_now
 import enum
 
@@ -25,11 +25,9 @@ class TriviaSessionORM(Base):
     question = Column(String(500), nullable=False)
     correct_answer = Column(String(200), nullable=False)  # Stored in normalized form
     status = Column(Enum(SessionStatus), default=SessionStatus.ACTIVE, nullable=False)
-    started_at = Column(DateTime, default=get_utc_now, nullable=False)
-    ended_at = Column(DateTime, nullable=True)
-
-    # Relationships
-    attempts = relationship("AttemptRecordORM", back_populates="session")
+    started_at = Column(UTCDateTime, default=get_utc_now, nullable=False)
+    ended_at = Column(UTCDateTime, nullable=True)
+    analytics = Column(JSON, nullable=True)  # Answer analytics folded in at end_session
 
     def __repr__(self):
         """String representation."""
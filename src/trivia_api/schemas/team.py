@@ -0,0 +1,63 @@
+"""SQLAlchemy ORM models for teams, team membership and team scores."""
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+
+from trivia_api.database import Base
+from trivia_api.schemas.types import UTCDateTime
+from trivia_api.utils.timestamps import get_utc_now
+
+
+class TeamORM(Base):
+    """SQLAlchemy ORM model for teams (kept in the main database)."""
+
+    __tablename__ = "teams"
+
+    team_id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)
+    created_at = Column(UTCDateTime, default=get_utc_now, nullable=False)
+
+    def __repr__(self):
+        """String representation."""
+        return f"<TeamORM name={self.name}>"
+
+
+class TeamMemberORM(Base):
+    """
+    SQLAlchemy ORM model for team membership; a user belongs to at most one team.
+
+    Rows live next to the user's score row (on the user's shard), so scoring
+    updates the team in the same transaction.
+    """
+
+    __tablename__ = "team_members"
+
+    user_id = Column(Integer, ForeignKey("user_scores.user_id"), primary_key=True)
+    team_id = Column(Integer, nullable=False, index=True)  # teams.team_id in the main database
+
+    def __repr__(self):
+        """String representation."""
+        return f"<TeamMemberORM user_id={self.user_id} team_id={self.team_id}>"
+
+
+class TeamScoreORM(Base):
+    """
+    SQLAlchemy ORM model for team scores, maintained as members score.
+
+    The score is the sum of the members' cumulative scores. With sharding each
+    shard holds the sum over the members it stores, and the team leaderboard
+    adds the shards up.
+    """
+
+    __tablename__ = "team_scores"
+    __table_args__ = (
+        # Team leaderboard order, like ix_user_scores_ranking
+        Index("ix_team_scores_ranking", "score", "reached_at"),
+    )
+
+    team_id = Column(Integer, primary_key=True, autoincrement=False)
+    score = Column(Integer, default=0, nullable=False)
+    reached_at = Column(UTCDateTime, nullable=True)  # When the team reached its score; for tie-breaking
+    member_count = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        """String representation."""
+        return f"<TeamScoreORM team_id={self.team_id} score={self.score}>"
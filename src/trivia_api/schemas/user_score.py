@@ -2,9 +2,10 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 
 from trivia_api.database import Base
+from trivia_api.schemas.types import UTCDateTime
 from trivia_api.utils.timestamps import get_utc_now
 
 
@@ -12,12 +13,16 @@ class UserScoreORM(Base):
     """SQLAlchemy ORM model for cumulative user scores."""
 
     __tablename__ = "user_scores"
+    __table_args__ = (
+        # Leaderboard order: serves ranked scans and per-score rank counts
+        Index("ix_user_scores_ranking", "cumulative_score", "first_correct_timestamp"),
+    )
 
     user_id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     username = Column(String(100), unique=True, nullable=False, index=True)
     cumulative_score = Column(Integer, default=0, nullable=False)
-    first_correct_timestamp = Column(DateTime, nullable=True)  # For tie-breaking
-    last_updated = Column(DateTime, default=get_utc_now, nullable=False)
+    first_correct_timestamp = Column(UTCDateTime, nullable=True)  # For tie-breaking
+    last_updated = Column(UTCDateTime, default=get_utc_now, nullable=False)
 
     def __repr__(self):
         """String representation."""
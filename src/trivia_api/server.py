@@ -0,0 +1,266 @@
+"""Production server: pre-forked uvicorn workers sharing one listening socket."""
+import gc
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import stat
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import uvicorn
+
+from trivia_api.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+APP = "trivia_api.main:app"
+
+# Exit status of a worker whose application failed to start (uvicorn's STARTUP_FAILURE)
+WORKER_BOOT_FAILED = 3
+
+# Time allowed after the graceful timeout for lifespan shutdown (final snapshots)
+SHUTDOWN_ALLOWANCE_SECONDS = 10.0
+
+
+@dataclass
+class ServeOptions:
+    """Options for ``serve``; ``None`` fields are resolved from settings and the host."""
+
+    host: str = "127.0.0.1"
+    port: int = 8000
+    uds: Optional[str] = None
+    workers: Optional[int] = None
+    loop: str = "auto"
+    http: str = "auto"
+    preload: bool = True
+    graceful_timeout: Optional[float] = None
+    backlog: int = 2048
+    keep_alive: int = 5
+    access_log: bool = True
+
+
+def available_cores() -> int:
+    """Number of CPU cores this process may run on (respects affinity masks)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS
+        return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    """
+    Choose a worker count from SERVER_WORKERS, the storage engine and the host.
+
+    Returns:
+        One worker per core, or one worker for the in-memory engine
+    """
+    settings = get_settings()
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    if settings.STORAGE_ENGINE == "memory":
+        return 1
+    return available_cores()
+
+
+def _resolve(choice: str, fast: str, fallback: str) -> str:
+    if choice == "auto":
+        return fast if importlib.util.find_spec(fast) is not None else fallback
+    if choice == fast and importlib.util.find_spec(fast) is None:
+        raise ValueError(f"{fast} is not installed (pip install 'uvicorn[standard]')")
+    return choice
+
+
+def select_loop(choice: str = "auto") -> str:
+    """Resolve ``auto`` to uvloop when it is installed, else asyncio."""
+    return _resolve(choice, "uvloop", "asyncio")
+
+
+def select_http(choice: str = "auto") -> str:
+    """Resolve ``auto`` to httptools when it is installed, else h11."""
+    return _resolve(choice, "httptools", "h11")
+
+
+def _remove_stale_socket(path: str) -> None:
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def serve(options: ServeOptions) -> int:
+    """
+    Run the API until SIGTERM or SIGINT.
+
+    The listening socket (TCP or Unix) is bound once and shared by every
+    worker. With ``preload`` the application is imported before forking so
+    workers share its memory copy-on-write; each worker still runs its own
+    lifespan startup and shutdown. On SIGTERM workers stop accepting
+    connections, finish in-flight requests for up to the graceful timeout and
+    then run lifespan shutdown, which flushes the memory engine's event log and
+    writes its final snapshot. Workers that crash are replaced.
+
+    Args:
+        options: Server options
+
+    Returns:
+        Process exit status
+
+    Raises:
+        ValueError: If the options are invalid for the configured storage engine
+            or a requested loop/parser is not installed
+    """
+    settings = get_settings()
+    workers = options.workers or default_workers()
+    if workers > 1 and settings.STORAGE_ENGINE == "memory":
+        raise ValueError("the in-memory storage engine supports a single worker")
+    graceful_timeout = options.graceful_timeout
+    if graceful_timeout is None:
+        graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT_SECONDS
+
+    config = uvicorn.Config(
+        APP,
+        host=options.host,
+        port=options.port,
+        uds=options.uds,
+        loop=select_loop(options.loop),
+        http=select_http(options.http),
+        lifespan="on",
+        backlog=options.backlog,
+        timeout_keep_alive=options.keep_alive,
+        timeout_graceful_shutdown=int(graceful_timeout),
+        access_log=options.access_log,
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+
+    if options.uds:
+        _remove_stale_socket(options.uds)
+    sock = config.bind_socket()
+    logger.info(
+        "Serving %s on %s with %d worker(s) (loop=%s, http=%s, preload=%s)",
+        APP,
+        options.uds or f"http://{options.host}:{options.port}",
+        workers,
+        config.loop,
+        config.http,
+        "on" if options.preload and workers > 1 else "off",
+    )
+
+    try:
+        if workers == 1:
+            server = uvicorn.Server(config)
+            try:
+                server.run(sockets=[sock])
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else 1
+            return 0 if server.started else 1
+        if options.preload:
+            config.load()
+            # Keep the garbage collector from writing to (and so copying) the
+            # pages holding the preloaded objects in every worker
+            gc.freeze()
+        return _Supervisor(config, sock, workers, graceful_timeout).run()
+    finally:
+        sock.close()
+        if options.uds:
+            _remove_stale_socket(options.uds)
+
+
+def _run_worker(config: uvicorn.Config, sock: socket.socket) -> None:
+    """Serve in a forked worker; never returns."""
+    status = 1
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        server = uvicorn.Server(config)
+        server.run(sockets=[sock])
+        status = 0 if server.started else WORKER_BOOT_FAILED
+    except SystemExit as e:  # Raised by newer uvicorn when startup fails
+        status = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        logger.exception("Worker %d failed", os.getpid())
+    finally:
+        logging.shutdown()
+        os._exit(status)
+
+
+class _Supervisor:
+    """Forks workers, replaces crashed ones and drains them on shutdown."""
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int, graceful_timeout: float):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.children: set[int] = set()
+        self.stopping = False
+        self.kill_at: Optional[float] = None
+        self.status = 0
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for _ in range(self.workers):
+            self._spawn()
+
+        while self.children:
+            self._reap()
+            if self.kill_at is not None and time.monotonic() > self.kill_at and self.children:
+                logger.error("Killing %d worker(s) that did not drain in time", len(self.children))
+                for pid in self.children:
+                    self._signal(pid, signal.SIGKILL)
+                self.status = 1
+                self.kill_at = None
+            time.sleep(0.1)
+
+        logger.info("All workers stopped")
+        return self.status
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(self.config, self.sock)
+        self.children.add(pid)
+        logger.info("Started worker %d", pid)
+
+    def _reap(self) -> None:
+        while self.children:
+            try:
+                pid, wait_status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            self.children.discard(pid)
+            code = os.waitstatus_to_exitcode(wait_status)
+            if self.stopping:
+                continue
+            if code == WORKER_BOOT_FAILED:
+                logger.error("Worker %d failed to start; shutting down", pid)
+                self.status = 1
+                self._stop()
+            else:
+                logger.warning("Worker %d exited with status %d; replacing it", pid, code)
+                self._spawn()
+
+    def _handle_stop(self, signum, frame) -> None:
+        if not self.stopping:
+            logger.info("Received %s; draining workers", signal.Signals(signum).name)
+            self._stop()
+
+    def _stop(self) -> None:
+        self.stopping = True
+        self.kill_at = time.monotonic() + self.graceful_timeout + SHUTDOWN_ALLOWANCE_SECONDS
+        for pid in self.children:
+            self._signal(pid, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
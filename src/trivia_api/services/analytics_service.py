@@ -0,0 +1,200 @@
+"""Live per-session answer analytics."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from trivia_api.config import get_settings
+from trivia_api.database import all_shard_sessions
+from trivia_api.schemas import AttemptRecordORM
+from trivia_api.utils.sketches import SpaceSaving
+from trivia_api.utils.timestamps import format_epoch_micros
+from trivia_api.utils.validators import normalize_answer
+
+
+class SessionAnalytics:
+    """
+    Incremental answer statistics for one session in bounded memory.
+
+    Wrong answers are normalized and counted in a Space-Saving summary, and
+    submissions are bucketed per wall-clock second (oldest buckets are dropped
+    beyond ``max_seconds``).
+    """
+
+    def __init__(self, session_id: str, tracked_answers: int, max_seconds: int):
+        self.session_id = session_id
+        self.total = 0
+        self.correct = 0
+        self.wrong_answers = SpaceSaving(tracked_answers)
+        self.max_seconds = max_seconds
+        self.per_second: OrderedDict[int, list] = OrderedDict()  # epoch second -> [total, correct]
+
+    def record(self, answer: str, is_correct: bool, at: float) -> None:
+        """
+        Count one submitted answer.
+
+        Args:
+            answer: Answer as submitted
+            is_correct: Whether it was correct
+            at: Submission time in epoch seconds
+        """
+        self.total += 1
+        if is_correct:
+            self.correct += 1
+        else:
+            self.wrong_answers.add(normalize_answer(answer))
+
+        second = int(at)
+        bucket = self.per_second.get(second)
+        if bucket is None:
+            bucket = self.per_second[second] = [0, 0]
+            while len(self.per_second) > self.max_seconds:
+                self.per_second.popitem(last=False)
+        bucket[0] += 1
+        bucket[1] += is_correct
+
+    def summary(self, top_n: int) -> dict:
+        """
+        Get a JSON-serializable summary.
+
+        Args:
+            top_n: Number of wrong answers to include
+
+        Returns:
+            Totals, correct ratio, most common wrong answers and per-second counts
+        """
+        return {
+            "total_answers": self.total,
+            "correct_answers": self.correct,
+            "correct_ratio": self.correct / self.total if self.total else None,
+            "top_wrong_answers": [
+                {"answer": answer, "count": count, "max_overcount": error}
+                for answer, count, error in self.wrong_answers.top(top_n)
+            ],
+            "answers_per_second": [
+                {"timestamp": format_epoch_micros(second * 1_000_000), "total": total, "correct": correct}
+                for second, (total, correct) in sorted(self.per_second.items())
+            ],
+        }
+
+
+class AnswerAnalytics:
+    """
+    Live analytics for the active session, kept per worker.
+
+    Like the answered-users cache, the tracked session switches to whichever
+    session an answer belongs to, so workers that missed the start still count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current: Optional[SessionAnalytics] = None
+
+    def reset(self, session_id: Optional[str]) -> None:
+        """
+        Start tracking a new session (or stop tracking with None).
+
+        Args:
+            session_id: Newly started session, or None
+        """
+        with self._lock:
+            self._current = self._new(session_id) if session_id is not None else None
+
+    def record(self, session_id: str, answer: str, is_correct: bool) -> None:
+        """
+        Count a committed answer.
+
+        Args:
+            session_id: Session the answer belongs to
+            answer: Answer as submitted
+            is_correct: Whether it was correct
+        """
+        with self._lock:
+            if self._current is None or self._current.session_id != session_id:
+                self._current = self._new(session_id)
+            self._current.record(answer, is_correct, time.time())
+
+    def get(self, session_id: str) -> Optional[SessionAnalytics]:
+        """Get the live statistics if this worker is tracking the session."""
+        current = self._current
+        if current is not None and current.session_id == session_id:
+            return current
+        return None
+
+    @staticmethod
+    def _new(session_id: str) -> SessionAnalytics:
+        settings = get_settings()
+        return SessionAnalytics(
+            session_id, settings.ANALYTICS_TRACKED_ANSWERS, settings.ANALYTICS_MAX_SECONDS
+        )
+
+
+# Process-wide aggregator shared by all requests in this worker
+answer_analytics = AnswerAnalytics()
+
+
+class AnalyticsService:
+    """Service layer for answer analytics."""
+
+    @staticmethod
+    def live_summary(session_id: str) -> dict:
+        """
+        Summarize the answers this worker has seen for an active session.
+
+        Args:
+            session_id: Active session identifier
+
+        Returns:
+            Analytics summary (empty if no answers were seen yet)
+        """
+        analytics = answer_analytics.get(session_id) or AnswerAnalytics._new(session_id)
+        return analytics.summary(get_settings().ANALYTICS_TOP_ANSWERS)
+
+    @staticmethod
+    def finish_session(db: Optional[Session], session_id: str) -> dict:
+        """
+        Produce the final analytics to store with an ending session.
+
+        The live aggregator is used when it saw every attempt. Otherwise (e.g.
+        answers were spread over several workers) the session's attempts are
+        streamed once through a fresh aggregator.
+
+        Args:
+            db: Database session, or None when the live data is known to be complete
+            session_id: Session identifier
+
+        Returns:
+            Analytics summary
+        """
+        top_n = get_settings().ANALYTICS_TOP_ANSWERS
+        live = answer_analytics.get(session_id)
+        if db is None:
+            return (live or AnswerAnalytics._new(session_id)).summary(top_n)
+
+        shards = all_shard_sessions(db)
+        recorded = sum(
+            shard.query(func.count(AttemptRecordORM.attempt_id))
+            .filter(AttemptRecordORM.session_id == session_id)
+            .scalar()
+            for shard in shards
+        )
+        if live is not None and live.total == recorded:
+            return live.summary(top_n)
+
+        rebuilt = AnswerAnalytics._new(session_id)
+        for shard in shards:
+            rows = (
+                shard.query(
+                    AttemptRecordORM.submitted_answer,
+                    AttemptRecordORM.is_correct,
+                    AttemptRecordORM.submitted_at,
+                )
+                .filter(AttemptRecordORM.session_id == session_id)
+                .yield_per(1000)
+            )
+            for answer, is_correct, submitted_at in rows:
+                rebuilt.record(answer, is_correct, submitted_at.timestamp())
+        return rebuilt.summary(top_n)
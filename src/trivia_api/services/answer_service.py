@@ -1,9 +1,20 @@
 """Business logic for answer submission and validation."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from trivia_api.errors import DuplicateAnswerError, NoActiveSessionError
-from trivia_api.schemas import AttemptRecordORM, TriviaSessionORM, SessionStatus
+from trivia_api.database import release_connections, shard_session
+from trivia_api.errors import DuplicateAnswerError, NoActiveSessionError, TriviaAPIException
+from trivia_api.schemas import AttemptRecordORM, TriviaSessionORM, SessionStatus, UserScoreORM
+from trivia_api.services.analytics_service import answer_analytics
+from trivia_api.services.shared_leaderboard import get_shared_leaderboard
+from trivia_api.services.answered_users_cache import answered_users
 from trivia_api.services.session_service import SessionService
+from trivia_api.services.user_score_service import UserScoreService
+from trivia_api.storage import get_memory_engine
 from trivia_api.utils.timestamps import get_utc_now
 from trivia_api.utils.validators import check_answers_match
 
@@ -16,6 +27,9 @@ class AnswerService:
         """
         Check if user has already answered this session's question.
 
+        Served from the in-memory answered-users set; the database is only read
+        to seed the set the first time a worker sees a session.
+
         Args:
             db: Database session
             session_id: Session identifier
@@ -24,11 +38,21 @@ class AnswerService:
         Returns:
             True if user has already answered, False otherwise
         """
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.has_answered(session_id, username)
+
+        return answered_users.has_answered(db, session_id, username)
+
+    @staticmethod
+    def _attempt_exists(db: Session, session_id: str, username: str) -> bool:
+        """Check the database directly for an attempt by this user in this session."""
         existing = (
-            db.query(AttemptRecordORM)
+            shard_session(db, username).query(AttemptRecordORM.attempt_id)
+            .join(UserScoreORM, AttemptRecordORM.user_id == UserScoreORM.user_id)
             .filter(
                 AttemptRecordORM.session_id == session_id,
-                AttemptRecordORM.username == username,
+                UserScoreORM.username == username,
             )
             .first()
         )
@@ -42,6 +66,9 @@ class AnswerService:
         """
         Submit an answer to the current active question.
 
+        The attempt and, for correct answers, the score increment are committed
+        in a single transaction on the user's shard.
+
         Args:
             db: Database session
             username: Username of participant
@@ -54,35 +81,176 @@ class AnswerService:
             NoActiveSessionError: If no active session exists
             DuplicateAnswerError: If user already answered this session's question
         """
+        engine = get_memory_engine()
+        if engine is not None:
+            session_id = engine.active_session_id
+            result = engine.submit_answer(username, answer)
+            answer_analytics.record(session_id, answer, result["is_correct"])
+            return result
+
+        try:
+            return AnswerService._record_answer(db, username, answer)
+        finally:
+            # Rejected answers never commit; don't hold their connections
+            release_connections(db)
+
+    @staticmethod
+    def submit_answers(db: Session, answers: list[tuple[str, str]]) -> list:
+        """
+        Submit several answers to the current active question.
+
+        Answers are validated individually, so one rejected answer does not
+        affect the others. Accepted answers are committed in one transaction per
+        shard; if another worker recorded one of them first, that shard's
+        answers are retried one at a time. A username repeated within the batch
+        is accepted once.
+
+        Args:
+            db: Database session
+            answers: (username, answer) pairs
+
+        Returns:
+            One entry per answer, in order: the result dictionary returned by
+            ``submit_answer``, or the TriviaAPIException rejecting the answer
+        """
+        engine = get_memory_engine()
+        if engine is not None:
+            results = []
+            for username, answer in answers:
+                try:
+                    results.append(AnswerService.submit_answer(db, username, answer))
+                except TriviaAPIException as e:
+                    results.append(e)
+            return results
+
+        try:
+            return AnswerService._record_answers(db, answers)
+        finally:
+            release_connections(db)
+
+    @staticmethod
+    def _record_answer(db: Session, username: str, answer: str) -> dict:
+        """Validate and record an answer in the SQL database."""
         # Get active session
         session = SessionService.get_active_session(db)
         if not session:
             raise NoActiveSessionError()
 
+        session_id = session.session_id
+
         # Check for duplicate answer
-        if AnswerService.check_duplicate_answer(db, session.session_id, username):
+        if AnswerService.check_duplicate_answer(db, session_id, username):
             raise DuplicateAnswerError()
 
-        # Check if answer is correct (case-insensitive)
-        is_correct = check_answers_match(answer, session.correct_answer)
+        # Attempts live on the same shard as the user's score row
+        user_db = shard_session(db, username)
 
-        # Record attempt
-        attempt = AttemptRecordORM(
-            session_id=session.session_id,
-            username=username,
-            submitted_answer=answer,  # Original case preserved
-            is_correct=is_correct,
-            submitted_at=get_utc_now(),
-        )
+        # User id comes from the interning cache after first use
+        attempt = AnswerService._attempt_row(session, answer, UserScoreService.get_user_id(user_db, username))
+        user_db.add(AttemptRecordORM(**attempt))
+        is_correct = attempt["is_correct"]
 
-        db.add(attempt)
-        db.commit()
-        db.refresh(attempt)
+        # Increment score in the same transaction if answer was correct
+        score = None
+        if is_correct:
+            user_score = UserScoreService.increment_score(user_db, username, commit=False)
+            score = user_score.cumulative_score
 
-        result = {
+        try:
+            user_db.commit()
+        except IntegrityError:
+            # Another worker recorded this user's answer first
+            user_db.rollback()
+            if not AnswerService._attempt_exists(user_db, session_id, username):
+                raise
+            answered_users.add(session_id, username)
+            raise DuplicateAnswerError()
+
+        return AnswerService._accepted(session_id, username, answer, is_correct, score)
+
+    @staticmethod
+    def _record_answers(db: Session, answers: list[tuple[str, str]]) -> list:
+        """Validate and record a batch of answers in the SQL database."""
+        session = SessionService.get_active_session(db)
+        if not session:
+            return [NoActiveSessionError() for _ in answers]
+
+        session_id = session.session_id
+        results: list = [None] * len(answers)
+        by_shard: dict = {}
+        seen = set()
+        for index, (username, answer) in enumerate(answers):
+            if username in seen or AnswerService.check_duplicate_answer(db, session_id, username):
+                results[index] = DuplicateAnswerError()
+                continue
+            seen.add(username)
+            # Stamped in request order, whichever shard the answer goes to
+            by_shard.setdefault(shard_session(db, username), []).append(
+                (index, username, answer, get_utc_now())
+            )
+
+        for user_db, items in by_shard.items():
+            user_ids = UserScoreService.get_user_ids(user_db, [item[1] for item in items])
+            attempts = [
+                AnswerService._attempt_row(session, answer, user_ids[username], submitted_at)
+                for _, username, answer, submitted_at in items
+            ]
+            correct = [attempt["is_correct"] for attempt in attempts]
+
+            scores = {}
+            try:
+                # One INSERT for the attempts and one UPDATE for the correct answers
+                user_db.execute(insert(AttemptRecordORM), attempts)
+                answered_at = {
+                    attempt["user_id"]: attempt["submitted_at"] for attempt in attempts if attempt["is_correct"]
+                }
+                if answered_at:
+                    scores = UserScoreService.increment_scores(user_db, answered_at)
+                user_db.commit()
+            except IntegrityError:
+                # Another worker recorded one of these answers first
+                user_db.rollback()
+                for index, username, answer, _ in items:
+                    try:
+                        results[index] = AnswerService._record_answer(db, username, answer)
+                    except TriviaAPIException as e:
+                        results[index] = e
+                continue
+
+            for (index, username, answer, _), is_correct in zip(items, correct):
+                score = scores.get(user_ids[username]) if is_correct else None
+                results[index] = AnswerService._accepted(session_id, username, answer, is_correct, score)
+
+        return results
+
+    @staticmethod
+    def _attempt_row(
+        session: TriviaSessionORM, answer: str, user_id: int, submitted_at: Optional[datetime] = None
+    ) -> dict:
+        """Build the attempt_records row for an answer."""
+        return {
+            "session_id": session.session_id,
+            "user_id": user_id,
+            "submitted_answer": answer,  # Original case preserved
+            # Check if answer is correct (case-insensitive)
+            "is_correct": check_answers_match(answer, session.correct_answer),
+            "submitted_at": submitted_at or get_utc_now(),
+        }
+
+    @staticmethod
+    def _accepted(
+        session_id: str, username: str, answer: str, is_correct: bool, score: Optional[int]
+    ) -> dict:
+        """Update caches for a committed answer and build its result."""
+        answered_users.add(session_id, username)
+        answer_analytics.record(session_id, answer, is_correct)
+        if is_correct:
+            shared = get_shared_leaderboard()
+            if shared is not None:
+                shared.mark_dirty()
+
+        return {
             "is_correct": is_correct,
             "message": "Correct!" if is_correct else "Incorrect!",
-            "score": None,
+            "score": score,
         }
-
-        return result
@@ -0,0 +1,91 @@
+"""In-memory record of who has answered the active session."""
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from trivia_api.database import all_shard_sessions
+from trivia_api.schemas import AttemptRecordORM, UserScoreORM
+from trivia_api.utils.metrics import record_cache_access
+
+
+class AnsweredUsersCache:
+    """
+    Set of usernames that have answered one session, kept per worker.
+
+    The set only grows during a round, so a hit is a definite duplicate and is
+    rejected without touching the database. A miss skips the duplicate SELECT;
+    answers recorded by other workers are caught by the unique
+    (session_id, user_id) index when the attempt is committed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session_id: Optional[str] = None
+        self._usernames: set[str] = set()
+
+    def reset(self, session_id: Optional[str]) -> None:
+        """
+        Track a session that nobody has answered yet (or stop tracking with None).
+
+        Args:
+            session_id: Newly started session, or None when no session is active
+        """
+        with self._lock:
+            self._session_id = session_id
+            self._usernames = set()
+
+    def seed(self, db: Session, session_id: str) -> None:
+        """
+        Load everyone who has already answered a session from the database.
+
+        Args:
+            db: Database session
+            session_id: Session identifier
+        """
+        usernames = set()
+        for shard in all_shard_sessions(db):
+            rows = (
+                shard.query(UserScoreORM.username)
+                .join(AttemptRecordORM, AttemptRecordORM.user_id == UserScoreORM.user_id)
+                .filter(AttemptRecordORM.session_id == session_id)
+                .all()
+            )
+            usernames.update(row[0] for row in rows)
+        with self._lock:
+            self._session_id = session_id
+            self._usernames = usernames
+
+    def has_answered(self, db: Session, session_id: str, username: str) -> bool:
+        """
+        Check whether a user has answered a session, seeding on first use.
+
+        Args:
+            db: Database session (only used to seed a session not yet tracked)
+            session_id: Session identifier
+            username: Username
+
+        Returns:
+            True if the user has already answered
+        """
+        if self._session_id != session_id:
+            self.seed(db, session_id)
+        answered = username in self._usernames
+        record_cache_access("answered_users", answered)
+        return answered
+
+    def add(self, session_id: str, username: str) -> None:
+        """
+        Record a committed answer.
+
+        Args:
+            session_id: Session identifier
+            username: Username
+        """
+        with self._lock:
+            if self._session_id == session_id:
+                self._usernames.add(username)
+
+
+# Process-wide cache shared by all requests in this worker
+answered_users = AnsweredUsersCache()
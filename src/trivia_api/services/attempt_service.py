@@ -1,15 +1,42 @@
 """Business logic for managing attempt records."""
-from typing import List
+import heapq
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
+from trivia_api.database import all_shard_sessions
 from trivia_api.models.attempt import AttemptRecord
-from trivia_api.schemas import AttemptRecordORM
+from trivia_api.schemas import AttemptRecordORM, UserScoreORM
+from trivia_api.schemas.types import raw_timestamp
+from trivia_api.storage import get_memory_engine
 from trivia_api.utils.timestamps import to_iso8601
 
 
 class AttemptService:
     """Service layer for attempt record management."""
 
+    @staticmethod
+    def _attempt_rows(db: Session):
+        """Query attempt columns with the username resolved from user_scores."""
+        # Raw stored timestamps skip per-row datetime construction before formatting
+        return db.query(
+            UserScoreORM.username,
+            AttemptRecordORM.is_correct,
+            raw_timestamp(AttemptRecordORM.submitted_at),
+        ).join(UserScoreORM, AttemptRecordORM.user_id == UserScoreORM.user_id)
+
+    @staticmethod
+    def _newest_first(db: Session, session_id: Optional[str] = None) -> list:
+        """Fetch attempt rows from every shard, merged most recent first."""
+        per_shard = []
+        for shard in all_shard_sessions(db):
+            query = AttemptService._attempt_rows(shard)
+            if session_id is not None:
+                query = query.filter(AttemptRecordORM.session_id == session_id)
+            per_shard.append(query.order_by(AttemptRecordORM.submitted_at.desc()).all())
+        if len(per_shard) == 1:
+            return per_shard[0]
+        return list(heapq.merge(*per_shard, key=lambda row: row.submitted_at, reverse=True))
+
     @staticmethod
     def get_all_attempts(db: Session) -> List[AttemptRecord]:
         """
@@ -21,11 +48,11 @@ class AttemptService:
         Returns:
             List of AttemptRecord Pydantic models
         """
-        attempts = (
-            db.query(AttemptRecordORM)
-            .order_by(AttemptRecordORM.submitted_at.desc())
-            .all()
-        )
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_all_attempts()
+
+        attempts = AttemptService._newest_first(db)
 
         return [
             AttemptRecord(
@@ -48,12 +75,11 @@ class AttemptService:
         Returns:
             List of AttemptRecord Pydantic models ordered chronologically
         """
-        attempts = (
-            db.query(AttemptRecordORM)
-            .filter(AttemptRecordORM.session_id == session_id)
-            .order_by(AttemptRecordORM.submitted_at.desc())
-            .all()
-        )
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_attempts_for_session(session_id)
+
+        attempts = AttemptService._newest_first(db, session_id)
 
         return [
             AttemptRecord(
@@ -0,0 +1,394 @@
+"""Streaming bulk export of sessions, attempts and scores as CSV or Parquet."""
+import csv
+import io
+import threading
+import zlib
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import String, literal, select, tuple_, type_coerce
+from sqlalchemy.engine import Engine
+
+from trivia_api.config import get_settings
+from trivia_api.database import get_engine, get_read_replica, get_shard_engines
+from trivia_api.errors import (
+    ExportFormatUnavailableError,
+    ExportLimitError,
+    InvalidExportRequestError,
+)
+from trivia_api.schemas import AttemptRecordORM, TriviaSessionORM, UserScoreORM
+from trivia_api.schemas.types import UTCDateTime, raw_timestamp
+from trivia_api.storage import get_memory_engine
+from trivia_api.utils.timestamps import from_epoch_micros, to_epoch_micros, to_iso8601
+
+FORMATS = ("csv", "parquet")
+
+# Rows per Parquet row group; larger groups compress and scan better
+PARQUET_ROW_GROUP_ROWS = 131_072
+
+
+class ExportTable(NamedTuple):
+    """Columns of an exportable table and the filters it supports."""
+
+    columns: tuple[str, ...]
+    kinds: tuple[str, ...]  # "int", "str", "bool" or "timestamp" per column
+    time_column: str  # Filtered by since/until
+    session_column: Optional[str]  # Filtered by session_id, if supported
+
+
+TABLES = {
+    "attempts": ExportTable(
+        columns=(
+            "attempt_id",
+            "session_id",
+            "user_id",
+            "username",
+            "submitted_answer",
+            "is_correct",
+            "submitted_at",
+        ),
+        kinds=("int", "str", "int", "str", "str", "bool", "timestamp"),
+        time_column="submitted_at",
+        session_column="session_id",
+    ),
+    "scores": ExportTable(
+        columns=("user_id", "username", "cumulative_score", "first_correct_timestamp", "last_updated"),
+        kinds=("int", "str", "int", "timestamp", "timestamp"),
+        time_column="last_updated",
+        session_column=None,
+    ),
+    "sessions": ExportTable(
+        columns=("session_id", "question", "correct_answer", "status", "started_at", "ended_at"),
+        kinds=("str", "str", "str", "str", "timestamp", "timestamp"),
+        time_column="started_at",
+        session_column="session_id",
+    ),
+}
+
+
+class ExportStream:
+    """
+    Iterable of encoded export chunks.
+
+    Holds an export slot until the stream is exhausted, closed or garbage
+    collected (e.g. the client disconnected before the first chunk).
+    """
+
+    def __init__(
+        self,
+        chunks: Iterator[bytes],
+        media_type: str,
+        filename: str,
+        release: Optional[Callable[[], None]] = None,
+    ):
+        self.media_type = media_type
+        self.filename = filename
+        self._chunks = chunks
+        self._release = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            yield from self._chunks
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the export and release its slot."""
+        self._chunks.close()
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def __del__(self):
+        self.close()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _encode_csv(table: ExportTable, batches: Iterable[list]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(table.columns)
+    timestamps = [index for index, kind in enumerate(table.kinds) if kind == "timestamp"]
+    for batch in batches:
+        for row in batch:
+            if timestamps:
+                row = list(row)
+                for index in timestamps:
+                    if row[index] is not None:
+                        row[index] = to_iso8601(row[index])
+            writer.writerow(row)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _encode_parquet(table: ExportTable, batches: Iterable[list]) -> Iterator[bytes]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportFormatUnavailableError("parquet") from None
+
+    arrow_types = {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "bool": pa.bool_(),
+        # Accepts both aware datetimes and epoch microseconds
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in zip(table.columns, table.kinds)])
+
+    def generate() -> Iterator[bytes]:
+        sink = _ChunkSink()
+        pending, pending_rows = [], 0
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            for batch in batches:
+                if not batch:
+                    continue
+                arrays = [
+                    pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)
+                ]
+                pending.append(pa.record_batch(arrays, schema=schema))
+                pending_rows += len(batch)
+                # Memory stays bounded by one row group
+                if pending_rows >= PARQUET_ROW_GROUP_ROWS:
+                    writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+                    pending, pending_rows = [], 0
+                    yield sink.drain()
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+        yield sink.drain()
+
+    return generate()
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _statement(name: str):
+    """
+    Build the export query for a table.
+
+    Returns:
+        The ordered SELECT, the ORM model it reads, and its keyset: the
+        ORDER BY columns (unique together) with their positions in a row
+    """
+    if name == "attempts":
+        return (
+            select(
+                AttemptRecordORM.attempt_id,
+                AttemptRecordORM.session_id,
+                AttemptRecordORM.user_id,
+                UserScoreORM.username,
+                AttemptRecordORM.submitted_answer,
+                AttemptRecordORM.is_correct,
+                raw_timestamp(AttemptRecordORM.submitted_at),
+            )
+            .join(UserScoreORM, AttemptRecordORM.user_id == UserScoreORM.user_id)
+            .order_by(AttemptRecordORM.attempt_id)
+        ), AttemptRecordORM, [(AttemptRecordORM.attempt_id, 0)]
+    if name == "scores":
+        return (
+            select(
+                UserScoreORM.user_id,
+                UserScoreORM.username,
+                UserScoreORM.cumulative_score,
+                raw_timestamp(UserScoreORM.first_correct_timestamp),
+                raw_timestamp(UserScoreORM.last_updated),
+            ).order_by(UserScoreORM.user_id)
+        ), UserScoreORM, [(UserScoreORM.user_id, 0)]
+    return (
+        select(
+            TriviaSessionORM.session_id,
+            TriviaSessionORM.question,
+            TriviaSessionORM.correct_answer,
+            # Stored enum name, which equals its value
+            type_coerce(TriviaSessionORM.status, String).label("status"),
+            raw_timestamp(TriviaSessionORM.started_at),
+            raw_timestamp(TriviaSessionORM.ended_at),
+        ).order_by(TriviaSessionORM.started_at, TriviaSessionORM.session_id)
+    ), TriviaSessionORM, [(TriviaSessionORM.started_at, 4), (TriviaSessionORM.session_id, 0)]
+
+
+def _after(keyset: list, row) -> object:
+    """Condition selecting the rows that sort after ``row`` by the keyset columns."""
+    columns, values = [], []
+    for column, index in keyset:
+        value = row[index]
+        if isinstance(value, int) and isinstance(column.type, UTCDateTime):
+            value = from_epoch_micros(value)  # raw_timestamp value on SQLite
+        columns.append(column)
+        values.append(literal(value, column.type))
+    if len(columns) == 1:
+        return columns[0] > values[0]
+    return tuple_(*columns) > tuple_(*values)
+
+
+def _sql_batches(engines: list[Engine], statement, keyset: list, batch_rows: int) -> Iterator[list]:
+    for engine in engines:
+        last = None
+        while True:
+            page = statement if last is None else statement.where(_after(keyset, last))
+            # Each batch is a short read of its own, resuming after the last
+            # row: no cursor (and on SQLite no lock) stays open while the
+            # client reads, so writers are never blocked for a whole export
+            with engine.connect() as conn:
+                rows = conn.execute(page.limit(batch_rows)).all()
+            if rows:
+                yield rows
+            if len(rows) < batch_rows:
+                break
+            last = rows[-1]
+
+
+class ExportService:
+    """Service layer for bulk exports."""
+
+    _slots: Optional[threading.BoundedSemaphore] = None
+    _slots_lock = threading.Lock()
+
+    @staticmethod
+    def export(
+        name: str,
+        fmt: str = "csv",
+        compress: bool = False,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        session_id: Optional[str] = None,
+        limit_concurrency: bool = True,
+    ) -> ExportStream:
+        """
+        Start a streaming export of one table.
+
+        Rows are read in batches of EXPORT_BATCH_ROWS (from the read replica
+        when one is running) and encoded one batch at a time, so memory stays
+        bounded regardless of table size. Each batch is a separate short
+        query that resumes after the previous batch's last key, so a slow
+        client never holds a database lock; rows written during the export
+        appear if they sort after the rows already sent. With sharded user
+        data, attempts and scores are exported shard by shard; their ids are
+        unique per shard only.
+
+        Args:
+            name: "attempts", "scores" or "sessions"
+            fmt: "csv" or "parquet"
+            compress: Gzip the CSV output
+            since: Only rows at or after this time (attempts: submitted_at,
+                scores: last_updated, sessions: started_at)
+            until: Only rows before this time
+            session_id: Only rows for this session (attempts and sessions)
+            limit_concurrency: Take one of EXPORT_MAX_CONCURRENT slots for the
+                duration of the export
+
+        Returns:
+            ExportStream of encoded chunks
+
+        Raises:
+            InvalidExportRequestError: If the table, format or filters are invalid
+            ExportFormatUnavailableError: If Parquet is requested without pyarrow
+            ExportLimitError: If all export slots are busy
+        """
+        table = TABLES.get(name)
+        if table is None:
+            raise InvalidExportRequestError(f"Unknown export table {name!r}")
+        if fmt not in FORMATS:
+            raise InvalidExportRequestError(f"Unknown export format {fmt!r}")
+        if compress and fmt != "csv":
+            raise InvalidExportRequestError("Gzip applies to CSV; Parquet is compressed per column")
+        if session_id is not None and table.session_column is None:
+            raise InvalidExportRequestError(f"The {name} export cannot be filtered by session")
+
+        settings = get_settings()
+        batches = ExportService._batches(name, table, since, until, session_id, settings.EXPORT_BATCH_ROWS)
+        chunks = _encode_csv(table, batches) if fmt == "csv" else _encode_parquet(table, batches)
+        if compress:
+            chunks = _gzip(chunks)
+
+        release = ExportService._acquire_slot(settings.EXPORT_MAX_CONCURRENT) if limit_concurrency else None
+        if fmt == "parquet":
+            media_type = "application/vnd.apache.parquet"
+        elif compress:
+            media_type = "application/gzip"
+        else:
+            media_type = "text/csv; charset=utf-8"
+        filename = f"{name}.{fmt}" + (".gz" if compress else "")
+        return ExportStream(chunks, media_type, filename, release)
+
+    @staticmethod
+    def _batches(
+        name: str,
+        table: ExportTable,
+        since: Optional[datetime],
+        until: Optional[datetime],
+        session_id: Optional[str],
+        batch_rows: int,
+    ) -> Iterator[list]:
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.export_batches(
+                name,
+                to_epoch_micros(since) if since is not None else None,
+                to_epoch_micros(until) if until is not None else None,
+                session_id,
+                batch_rows,
+            )
+
+        statement, model, keyset = _statement(name)
+        time_column = getattr(model, table.time_column)
+        if since is not None:
+            statement = statement.where(time_column >= since)
+        if until is not None:
+            statement = statement.where(time_column < until)
+        if session_id is not None:
+            statement = statement.where(getattr(model, table.session_column) == session_id)
+
+        # Keep long exports off the primary when a replica is running
+        replica = get_read_replica()
+        main = replica.engine if replica is not None else get_engine()
+        engines = [main] if name == "sessions" else get_shard_engines() or [main]
+        return _sql_batches(engines, statement, keyset, batch_rows)
+
+    @staticmethod
+    def _acquire_slot(max_concurrent: int) -> Callable[[], None]:
+        with ExportService._slots_lock:
+            if ExportService._slots is None:
+                ExportService._slots = threading.BoundedSemaphore(max_concurrent)
+        slots = ExportService._slots
+        if not slots.acquire(blocking=False):
+            raise ExportLimitError()
+        return slots.release
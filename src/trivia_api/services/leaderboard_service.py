@@ -1,9 +1,15 @@
 """Business logic for leaderboard management."""
-from typing import Optional
+import heapq
+from bisect import bisect_left
+from itertools import islice
+from typing import List, Optional
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from trivia_api.models.leaderboard import LeaderboardEntry
+from trivia_api.database import all_shard_sessions, shard_session
+from trivia_api.models.leaderboard import LeaderboardEntry, UserRankEntry
 from trivia_api.schemas import UserScoreORM
+from trivia_api.storage import get_memory_engine
 
 
 class LeaderboardService:
@@ -17,6 +23,8 @@ class LeaderboardService:
         Get leaderboard with pagination support.
 
         Ranking order: Score descending, then first_correct_timestamp ascending (tie-breaking).
+        With sharding, each shard returns its own first ``offset + limit`` users
+        and the sorted streams are merged.
 
         Args:
             db: Database session
@@ -26,27 +34,33 @@ class LeaderboardService:
         Returns:
             List of LeaderboardEntry models with rank positions
         """
-        # Query all users sorted by score descending, then by first_correct_timestamp ascending
-        users = (
-            db.query(UserScoreORM)
-            .filter(UserScoreORM.cumulative_score > 0)  # Only include users with scores
-            .order_by(
-                UserScoreORM.cumulative_score.desc(),
-                UserScoreORM.first_correct_timestamp.asc(),
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_leaderboard(limit, offset)
+
+        shards = all_shard_sessions(db)
+        if len(shards) == 1:
+            # Query all users sorted by score descending, then by first_correct_timestamp ascending
+            users = (
+                LeaderboardService._ranked_users(db)
+                .offset(offset)
+                .limit(limit)
+                .all()
             )
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
+        else:
+            per_shard = [
+                LeaderboardService._ranked_users(shard).limit(offset + limit).all()
+                for shard in shards
+            ]
+            merged = heapq.merge(
+                *per_shard,
+                key=lambda user: (-user.cumulative_score, user.first_correct_timestamp),
+            )
+            users = list(islice(merged, offset, offset + limit))
 
         # Build leaderboard with rank positions
         leaderboard = []
 
-        # Get total count for accurate ranking
-        total_users = (
-            db.query(UserScoreORM).filter(UserScoreORM.cumulative_score > 0).count()
-        )
-
         for idx, user in enumerate(users):
             rank = offset + idx + 1
 
@@ -60,6 +74,18 @@ class LeaderboardService:
 
         return leaderboard
 
+    @staticmethod
+    def _ranked_users(db: Session):
+        """Query users with a score in leaderboard order."""
+        return (
+            db.query(UserScoreORM)
+            .filter(UserScoreORM.cumulative_score > 0)  # Only include users with scores
+            .order_by(
+                UserScoreORM.cumulative_score.desc(),
+                UserScoreORM.first_correct_timestamp.asc(),
+            )
+        )
+
     @staticmethod
     def get_user_rank(db: Session, username: str) -> Optional[int]:
         """
@@ -72,27 +98,121 @@ class LeaderboardService:
         Returns:
             User's rank (1-indexed) or None if user not on leaderboard
         """
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_user_rank(username)
+
         user_score = (
-            db.query(UserScoreORM).filter(UserScoreORM.username == username).first()
+            shard_session(db, username)
+            .query(UserScoreORM)
+            .filter(UserScoreORM.username == username)
+            .first()
         )
 
         if not user_score or user_score.cumulative_score == 0:
             return None
 
-        # Count users ranked above this user
-        rank = (
-            db.query(UserScoreORM)
-            .filter(
-                (UserScoreORM.cumulative_score > user_score.cumulative_score)
-                | (
-                    (UserScoreORM.cumulative_score == user_score.cumulative_score)
-                    & (
-                        UserScoreORM.first_correct_timestamp
-                        < user_score.first_correct_timestamp
-                    )
-                )
-            )
-            .count()
-        ) + 1
+        # Count users ranked above this user (on every shard)
+        ahead = (UserScoreORM.cumulative_score > user_score.cumulative_score) | (
+            (UserScoreORM.cumulative_score == user_score.cumulative_score)
+            & (UserScoreORM.first_correct_timestamp < user_score.first_correct_timestamp)
+        )
+        rank = sum(shard.query(UserScoreORM).filter(ahead).count() for shard in all_shard_sessions(db)) + 1
 
         return rank
+
+    @staticmethod
+    def get_user_ranks(db: Session, usernames: List[str]) -> List[UserRankEntry]:
+        """
+        Get the scores and ranks of several users at once.
+
+        Instead of one rank query per user, this runs a fixed number of
+        statements per shard, all served by the ranking index:
+
+        1. one ``IN`` fetch for the requested users;
+        2. a per-score histogram of users scoring at least the lowest
+           requested score, which gives how many users rank above each score;
+        3. one statement counting, for each requested user, the users with the
+           same score who reached it earlier.
+
+        Args:
+            db: Database session
+            usernames: Usernames to look up; duplicates are returned once
+
+        Returns:
+            UserRankEntry models in request order (score 0 and no rank for
+            unknown or unscored users)
+        """
+        unique = list(dict.fromkeys(usernames))
+
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_user_ranks(unique)
+
+        # 1. Scores, grouped by the shard holding each user
+        by_shard: dict = {}
+        for username in unique:
+            by_shard.setdefault(shard_session(db, username), []).append(username)
+        found = {}
+        for shard, names in by_shard.items():
+            rows = shard.query(
+                UserScoreORM.username,
+                UserScoreORM.cumulative_score,
+                UserScoreORM.first_correct_timestamp,
+            ).filter(UserScoreORM.username.in_(names))
+            found.update((row.username, row) for row in rows)
+
+        # Distinct (score, first correct) pairs; users sharing one share a rank
+        targets = list(
+            {
+                (row.cumulative_score, row.first_correct_timestamp)
+                for row in found.values()
+                if row.cumulative_score > 0
+            }
+        )
+        ahead = dict.fromkeys(targets, 0)
+        if targets:
+            lowest = min(score for score, _ in targets)
+            for shard in all_shard_sessions(db):
+                # 2. Users above each requested score
+                histogram = sorted(
+                    shard.query(UserScoreORM.cumulative_score, func.count())
+                    .filter(UserScoreORM.cumulative_score >= lowest)
+                    .group_by(UserScoreORM.cumulative_score)
+                    .all()
+                )
+                scores = [score for score, _ in histogram]
+                above = [0] * (len(histogram) + 1)
+                for index in range(len(histogram) - 1, -1, -1):
+                    above[index] = above[index + 1] + histogram[index][1]
+
+                # 3. Earlier users within each requested score, in one statement
+                tie_counts = shard.execute(
+                    select(
+                        *(
+                            select(func.count())
+                            .select_from(UserScoreORM)
+                            .where(
+                                UserScoreORM.cumulative_score == score,
+                                UserScoreORM.first_correct_timestamp < first_correct,
+                            )
+                            .scalar_subquery()
+                            for score, first_correct in targets
+                        )
+                    )
+                ).one()
+
+                for target, tied_earlier in zip(targets, tie_counts):
+                    ahead[target] += above[bisect_left(scores, target[0] + 1)] + tied_earlier
+
+        entries = []
+        for username in unique:
+            row = found.get(username)
+            if row is None or row.cumulative_score == 0:
+                entries.append(UserRankEntry(username=username, score=0, rank=None))
+                continue
+            target = (row.cumulative_score, row.first_correct_timestamp)
+            entries.append(
+                UserRankEntry(username=username, score=row.cumulative_score, rank=ahead[target] + 1)
+            )
+        return entries
@@ -0,0 +1,232 @@
+"""Business logic for per-session leaderboard snapshots and rank movement."""
+import heapq
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from trivia_api.database import (
+    SessionLocal,
+    all_shard_sessions,
+    close_session,
+    get_read_replica,
+    get_shard_engines,
+    shard_index,
+    shard_session,
+)
+from trivia_api.errors import SnapshotNotFoundError
+from trivia_api.schemas import LeaderboardSnapshotORM, UserScoreORM
+from trivia_api.schemas.types import raw_timestamp
+from trivia_api.services.user_id_cache import user_ids
+from trivia_api.storage import get_memory_engine
+from trivia_api.utils.timestamps import get_utc_now
+
+
+class DecodedSnapshot(NamedTuple):
+    """Snapshot arrays, aligned and sorted by user key."""
+
+    user_keys: array
+    ranks: array
+    previous_ranks: array
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class RankSnapshotService:
+    """
+    Service layer for leaderboard snapshots.
+
+    A snapshot stores every scoring user's rank as three aligned arrays sorted
+    by user key: ``(shard index << 32) | user_id``, which stays unique when
+    user ids are assigned per shard. Capturing costs one ranked query and one
+    sort per session. A user's rank and movement are then a binary search in
+    the decoded arrays, which are cached per worker.
+    """
+
+    _CACHE_SIZE = 4
+    _cache: "OrderedDict[str, DecodedSnapshot]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    @staticmethod
+    def capture(db: Session, session_id: str) -> LeaderboardSnapshotORM:
+        """
+        Snapshot the current leaderboard for an ending session.
+
+        The snapshot is added to ``db`` for the caller to commit.
+
+        Args:
+            db: Database session
+            session_id: Session being ended
+
+        Returns:
+            The new LeaderboardSnapshotORM instance
+        """
+        per_shard = []
+        for index, shard in enumerate(all_shard_sessions(db)):
+            rows = (
+                shard.query(
+                    UserScoreORM.user_id,
+                    UserScoreORM.cumulative_score,
+                    raw_timestamp(UserScoreORM.first_correct_timestamp),
+                )
+                .filter(UserScoreORM.cumulative_score > 0)
+                .order_by(
+                    UserScoreORM.cumulative_score.desc(),
+                    UserScoreORM.first_correct_timestamp.asc(),
+                )
+                .all()
+            )
+            per_shard.append(
+                [(-score, first_correct, (index << 32) | user_id) for user_id, score, first_correct in rows]
+            )
+
+        # Leaderboard order gives the ranks; one sort by key makes them searchable
+        ranked = sorted(
+            (key, rank) for rank, (_, _, key) in enumerate(heapq.merge(*per_shard), start=1)
+        )
+
+        previous = RankSnapshotService._latest(db)
+        previous_rank = dict(zip(previous.user_keys, previous.ranks)) if previous else {}
+
+        snapshot = LeaderboardSnapshotORM(
+            session_id=session_id,
+            captured_at=get_utc_now(),
+            user_count=len(ranked),
+            user_keys=_pack(array("Q", (key for key, _ in ranked))),
+            ranks=_pack(array("I", (rank for _, rank in ranked))),
+            previous_ranks=_pack(array("I", (previous_rank.get(key, 0) for key, _ in ranked))),
+        )
+        db.add(snapshot)
+        return snapshot
+
+    @staticmethod
+    def get_rank_movement(db: Session, username: str, session_id: Optional[str] = None) -> dict:
+        """
+        Get a user's rank after a session and how it changed from the previous one.
+
+        Args:
+            db: Database session
+            username: Username
+            session_id: Ended session (defaults to the most recently captured)
+
+        Returns:
+            Dictionary with session_id, username, rank, previous_rank and delta
+            (positive when the user moved up); ranks are None when unranked
+
+        Raises:
+            SnapshotNotFoundError: If no snapshot exists for the session
+        """
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_rank_movement(username, session_id)
+
+        found = RankSnapshotService._find(db, session_id)
+        replica = get_read_replica()
+        if found is None and replica is not None and db.get_bind() is replica.engine:
+            # The replica may not have caught up with a session that just ended
+            primary = SessionLocal()
+            try:
+                found = RankSnapshotService._find(primary, session_id)
+            finally:
+                close_session(primary)
+        if found is None:
+            raise SnapshotNotFoundError()
+        session_id, snapshot = found
+
+        rank = previous_rank = None
+        key = RankSnapshotService._user_key(db, username)
+        if key is not None:
+            index = bisect_left(snapshot.user_keys, key)
+            if index < len(snapshot.user_keys) and snapshot.user_keys[index] == key:
+                rank = snapshot.ranks[index]
+                previous_rank = snapshot.previous_ranks[index] or None
+
+        return {
+            "session_id": session_id,
+            "username": username,
+            "rank": rank,
+            "previous_rank": previous_rank,
+            "delta": previous_rank - rank if rank and previous_rank else None,
+        }
+
+    @staticmethod
+    def _find(db: Session, session_id: Optional[str]) -> Optional[tuple[str, DecodedSnapshot]]:
+        """Load a session's snapshot (the latest if None); returns its session id and arrays."""
+        if session_id is None:
+            latest = (
+                db.query(LeaderboardSnapshotORM.session_id)
+                .order_by(LeaderboardSnapshotORM.captured_at.desc())
+                .first()
+            )
+            if latest is None:
+                return None
+            session_id = latest[0]
+        snapshot = RankSnapshotService._load(db, session_id)
+        return (session_id, snapshot) if snapshot is not None else None
+
+    @staticmethod
+    def _user_key(db: Session, username: str) -> Optional[int]:
+        engines = get_shard_engines()
+        index = shard_index(username, len(engines)) if engines else 0
+        user_id = user_ids.get(username)
+        if user_id is None:
+            user_id = (
+                shard_session(db, username)
+                .query(UserScoreORM.user_id)
+                .filter(UserScoreORM.username == username)
+                .scalar()
+            )
+            if user_id is None:
+                return None
+        return (index << 32) | user_id
+
+    @staticmethod
+    def _latest(db: Session) -> Optional[DecodedSnapshot]:
+        found = RankSnapshotService._find(db, None)
+        return found[1] if found else None
+
+    @staticmethod
+    def _load(db: Session, session_id: str) -> Optional[DecodedSnapshot]:
+        """Decode a snapshot, from the per-worker cache when possible (snapshots never change)."""
+        cache = RankSnapshotService._cache
+        decoded = cache.get(session_id)
+        if decoded is not None:
+            return decoded
+
+        row = (
+            db.query(
+                LeaderboardSnapshotORM.user_keys,
+                LeaderboardSnapshotORM.ranks,
+                LeaderboardSnapshotORM.previous_ranks,
+            )
+            .filter(LeaderboardSnapshotORM.session_id == session_id)
+            .first()
+        )
+        if row is None:
+            return None
+
+        decoded = DecodedSnapshot(
+            _unpack("Q", row.user_keys), _unpack("I", row.ranks), _unpack("I", row.previous_ranks)
+        )
+        with RankSnapshotService._cache_lock:
+            cache[session_id] = decoded
+            while len(cache) > RankSnapshotService._CACHE_SIZE:
+                cache.popitem(last=False)
+        return decoded
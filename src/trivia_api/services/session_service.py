@@ -2,10 +2,16 @@
 from typing import Optional
 from uuid import uuid4
 
+from sqlalchemy import case
 from sqlalchemy.orm import Session
 
-from trivia_api.errors import ActiveSessionExistsError, NoActiveSessionError
-from trivia_api.schemas import TriviaSessionORM, SessionStatus, AttemptRecordORM
+from trivia_api.database import all_shard_sessions
+from trivia_api.errors import ActiveSessionExistsError, NoActiveSessionError, SessionNotFoundError
+from trivia_api.schemas import TriviaSessionORM, SessionStatus, AttemptRecordORM, UserScoreORM
+from trivia_api.services.analytics_service import AnalyticsService, answer_analytics
+from trivia_api.services.answered_users_cache import answered_users
+from trivia_api.services.rank_snapshot_service import RankSnapshotService
+from trivia_api.storage import get_memory_engine
 from trivia_api.utils.timestamps import get_utc_now
 from trivia_api.utils.validators import normalize_answer
 
@@ -29,6 +35,12 @@ class SessionService:
         Raises:
             ActiveSessionExistsError: If a session is already active
         """
+        engine = get_memory_engine()
+        if engine is not None:
+            new_session = engine.start_session(question, correct_answer)
+            answer_analytics.reset(new_session.session_id)
+            return new_session
+
         # Check if active session already exists
         active_session = (
             db.query(TriviaSessionORM)
@@ -51,7 +63,10 @@ class SessionService:
 
         db.add(new_session)
         db.commit()
-        db.refresh(new_session)
+
+        # Nobody has answered yet; first answers can skip the duplicate lookup
+        answered_users.reset(session_id)
+        answer_analytics.reset(session_id)
 
         return new_session
 
@@ -66,6 +81,10 @@ class SessionService:
         Returns:
             Active TriviaSessionORM or None if no active session
         """
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_active_session()
+
         return (
             db.query(TriviaSessionORM)
             .filter(TriviaSessionORM.status == SessionStatus.ACTIVE)
@@ -86,19 +105,22 @@ class SessionService:
         Returns:
             Dictionary with question data or None if no active session
         """
-        session = SessionService.get_active_session(db)
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_current_question(reveal_answer)
 
-        if not session:
-            # Check if there's a recently ended session to still display
-            recent_session = (
-                db.query(TriviaSessionORM)
-                .order_by(TriviaSessionORM.ended_at.desc())
-                .first()
+        # Active session first, otherwise the most recently ended one (single query)
+        session = (
+            db.query(TriviaSessionORM)
+            .order_by(
+                case((TriviaSessionORM.status == SessionStatus.ACTIVE, 0), else_=1),
+                TriviaSessionORM.ended_at.desc(),
             )
-            if recent_session and recent_session.status == SessionStatus.ENDED:
-                session = recent_session
-            else:
-                return None
+            .first()
+        )
+
+        if not session:
+            return None
 
         return {
             "question": session.question,
@@ -110,7 +132,8 @@ class SessionService:
     @staticmethod
     def end_session(db: Session) -> TriviaSessionORM:
         """
-        End the currently active session.
+        End the currently active session, storing its answer analytics and a
+        leaderboard snapshot for rank-movement lookups.
 
         Args:
             db: Database session
@@ -121,6 +144,16 @@ class SessionService:
         Raises:
             NoActiveSessionError: If no active session exists
         """
+        engine = get_memory_engine()
+        if engine is not None:
+            if engine.active_session_id is None:
+                raise NoActiveSessionError()
+            # A single worker sees every answer, so the live data is complete
+            analytics = AnalyticsService.finish_session(None, engine.active_session_id)
+            session = engine.end_session(analytics)
+            answer_analytics.reset(None)
+            return session
+
         session = SessionService.get_active_session(db)
 
         if not session:
@@ -128,12 +161,76 @@ class SessionService:
 
         session.status = SessionStatus.ENDED
         session.ended_at = get_utc_now()
+        session.analytics = AnalyticsService.finish_session(db, session.session_id)
+        RankSnapshotService.capture(db, session.session_id)
 
         db.commit()
-        db.refresh(session)
+        answered_users.reset(None)
+        answer_analytics.reset(None)
 
         return session
 
+    @staticmethod
+    def get_session(db: Session, session_id: str) -> Optional[TriviaSessionORM]:
+        """
+        Get a session by id.
+
+        Args:
+            db: Database session
+            session_id: Session identifier
+
+        Returns:
+            TriviaSessionORM or None if it does not exist
+        """
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_session(session_id)
+
+        return db.get(TriviaSessionORM, session_id)
+
+    @staticmethod
+    def get_session_analytics(db: Session, session_id: Optional[str] = None) -> dict:
+        """
+        Get answer analytics for a session.
+
+        Active sessions are summarized live from this worker's aggregator;
+        ended sessions return the analytics stored when they ended.
+
+        Args:
+            db: Database session
+            session_id: Session identifier (defaults to the active session)
+
+        Returns:
+            Dictionary with session_id, is_active and the analytics summary
+
+        Raises:
+            NoActiveSessionError: If no session_id is given and none is active
+            SessionNotFoundError: If the session does not exist
+        """
+        active = SessionService.get_active_session(db)
+        if session_id is None:
+            if not active:
+                raise NoActiveSessionError()
+            session_id = active.session_id
+
+        if active and active.session_id == session_id:
+            return {
+                "session_id": session_id,
+                "is_active": True,
+                **AnalyticsService.live_summary(session_id),
+            }
+
+        session = SessionService.get_session(db, session_id)
+        if session is None:
+            raise SessionNotFoundError()
+        summary = session.analytics
+        if summary is None:
+            # Ended before analytics were recorded; rebuild from stored attempts
+            summary = AnalyticsService.finish_session(
+                None if get_memory_engine() is not None else db, session_id
+            )
+        return {"session_id": session_id, "is_active": False, **summary}
+
     @staticmethod
     def get_successful_attempts(db: Session, session_id: str) -> list[str]:
         """
@@ -146,14 +243,23 @@ class SessionService:
         Returns:
             List of usernames who answered correctly
         """
-        attempts = (
-            db.query(AttemptRecordORM.username)
-            .filter(
-                AttemptRecordORM.session_id == session_id,
-                AttemptRecordORM.is_correct == True,
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_successful_attempts(session_id)
+
+        usernames = []
+        # Each user lives on exactly one shard, so the union has no duplicates
+        for shard in all_shard_sessions(db):
+            attempts = (
+                shard.query(UserScoreORM.username)
+                .join(AttemptRecordORM, AttemptRecordORM.user_id == UserScoreORM.user_id)
+                .filter(
+                    AttemptRecordORM.session_id == session_id,
+                    AttemptRecordORM.is_correct == True,
+                )
+                .distinct()
+                .all()
             )
-            .distinct()
-            .all()
-        )
+            usernames.extend(attempt[0] for attempt in attempts)
 
-        return [attempt[0] for attempt in attempts]
+        return usernames
@@ -0,0 +1,308 @@
+"""Top-N leaderboard shared by all workers on a host through a memory-mapped file."""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Optional
+
+from trivia_api.config import Settings
+from trivia_api.database import SessionLocal, close_session
+from trivia_api.services.leaderboard_service import LeaderboardService
+from trivia_api.utils.metrics import record_cache_access
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"TLB1"
+# magic, payload capacity, entry capacity, generation, last score change (epoch micros)
+_HEADER = struct.Struct("<4sIIQQ")
+_HEADER_SIZE = 64
+_GENERATION_OFFSET = 12
+_DIRTY_OFFSET = 20
+# sequence (odd while being written), as of (epoch micros), entries, payload bytes, flags
+_SLOT_HEADER = struct.Struct("<QQIII")
+_SLOT_HEADER_SIZE = 32
+_SEQUENCE = struct.Struct("<Q")
+_OFFSETS = struct.Struct("<II")
+_COMPLETE = 1  # The snapshot holds every ranked user, not just the top N
+# Average encoded entry size reserved per entry; longer snapshots are truncated
+_BYTES_PER_ENTRY = 128
+
+
+def _now_micros() -> int:
+    return time.time_ns() // 1000
+
+
+class SharedLeaderboard:
+    """
+    Pre-encoded leaderboard pages published in a memory-mapped file.
+
+    One worker per host holds an exclusive lock on ``<path>.lock`` and acts as
+    the writer: when the last-score-change stamp in the file header is newer
+    than the published snapshot, it rebuilds the top ``capacity`` entries from
+    the database and publishes them. Any worker can take over the lock when
+    the writer exits.
+
+    The file holds two slots. The writer fills the slot readers are not using,
+    then flips the generation number in the header. Each slot carries a
+    sequence number that is odd while the slot is being written, so a reader
+    that raced with two consecutive publishes notices and retries. Entries
+    are stored as JSON fragments with an offset table, so a page is one slice
+    of the mapping that goes into the response unchanged. The slice is copied
+    out before the sequence is checked again: a view into the mapping could
+    be overwritten by the next publish after the check passed.
+    """
+
+    def __init__(self, path: str, capacity: int, refresh_interval: float, max_staleness: float):
+        self.path = path
+        self.capacity = capacity
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.is_writer = False
+        self._mm: Optional[mmap.mmap] = None
+        self._inode: Optional[int] = None
+        self._lock_file = None
+        self._published_as_of = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Reading
+
+    def read_page(self, offset: int, limit: int, last_write: Optional[float] = None) -> Optional[bytes]:
+        """
+        Get a leaderboard page as encoded JSON array items.
+
+        Args:
+            offset: Number of entries to skip
+            limit: Maximum number of entries
+            last_write: Time of the client's last write, if known
+
+        Returns:
+            Comma-separated JSON entry objects, or None when the caller must
+            query the database (no snapshot yet, page beyond the published
+            entries, snapshot too stale or older than the client's last write)
+        """
+        page = self._read_page(offset, limit, last_write)
+        record_cache_access("shared_leaderboard", page is not None)
+        return page
+
+    def _read_page(self, offset: int, limit: int, last_write: Optional[float]) -> Optional[bytes]:
+        mm = self._mm
+        if mm is None:
+            return None
+        _, payload_capacity, capacity, generation, dirty_at = _HEADER.unpack_from(mm, 0)
+        if generation == 0:
+            return None
+        slot_size = _SLOT_HEADER_SIZE + (capacity + 1) * 4 + payload_capacity
+
+        for _ in range(4):
+            generation = _SEQUENCE.unpack_from(mm, _GENERATION_OFFSET)[0]
+            base = _HEADER_SIZE + (generation % 2) * slot_size
+            sequence, as_of, count, _, flags = _SLOT_HEADER.unpack_from(mm, base)
+            if sequence & 1:
+                continue
+
+            if dirty_at > as_of and _now_micros() - as_of > self.max_staleness * 1_000_000:
+                return None  # Writer is not keeping up (or has exited)
+            if last_write is not None and last_write * 1_000_000 >= as_of:
+                return None
+            if offset + limit > count and not flags & _COMPLETE:
+                return None
+
+            low, high = min(offset, count), min(offset + limit, count)
+            if low == high:
+                page = b""
+            else:
+                offsets = base + _SLOT_HEADER_SIZE
+                start = _OFFSETS.unpack_from(mm, offsets + low * 4)[0]
+                stop = _OFFSETS.unpack_from(mm, offsets + high * 4)[0] - 1  # Drop the separator
+                payload = offsets + (capacity + 1) * 4
+                page = mm[payload + start:payload + stop]
+
+            if _SEQUENCE.unpack_from(mm, base)[0] == sequence:
+                return page
+        return None
+
+    def mark_dirty(self) -> None:
+        """Record that scores changed, so the writer republishes."""
+        mm = self._mm
+        if mm is not None:
+            _SEQUENCE.pack_into(mm, _DIRTY_OFFSET, _now_micros())
+
+    # Lifecycle
+
+    def start(self) -> None:
+        """Attach to the file and start the writer election/refresh thread."""
+        if fcntl is None:
+            logger.warning("File locking unavailable; shared leaderboard disabled")
+            return
+        self._attach()
+        self._thread = threading.Thread(
+            target=self._run, name="shared-leaderboard", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and release the writer lock and mapping."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._lock_file is not None:
+            self._lock_file.close()  # Releases the flock
+            self._lock_file = None
+        mm, self._mm = self._mm, None
+        if mm is not None:
+            mm.close()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                if not self.is_writer:
+                    self._try_become_writer()
+                    self._reattach_if_replaced()
+                if self.is_writer:
+                    dirty_at = _HEADER.unpack_from(self._mm, 0)[4]
+                    if self._published_as_of == 0 or dirty_at >= self._published_as_of:
+                        self._rebuild()
+            except Exception:
+                logger.exception("Shared leaderboard refresh failed")
+            self._stopped.wait(self.refresh_interval)
+
+    def _try_become_writer(self) -> None:
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return
+        self._lock_file = lock_file
+        self._create_file()
+        self.is_writer = True
+        logger.info("This worker publishes the shared leaderboard (pid %d)", os.getpid())
+
+    def _attach(self) -> None:
+        try:
+            with open(self.path, "r+b") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                mm = mmap.mmap(f.fileno(), 0)
+        except (FileNotFoundError, ValueError):
+            return  # Not created yet (or empty); retried by the thread
+        if mm[:4] != _MAGIC:
+            mm.close()
+            return
+        old, self._mm, self._inode = self._mm, mm, inode
+        if old is not None:
+            old.close()
+
+    def _reattach_if_replaced(self) -> None:
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return
+        if inode != self._inode:
+            self._attach()
+
+    def _create_file(self) -> None:
+        # Fresh file renamed into place: readers never map a half-initialized file
+        payload_capacity = self.capacity * _BYTES_PER_ENTRY
+        slot_size = _SLOT_HEADER_SIZE + (self.capacity + 1) * 4 + payload_capacity
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.truncate(_HEADER_SIZE + 2 * slot_size)
+            f.write(_HEADER.pack(_MAGIC, payload_capacity, self.capacity, 0, _now_micros()))
+        os.replace(tmp_path, self.path)
+        self._attach()
+
+    # Publishing (writer only)
+
+    def _rebuild(self) -> None:
+        as_of = _now_micros()  # Before the query, so later changes trigger a rebuild
+        db = SessionLocal()
+        try:
+            entries = LeaderboardService.get_leaderboard(db, limit=self.capacity + 1, offset=0)
+        finally:
+            close_session(db)
+
+        _, payload_capacity, _, _, _ = _HEADER.unpack_from(self._mm, 0)
+        complete = len(entries) <= self.capacity
+        fragments, offsets, size = [], [], 0
+        for entry in entries[: self.capacity]:
+            fragment = json.dumps(
+                entry.model_dump(), ensure_ascii=False, separators=(",", ":")
+            ).encode()
+            if size + len(fragment) + 1 > payload_capacity:
+                complete = False
+                break
+            offsets.append(size)
+            fragments.append(fragment)
+            size += len(fragment) + 1
+        offsets.append(size)
+
+        self._publish(as_of, b",".join(fragments) + b",", offsets, complete)
+        self._published_as_of = as_of
+
+    def _publish(self, as_of: int, payload: bytes, offsets: list, complete: bool) -> None:
+        mm = self._mm
+        _, payload_capacity, capacity, generation, _ = _HEADER.unpack_from(mm, 0)
+        slot_size = _SLOT_HEADER_SIZE + (capacity + 1) * 4 + payload_capacity
+        target = generation + 1
+        base = _HEADER_SIZE + (target % 2) * slot_size
+        sequence = _SEQUENCE.unpack_from(mm, base)[0]
+
+        _SEQUENCE.pack_into(mm, base, sequence + 1)  # Odd: being written
+        count = len(offsets) - 1
+        struct.pack_into(f"<{len(offsets)}I", mm, base + _SLOT_HEADER_SIZE, *offsets)
+        payload_base = base + _SLOT_HEADER_SIZE + (capacity + 1) * 4
+        mm[payload_base:payload_base + len(payload)] = payload
+        _SLOT_HEADER.pack_into(
+            mm, base, sequence + 1, as_of, count, len(payload), _COMPLETE if complete else 0
+        )
+        _SEQUENCE.pack_into(mm, base, sequence + 2)
+        _SEQUENCE.pack_into(mm, _GENERATION_OFFSET, target)
+
+
+_shared_leaderboard: Optional[SharedLeaderboard] = None
+
+
+def get_shared_leaderboard() -> Optional[SharedLeaderboard]:
+    """Get the running shared leaderboard, or None when disabled."""
+    return _shared_leaderboard
+
+
+def start_shared_leaderboard(settings: Settings) -> Optional[SharedLeaderboard]:
+    """
+    Start the shared leaderboard configured by settings, if any.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        The running shared leaderboard, or None when SHARED_LEADERBOARD_PATH is unset
+    """
+    global _shared_leaderboard
+    if not settings.SHARED_LEADERBOARD_PATH:
+        return None
+    shared = SharedLeaderboard(
+        settings.SHARED_LEADERBOARD_PATH,
+        settings.SHARED_LEADERBOARD_SIZE,
+        settings.SHARED_LEADERBOARD_REFRESH_MS / 1000,
+        settings.SHARED_LEADERBOARD_MAX_STALENESS_SECONDS,
+    )
+    shared.start()
+    _shared_leaderboard = shared
+    return shared
+
+
+def stop_shared_leaderboard() -> None:
+    """Stop the running shared leaderboard, if any."""
+    global _shared_leaderboard
+    if _shared_leaderboard is not None:
+        _shared_leaderboard.stop()
+        _shared_leaderboard = None
@@ -0,0 +1,292 @@
+"""Business logic for teams, team membership and the team leaderboard."""
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from trivia_api.database import all_shard_sessions, shard_index
+from trivia_api.errors import InvalidTeamImportError
+from trivia_api.models.team import TeamLeaderboardEntry
+from trivia_api.schemas import TeamMemberORM, TeamORM, TeamScoreORM, UserScoreORM
+from trivia_api.schemas.types import UTCDateTime
+from trivia_api.storage import get_memory_engine
+
+# Ids per IN list, well below SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+
+def _chunks(items: list, size: int = _IN_CHUNK) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class TeamService:
+    """
+    Service layer for teams.
+
+    A team's score is the sum of its members' cumulative scores. It is kept in
+    team_scores and bumped in the same transaction as each member's score
+    (see ``UserScoreService``), so the team leaderboard is an indexed scan
+    like the individual one. Membership changes go through ``import_members``,
+    which recomputes the affected teams from user_scores.
+    """
+
+    # Scoring (called inside the user's score transaction)
+
+    @staticmethod
+    def add_point(db: Session, user_id: int, at: datetime) -> None:
+        """
+        Add one point to the team of a user who just scored, if any.
+
+        Args:
+            db: Session on the user's shard, inside the scoring transaction
+            user_id: User who answered correctly
+            at: Time of the correct answer
+        """
+        team_id = select(TeamMemberORM.team_id).where(TeamMemberORM.user_id == user_id).scalar_subquery()
+        db.execute(
+            update(TeamScoreORM)
+            .where(TeamScoreORM.team_id == team_id)
+            .values(score=TeamScoreORM.score + 1, reached_at=literal(at, UTCDateTime()))
+        )
+
+    @staticmethod
+    def add_points(db: Session, answered_at: dict[int, datetime]) -> None:
+        """
+        Add one point per scoring member to the teams of several users with one UPDATE.
+
+        Each team's reached_at is the time of its own latest scoring member's
+        answer, as if the answers had been scored one by one.
+
+        Args:
+            db: Session on the users' shard, inside the scoring transaction
+            answered_at: Mapping of user id to the time of the correct answer
+        """
+        user_ids = list(answered_at)
+        scoring_members = (
+            TeamMemberORM.team_id == TeamScoreORM.team_id,
+            TeamMemberORM.user_id.in_(user_ids),
+        )
+        points = select(func.count()).where(*scoring_members).scalar_subquery()
+        answer_time = case(
+            {user_id: literal(at, UTCDateTime()) for user_id, at in answered_at.items()},
+            value=TeamMemberORM.user_id,
+        )
+        reached_at = select(func.max(answer_time, type_=UTCDateTime())).where(*scoring_members).scalar_subquery()
+        db.execute(
+            update(TeamScoreORM)
+            .where(TeamScoreORM.team_id.in_(select(TeamMemberORM.team_id).where(TeamMemberORM.user_id.in_(user_ids))))
+            .values(score=TeamScoreORM.score + points, reached_at=reached_at)
+        )
+
+    # Leaderboard
+
+    @staticmethod
+    def get_team_leaderboard(db: Session, limit: int = 10, offset: int = 0) -> list:
+        """
+        Get the team leaderboard with pagination support.
+
+        Ranking order: score descending, then the time the team reached its
+        score ascending. Without sharding this is one indexed query; with
+        sharding every shard's partial scores are added up (one row per team
+        and shard).
+
+        Args:
+            db: Database session
+            limit: Maximum number of entries to return
+            offset: Number of entries to skip
+
+        Returns:
+            List of TeamLeaderboardEntry models with rank positions
+        """
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_team_leaderboard(limit, offset)
+
+        shards = all_shard_sessions(db)
+        if len(shards) == 1:
+            rows = db.execute(
+                select(TeamORM.name, TeamScoreORM.score, TeamScoreORM.member_count)
+                .join(TeamORM, TeamORM.team_id == TeamScoreORM.team_id)
+                .where(TeamScoreORM.score > 0)
+                .order_by(TeamScoreORM.score.desc(), TeamScoreORM.reached_at.asc())
+                .offset(offset)
+                .limit(limit)
+            ).all()
+        else:
+            totals: dict = defaultdict(lambda: [0, None, 0])  # team_id -> [score, reached_at, members]
+            for shard in shards:
+                for team_id, score, reached_at, members in shard.execute(
+                    select(
+                        TeamScoreORM.team_id, TeamScoreORM.score, TeamScoreORM.reached_at, TeamScoreORM.member_count
+                    )
+                ):
+                    total = totals[team_id]
+                    total[0] += score
+                    if score and (total[1] is None or reached_at > total[1]):
+                        total[1] = reached_at
+                    total[2] += members
+            ranked = sorted(
+                (item for item in totals.items() if item[1][0] > 0),
+                key=lambda item: (-item[1][0], item[1][1]),
+            )[offset:offset + limit]
+            names = dict(
+                db.execute(
+                    select(TeamORM.team_id, TeamORM.name).where(TeamORM.team_id.in_([team_id for team_id, _ in ranked]))
+                ).all()
+            ) if ranked else {}
+            rows = [(names[team_id], score, members) for team_id, (score, _, members) in ranked]
+
+        return [
+            TeamLeaderboardEntry(rank=offset + idx + 1, team=name, score=score, members=members)
+            for idx, (name, score, members) in enumerate(rows)
+        ]
+
+    # Membership
+
+    @staticmethod
+    def import_members(db: Session, teams: dict[str, list[str]]) -> int:
+        """
+        Create teams and replace their membership.
+
+        Each listed team ends up with exactly the listed members; listed users
+        leave their previous team. Users who have not played yet are created.
+        On each shard the membership change and the recomputed scores of every
+        affected team are committed together.
+
+        Args:
+            db: Database session
+            teams: Mapping of team name to the usernames of all its members
+
+        Returns:
+            Number of memberships set
+
+        Raises:
+            InvalidTeamImportError: If a username is listed in more than one team
+        """
+        team_of: dict[str, str] = {}
+        for name, members in teams.items():
+            for username in members:
+                if team_of.setdefault(username, name) != name:
+                    raise InvalidTeamImportError(f"User {username!r} is listed in more than one team")
+
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.import_team_members(teams)
+
+        team_ids = TeamService._ensure_teams(db, list(teams))
+
+        shards = all_shard_sessions(db)
+        usernames_by_shard: list = [[] for _ in shards]
+        for username in team_of:
+            index = shard_index(username, len(shards)) if len(shards) > 1 else 0
+            usernames_by_shard[index].append(username)
+
+        for shard, usernames in zip(shards, usernames_by_shard, strict=True):
+            TeamService._replace_members(shard, team_ids, team_of, usernames)
+
+        return len(team_of)
+
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """
+        Recompute every team score from membership and user_scores.
+
+        Repairs scores after user_scores or team_members were changed outside
+        the services (restores, manual fixes, bulk loads).
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of team score rows written (one per team and shard)
+        """
+        written = 0
+        for shard in all_shard_sessions(db):
+            written += TeamService._rebuild_scores(shard, None)
+            shard.commit()
+        return written
+
+    @staticmethod
+    def _ensure_teams(db: Session, names: list[str]) -> dict[str, int]:
+        """Look up teams by name, creating missing ones; returns name -> team_id."""
+        ids = dict(db.execute(select(TeamORM.name, TeamORM.team_id).where(TeamORM.name.in_(names))).all())
+        missing = [name for name in names if name not in ids]
+        if missing:
+            try:
+                ids.update(
+                    (name, team_id)
+                    for team_id, name in db.execute(
+                        insert(TeamORM).returning(TeamORM.team_id, TeamORM.name),
+                        [{"name": name} for name in missing],
+                    )
+                )
+                db.commit()
+            except IntegrityError:
+                # Created concurrently by another import
+                db.rollback()
+                ids = dict(db.execute(select(TeamORM.name, TeamORM.team_id).where(TeamORM.name.in_(names))).all())
+        return ids
+
+    @staticmethod
+    def _replace_members(
+        db: Session, team_ids: dict[str, int], team_of: dict[str, str], usernames: list[str]
+    ) -> None:
+        """Move one shard's listed users into their teams and commit the recomputed team scores."""
+        # Imported here: UserScoreService updates team scores through this module
+        from trivia_api.services.user_score_service import UserScoreService
+
+        user_ids: dict[str, int] = {}
+        for chunk in _chunks(usernames):
+            user_ids.update(UserScoreService.get_user_ids(db, chunk))
+
+        # Teams whose sums change: the listed ones and those the users leave
+        listed = list(team_ids.values())
+        affected = set(listed)
+        for chunk in _chunks(list(user_ids.values())):
+            affected.update(
+                db.scalars(select(TeamMemberORM.team_id).where(TeamMemberORM.user_id.in_(chunk)).distinct())
+            )
+            db.execute(delete(TeamMemberORM).where(TeamMemberORM.user_id.in_(chunk)))
+        for chunk in _chunks(listed):
+            db.execute(delete(TeamMemberORM).where(TeamMemberORM.team_id.in_(chunk)))
+        if user_ids:
+            db.execute(
+                insert(TeamMemberORM),
+                [
+                    {"user_id": user_id, "team_id": team_ids[team_of[username]]}
+                    for username, user_id in user_ids.items()
+                ],
+            )
+        TeamService._rebuild_scores(db, sorted(affected))
+        db.commit()
+
+    @staticmethod
+    def _rebuild_scores(db: Session, team_ids: Optional[Iterable[int]]) -> int:
+        """Replace team_scores rows on one shard with sums over the members (all teams if None)."""
+        scored = case((UserScoreORM.cumulative_score > 0, UserScoreORM.last_updated))
+        sums = (
+            select(
+                TeamMemberORM.team_id,
+                func.sum(UserScoreORM.cumulative_score),
+                func.max(scored),
+                func.count(),
+            )
+            .join(UserScoreORM, UserScoreORM.user_id == TeamMemberORM.user_id)
+            .group_by(TeamMemberORM.team_id)
+        )
+        columns = ["team_id", "score", "reached_at", "member_count"]
+        if team_ids is None:
+            db.execute(delete(TeamScoreORM))
+            return db.execute(insert(TeamScoreORM).from_select(columns, sums)).rowcount
+
+        written = 0
+        for chunk in _chunks(list(team_ids)):
+            db.execute(delete(TeamScoreORM).where(TeamScoreORM.team_id.in_(chunk)))
+            written += db.execute(
+                insert(TeamScoreORM).from_select(columns, sums.where(TeamMemberORM.team_id.in_(chunk)))
+            ).rowcount
+        return written
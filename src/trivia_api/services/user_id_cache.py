@@ -0,0 +1,61 @@
+"""In-process username to user_id interning cache."""
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from trivia_api.utils.metrics import record_cache_access
+
+
+class UserIdCache:
+    """
+    Bounded LRU mapping usernames to their ``user_scores.user_id``.
+
+    A username's id never changes once its row is committed, so entries never
+    go stale; only ids of committed rows may be stored.
+    """
+
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self._ids: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[int]:
+        """
+        Look up a cached user id.
+
+        Args:
+            username: Username
+
+        Returns:
+            User id, or None if not cached
+        """
+        user_id = self._ids.get(username)
+        record_cache_access("user_ids", user_id is not None)
+        if user_id is not None:
+            with self._lock:
+                if username in self._ids:
+                    self._ids.move_to_end(username)
+        return user_id
+
+    def put(self, username: str, user_id: int) -> None:
+        """
+        Cache the id of a committed user row.
+
+        Args:
+            username: Username
+            user_id: Committed user id
+        """
+        with self._lock:
+            self._ids[username] = user_id
+            self._ids.move_to_end(username)
+            while len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every cached id."""
+        with self._lock:
+            self._ids.clear()
+
+
+# Process-wide cache shared by all requests in this worker
+user_ids = UserIdCache()
@@ -1,26 +1,79 @@
 """Business logic for managing user scores."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import case, event, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from trivia_api.database import shard_session
 from trivia_api.schemas import UserScoreORM
+from trivia_api.schemas.types import UTCDateTime
+from trivia_api.services.team_service import TeamService
+from trivia_api.services.user_id_cache import user_ids
+from trivia_api.storage import get_memory_engine
 from trivia_api.utils.timestamps import get_utc_now
 
 
+# Users created in a session's open transaction: username -> user_id. Their
+# ids are reused within the transaction and cached only once it commits.
+_CREATED = "created_user_ids"
+
+
+def _cache_created_users(session: Session) -> None:
+    for username, user_id in session.info.pop(_CREATED, {}).items():
+        user_ids.put(username, user_id)
+
+
+def _forget_created_users(session: Session) -> None:
+    session.info.pop(_CREATED, None)
+
+
+event.listen(Session, "after_commit", _cache_created_users)
+event.listen(Session, "after_rollback", _forget_created_users)
+
+
 class UserScoreService:
     """Service layer for user score management."""
 
     @staticmethod
-    def get_or_create_user_score(db: Session, username: str) -> UserScoreORM:
+    def _find_user_score(db: Session, username: str) -> Optional[UserScoreORM]:
+        """Load a user's score row, by primary key when the id is cached."""
+        user_id = user_ids.get(username)
+        if user_id is not None:
+            return db.get(UserScoreORM, user_id)
+
+        user_score = db.query(UserScoreORM).filter(UserScoreORM.username == username).first()
+        # Rows created in this (uncommitted) transaction could still be rolled back
+        if user_score and username not in db.info.get(_CREATED, {}):
+            user_ids.put(username, user_score.user_id)
+        return user_score
+
+    @staticmethod
+    def get_or_create_user_score(
+        db: Session, username: str, commit: bool = True
+    ) -> UserScoreORM:
         """
         Get or create user score record.
 
+        A new record is flushed so its user_id can be referenced by attempts in
+        the same transaction.
+
         Args:
-            db: Database session
+            db: Database session (routed to the user's shard)
             username: Username
+            commit: Commit a newly created record; pass False to leave it in the
+                caller's transaction
 
         Returns:
             UserScoreORM instance (existing or newly created)
         """
-        user_score = db.query(UserScoreORM).filter(UserScoreORM.username == username).first()
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_or_create_user_score(username)
+
+        db = shard_session(db, username)
+        user_score = UserScoreService._find_user_score(db, username)
 
         if not user_score:
             user_score = UserScoreORM(
@@ -29,37 +82,189 @@ class UserScoreService:
                 last_updated=get_utc_now(),
             )
             db.add(user_score)
-            db.commit()
-            db.refresh(user_score)
+            try:
+                db.flush()
+                db.info.setdefault(_CREATED, {})[username] = user_score.user_id
+            except IntegrityError:
+                # Created concurrently by another request; use that row
+                db.rollback()
+                user_score = UserScoreService._find_user_score(db, username)
+                if user_score is None:
+                    raise
+            if commit:
+                db.commit()
 
         return user_score
 
     @staticmethod
-    def increment_score(db: Session, username: str) -> UserScoreORM:
+    def get_user_id(db: Session, username: str) -> int:
+        """
+        Resolve a username to its user_id, creating the user record if needed.
+
+        Served from the in-process interning cache once the user's row is known
+        to be committed, so repeat submissions need no lookup. A user created
+        earlier in the same transaction is not looked up again either; its id
+        is cached when the transaction commits.
+
+        Args:
+            db: Database session
+            username: Username
+
+        Returns:
+            User id
+        """
+        user_id = user_ids.get(username)
+        if user_id is None:
+            user_id = db.info.get(_CREATED, {}).get(username)
+        if user_id is not None:
+            return user_id
+
+        # Ids are per shard, but a username always maps to the same shard
+        return UserScoreService.get_or_create_user_score(db, username, commit=False).user_id
+
+    @staticmethod
+    def get_user_ids(db: Session, usernames: list[str]) -> dict[str, int]:
+        """
+        Resolve several usernames on one shard to user ids, creating missing users.
+
+        Uncached usernames are looked up with one query and missing users are
+        inserted together and committed, so call this before adding other work
+        to the transaction. If another worker creates one of them at the same
+        time, the missing users are created one by one instead.
+
+        Args:
+            db: Database session on the users' shard
+            usernames: Distinct usernames, all on this shard
+
+        Returns:
+            Mapping of username to user id
+        """
+        ids = {}
+        uncached = []
+        created = db.info.get(_CREATED, {})
+        for username in usernames:
+            user_id = user_ids.get(username) or created.get(username)
+            if user_id is None:
+                uncached.append(username)
+            else:
+                ids[username] = user_id
+        if not uncached:
+            return ids
+
+        rows = db.execute(
+            select(UserScoreORM.user_id, UserScoreORM.username).where(UserScoreORM.username.in_(uncached))
+        )
+        for user_id, username in rows:
+            ids[username] = user_id
+            user_ids.put(username, user_id)
+
+        now = get_utc_now()
+        new_users = [username for username in uncached if username not in ids]
+        if not new_users:
+            return ids
+
+        try:
+            # One multi-row INSERT; ids come back paired with their usernames
+            rows = db.execute(
+                insert(UserScoreORM).returning(UserScoreORM.user_id, UserScoreORM.username),
+                [{"username": username, "cumulative_score": 0, "last_updated": now} for username in new_users],
+            ).all()
+            db.commit()
+        except IntegrityError:
+            # Some were created concurrently by another request
+            db.rollback()
+            for username in new_users:
+                ids[username] = UserScoreService.get_or_create_user_score(db, username).user_id
+            return ids
+
+        for user_id, username in rows:
+            ids[username] = user_id
+            user_ids.put(username, user_id)
+        return ids
+
+    @staticmethod
+    def increment_score(db: Session, username: str, commit: bool = True) -> UserScoreORM:
         """
         Increment user's cumulative score by 1.
 
+        The increment is a single ``UPDATE ... SET cumulative_score =
+        cumulative_score + 1 ... RETURNING`` rather than a read-modify-write,
+        so concurrent increments cannot lose updates, and first_correct_timestamp
+        is only set if it is still empty. The user's team score, if any, is
+        incremented in the same transaction.
+
         Args:
             db: Database session
             username: Username
+            commit: Commit the change; pass False to include it in the caller's transaction
 
         Returns:
             Updated UserScoreORM instance
         """
-        user_score = UserScoreService.get_or_create_user_score(db, username)
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.increment_score(username)
 
-        # Set first_correct_timestamp only on first correct answer
-        if user_score.cumulative_score == 0:
-            user_score.first_correct_timestamp = get_utc_now()
+        db = shard_session(db, username)
+        user_id = UserScoreService.get_user_id(db, username)
 
-        user_score.cumulative_score += 1
-        user_score.last_updated = get_utc_now()
+        now = get_utc_now()
+        user_score = db.execute(
+            update(UserScoreORM)
+            .where(UserScoreORM.user_id == user_id)
+            .values(
+                cumulative_score=UserScoreORM.cumulative_score + 1,
+                # Set first_correct_timestamp only on first correct answer
+                first_correct_timestamp=func.coalesce(
+                    UserScoreORM.first_correct_timestamp, literal(now, UTCDateTime())
+                ),
+                last_updated=now,
+            )
+            .returning(UserScoreORM),
+            execution_options={"populate_existing": True},
+        ).scalar_one()
+        TeamService.add_point(db, user_id, now)
 
-        db.commit()
-        db.refresh(user_score)
+        if commit:
+            db.commit()
 
         return user_score
 
+    @staticmethod
+    def increment_scores(db: Session, answered_at: dict[int, datetime]) -> dict[int, int]:
+        """
+        Increment several users' cumulative scores by 1 with one UPDATE.
+
+        Like ``increment_score`` for a batch of users on one shard; each user's
+        first_correct_timestamp (if still empty) is set to the time of their own
+        answer, and their teams' scores are incremented. The change is left in
+        the caller's transaction.
+
+        Args:
+            db: Database session on the users' shard
+            answered_at: Mapping of user id to the time of the correct answer
+
+        Returns:
+            Mapping of user id to updated cumulative score
+        """
+        answer_time = case(
+            {user_id: literal(at, UTCDateTime()) for user_id, at in answered_at.items()},
+            value=UserScoreORM.user_id,
+        )
+        rows = db.execute(
+            update(UserScoreORM)
+            .where(UserScoreORM.user_id.in_(list(answered_at)))
+            .values(
+                cumulative_score=UserScoreORM.cumulative_score + 1,
+                first_correct_timestamp=func.coalesce(UserScoreORM.first_correct_timestamp, answer_time),
+                last_updated=answer_time,
+            )
+            .returning(UserScoreORM.user_id, UserScoreORM.cumulative_score)
+        )
+        scores = dict(rows.all())
+        TeamService.add_points(db, answered_at)
+        return scores
+
     @staticmethod
     def get_user_score(db: Session, username: str) -> int:
         """
@@ -72,5 +277,10 @@ class UserScoreService:
         Returns:
             Cumulative score (0 if user not found)
         """
-        user_score = db.query(UserScoreORM).filter(UserScoreORM.username == username).first()
+        engine = get_memory_engine()
+        if engine is not None:
+            return engine.get_user_score(username)
+
+        db = shard_session(db, username)
+        user_score = UserScoreService._find_user_score(db, username)
         return user_score.cumulative_score if user_score else 0
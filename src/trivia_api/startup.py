@@ -0,0 +1,197 @@
+"""Database preparation at application startup."""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import Integer, inspect
+from sqlalchemy.engine import Engine
+
+from trivia_api.config import Settings
+from trivia_api.database import Base
+from trivia_api.utils.metrics import registry
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+STARTUP_SECONDS = registry.gauge(
+    "trivia_startup_seconds",
+    "Time spent in each startup phase of this worker",
+    ("phase",),
+)
+
+
+@contextmanager
+def startup_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive file lock so only one worker on the host runs DDL at a time.
+
+    Args:
+        path: Lock file path (created if missing)
+    """
+    if fcntl is None:
+        logger.warning("File locking unavailable; running startup DDL without a lock")
+        yield
+        return
+
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _alembic_config(settings: Settings, url: str):
+    from alembic.config import Config
+
+    config = Config(settings.ALEMBIC_CONFIG)
+    # Resolve a relative script_location against alembic.ini, not the working directory
+    script_location = config.get_main_option("script_location")
+    if script_location and not os.path.isabs(script_location):
+        config.set_main_option(
+            "script_location",
+            os.path.join(os.path.dirname(os.path.abspath(settings.ALEMBIC_CONFIG)), script_location),
+        )
+    # Keep the application's logging configuration when running in-process
+    config.attributes["configure_logger"] = False
+    # Read by env.py, which otherwise targets DATABASE_URL
+    config.attributes["database_url"] = url
+    return config
+
+
+def _head_revisions(config) -> set[str]:
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def _current_revisions(engine: Engine) -> Optional[set[str]]:
+    """Return the database's Alembic revisions, or None if it was never stamped."""
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as connection:
+        if not inspect(connection).has_table("alembic_version"):
+            return None
+        return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def _schema_revision(engine: Engine) -> str:
+    """
+    Infer the Alembic revision of an unversioned database from its schema.
+
+    Databases created by ``create_all`` were never stamped; each check below
+    looks for what one migration added, newest first, so the database can be
+    stamped where its schema actually is and upgraded from there.
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    if "teams" in tables:
+        session_fks = [
+            fk for fk in inspector.get_foreign_keys("attempt_records") if fk["referred_table"] == "trivia_sessions"
+        ]
+        return "b3f7d1e9a520" if session_fks else "d2a6f8c4e731"
+    if "ix_user_scores_ranking" in {index["name"] for index in inspector.get_indexes("user_scores")}:
+        return "a7c3e9f2b614"
+    if "leaderboard_snapshots" in tables:
+        return "f1d6b3a8e925"
+    session_columns = {column["name"]: column for column in inspector.get_columns("trivia_sessions")}
+    if "analytics" in session_columns:
+        return "e5a8c2d94b17"
+    started_at = session_columns["started_at"]["type"]
+    if isinstance(started_at, Integer) or getattr(started_at, "timezone", False):
+        return "c41a9e7f5d28"
+    if "user_id" in {column["name"] for column in inspector.get_columns("attempt_records")}:
+        return "8d3f2a6b1c07"
+    if "uq_attempt_records_session_username" in {
+        index["name"] for index in inspector.get_indexes("attempt_records")
+    }:
+        return "5b1e7c9d3a42"
+    return "22c4d80f2edf"
+
+
+def _migrate(settings: Settings, engine: Engine) -> None:
+    from alembic import command
+
+    config = _alembic_config(settings, engine.url.render_as_string(hide_password=False))
+    heads = _head_revisions(config)
+
+    # Fast path: a single SELECT on alembic_version when already up to date
+    if _current_revisions(engine) == heads:
+        return
+
+    with startup_lock(settings.DB_STARTUP_LOCK_PATH):
+        # Another worker may have finished while we waited for the lock
+        current = _current_revisions(engine)
+        if current == heads:
+            return
+        if current is None and inspect(engine).has_table("trivia_sessions"):
+            # Tables were created by create_all from whatever models were current then
+            revision = _schema_revision(engine)
+            logger.info("Stamping unversioned database at %s", revision)
+            command.stamp(config, revision)
+        logger.info("Upgrading database to %s", ", ".join(sorted(heads)))
+        command.upgrade(config, "head")
+
+
+def _check(settings: Settings, engine: Engine) -> None:
+    heads = _head_revisions(_alembic_config(settings, engine.url.render_as_string(hide_password=False)))
+    current = _current_revisions(engine)
+    if current != heads:
+        raise RuntimeError(
+            f"Database {engine.url!r} revision {sorted(current or [])} does not match "
+            f"{sorted(heads)}; run 'alembic upgrade head'"
+        )
+
+
+def prepare_database(settings: Settings, engines: list[Engine]) -> None:
+    """
+    Bring each database's schema up to date according to DB_STARTUP_MODE.
+
+    Modes:
+        create_all: create missing tables from the ORM models (development default)
+        migrate: run Alembic migrations, serialized across workers by a file lock
+        check: refuse to start unless the database is at the Alembic head
+        none: assume the schema is managed elsewhere
+
+    Args:
+        settings: Application settings
+        engines: Engines to prepare (the main database and any shards)
+
+    Raises:
+        RuntimeError: In check mode, if the database is not at the head revision
+        ValueError: If the mode is unknown
+    """
+    mode = settings.DB_STARTUP_MODE
+    started = time.perf_counter()
+
+    if mode not in ("create_all", "migrate", "check", "none"):
+        raise ValueError(f"Unknown DB_STARTUP_MODE {mode!r}")
+
+    for engine in engines:
+        if mode == "create_all":
+            with startup_lock(settings.DB_STARTUP_LOCK_PATH):
+                Base.metadata.create_all(bind=engine)
+        elif mode == "migrate":
+            _migrate(settings, engine)
+        elif mode == "check":
+            _check(settings, engine)
+
+    STARTUP_SECONDS.set("database", value=time.perf_counter() - started)
+
+
+def record_startup_phase(phase: str, seconds: float) -> None:
+    """
+    Publish and log the duration of a startup phase.
+
+    Args:
+        phase: Phase name used as the metric label
+        seconds: Duration in seconds
+    """
+    STARTUP_SECONDS.set(phase, value=seconds)
+    logger.info("Startup phase %s took %.1fms (pid %d)", phase, seconds * 1000, os.getpid())
@@ -0,0 +1,14 @@
+"""Alternative storage engines behind the service layer."""
+from trivia_api.storage.memory import (
+    MemoryGameEngine,
+    close_memory_engine,
+    get_memory_engine,
+    open_memory_engine,
+)
+
+__all__ = [
+    "MemoryGameEngine",
+    "close_memory_engine",
+    "get_memory_engine",
+    "open_memory_engine",
+]
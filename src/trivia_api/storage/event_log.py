@@ -0,0 +1,229 @@
+"""Append-only event log with batched fsync and atomic snapshots."""
+import glob
+import json
+import logging
+import os
+import threading
+from typing import Iterable, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.json"
+LOG_PATTERN = "events.*.log"
+ARCHIVE_DIR = "archive"
+
+
+class EventLog:
+    """
+    Durable event storage in a data directory.
+
+    Each event is one JSON line written to the OS immediately, so a process
+    crash loses nothing; a background thread fsyncs at most every
+    ``fsync_interval`` seconds, so a power failure loses at most that window.
+
+    Logs are segmented by starting sequence number (``events.<seq>.log``).
+    A snapshot starts a new segment (``rotate``) and, once written, removes
+    the segments it covers, keeping recovery time proportional to the events
+    since the last snapshot. Immutable data too large to rewrite with every
+    snapshot is stored once as an archive file.
+    """
+
+    def __init__(self, data_dir: str, fsync_interval: float):
+        self.data_dir = data_dir
+        self.fsync_interval = fsync_interval
+        self.seq = 0
+        self._file = None
+        self._segment_seq = 0
+        self._lock_file = None
+        self._dirty = False
+        self._closed = threading.Event()
+        self._io_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def open(self) -> Tuple[Optional[dict], list[dict]]:
+        """
+        Lock the data directory and read back persisted state.
+
+        Returns:
+            The latest snapshot state (or None) and the events recorded after it
+
+        Raises:
+            RuntimeError: If another process already holds the data directory
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._lock_file = open(os.path.join(self.data_dir, "LOCK"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError(
+                    f"{self.data_dir} is in use by another process; "
+                    "the memory storage engine supports a single worker"
+                )
+
+        snapshot, snapshot_seq = self._read_snapshot()
+        self.seq = snapshot_seq
+        events = []
+        for event in self._read_segments():
+            if event["seq"] > snapshot_seq:
+                events.append(event)
+                self.seq = event["seq"]
+
+        self._open_segment()
+        self._flusher = threading.Thread(target=self._flush_loop, name="event-log-fsync", daemon=True)
+        self._flusher.start()
+        return snapshot, events
+
+    def append(self, event: dict) -> int:
+        """
+        Append an event and hand it to the OS.
+
+        Args:
+            event: JSON-serializable event (a "seq" key is added)
+
+        Returns:
+            Sequence number assigned to the event
+        """
+        with self._io_lock:
+            self.seq += 1
+            event["seq"] = self.seq
+            self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+            self._file.flush()
+            self._dirty = True
+            return self.seq
+
+    def rotate(self) -> Tuple[int, list[str]]:
+        """
+        Mark a snapshot point: later events go to a new segment.
+
+        Returns:
+            Sequence number of the latest event, and the segments holding
+            events up to it (to remove once the snapshot is written)
+        """
+        with self._io_lock:
+            self._sync()
+            if self._segment_seq <= self.seq:
+                self._file.close()
+                self._open_segment()
+            current = self._file.name
+            return self.seq, [
+                segment for segment in glob.glob(os.path.join(self.data_dir, LOG_PATTERN)) if segment != current
+            ]
+
+    def write_snapshot(self, seq: int, chunks: Iterable[str], segments: list[str]) -> None:
+        """
+        Atomically persist a snapshot of the state after event ``seq``.
+
+        Events may be appended while the snapshot is written; they are in
+        segments opened by ``rotate`` and replayed after it.
+
+        Args:
+            seq: Sequence number the state corresponds to
+            chunks: Pieces of the JSON-encoded state, written as produced
+            segments: Segments covered by the snapshot, removed afterwards
+        """
+        path = os.path.join(self.data_dir, SNAPSHOT_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            fh.write(f'{{"seq":{seq},"state":')
+            for chunk in chunks:
+                fh.write(chunk)
+            fh.write("}")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+
+        for segment in segments:
+            os.remove(segment)
+        logger.info("Wrote snapshot at seq %d", seq)
+
+    def write_archive(self, name: str, items: Iterable[str]) -> None:
+        """
+        Durably store an immutable JSON array under a name, once.
+
+        Args:
+            name: Archive name (a file name without extension)
+            items: Pieces of the JSON-encoded array items, written as produced
+        """
+        directory = os.path.join(self.data_dir, ARCHIVE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.json")
+        with open(path + ".tmp", "w") as fh:
+            fh.write("[")
+            for piece in items:
+                fh.write(piece)
+            fh.write("]")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(path + ".tmp", path)
+
+    def read_archive(self, name: str):
+        """
+        Read data stored by ``write_archive``.
+
+        Args:
+            name: Archive name
+
+        Returns:
+            The stored data
+        """
+        with open(os.path.join(self.data_dir, ARCHIVE_DIR, f"{name}.json")) as fh:
+            return json.load(fh)
+
+    def close(self) -> None:
+        """Fsync outstanding events and release the data directory."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._io_lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _open_segment(self) -> None:
+        self._segment_seq = self.seq + 1
+        path = os.path.join(self.data_dir, f"events.{self._segment_seq:012d}.log")
+        self._file = open(path, "a")
+
+    def _sync(self) -> None:
+        if self._dirty:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            with self._io_lock:
+                if self._file is not None:
+                    self._sync()
+
+    def _read_snapshot(self) -> Tuple[Optional[dict], int]:
+        path = os.path.join(self.data_dir, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return None, 0
+        with open(path) as fh:
+            data = json.load(fh)
+        return data["state"], data["seq"]
+
+    def _read_segments(self) -> Iterator[dict]:
+        for segment in sorted(glob.glob(os.path.join(self.data_dir, LOG_PATTERN))):
+            with open(segment, "rb+") as fh:
+                offset = 0
+                for line in fh:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final write from a crash; it was never acknowledged.
+                        # Cut it off so new events are not appended after it.
+                        logger.warning("Truncating partial event in %s", segment)
+                        fh.truncate(offset)
+                        break
+                    offset += len(line)
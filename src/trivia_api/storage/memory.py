@@ -0,0 +1,702 @@
+"""In-memory game engine persisted through an event log and snapshots."""
+import bisect
+import itertools
+import json
+import logging
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+from uuid import uuid4
+
+from trivia_api.config import Settings
+from trivia_api.errors import (
+    ActiveSessionExistsError,
+    DuplicateAnswerError,
+    NoActiveSessionError,
+    SnapshotNotFoundError,
+)
+from trivia_api.models.attempt import AttemptRecord
+from trivia_api.models.leaderboard import LeaderboardEntry, UserRankEntry
+from trivia_api.models.team import TeamLeaderboardEntry
+from trivia_api.schemas import SessionStatus, TriviaSessionORM, UserScoreORM
+from trivia_api.storage.event_log import EventLog
+from trivia_api.utils.timestamps import format_epoch_micros, from_epoch_micros
+from trivia_api.utils.validators import check_answers_match, normalize_answer
+
+logger = logging.getLogger(__name__)
+
+
+# Users, ranks or attempts encoded per step of a snapshot
+_SNAPSHOT_CHUNK = 500
+
+
+def _now_micros() -> int:
+    return time.time_ns() // 1000
+
+
+def _archive_name(session_id: str) -> str:
+    return f"attempts.{session_id}"
+
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _encode_members(items: Iterable, pairs: bool = False, first: bool = True) -> Iterator[str]:
+    """
+    Encode the items of a JSON array (or the ``(key, value)`` pairs of an
+    object) as comma-separated pieces of ``_SNAPSHOT_CHUNK`` items.
+
+    The GIL is released after each piece, so a snapshot never holds up
+    answers for long.
+    """
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, _SNAPSHOT_CHUNK))
+        if not chunk:
+            return
+        encoded = _encode(dict(chunk) if pairs else chunk)[1:-1]
+        yield encoded if first else "," + encoded
+        first = False
+        time.sleep(0)
+
+
+class MemoryGameEngine:
+    """
+    Complete game state held in process memory.
+
+    Sessions, per-session attempts, the answered set of the active session,
+    user scores and a sorted ranking are kept in plain Python structures, so
+    an answer is a set lookup, a log append and a bisect insert. Every change
+    is first written to the event log (write-ahead) and then applied; replay
+    at startup runs the same apply step, so recovered state is identical.
+
+    The ranking is a list of ``(-score, first_correct_micros, username)``
+    tuples, which sorts exactly like the SQL leaderboard; ranks are list
+    positions found by bisection. Teams keep a ranking of
+    ``(-score, reached_at_micros, name)`` tuples the same way.
+
+    Snapshots are written by a background thread. The state is cut under
+    the lock without copying: score entries are immutable tuples, and while
+    a snapshot is being written the first change to each entry saves its
+    previous value for the snapshot. The attempts of ended sessions never
+    change, so they are archived once instead of being rewritten by every
+    snapshot.
+
+    Only one process may own an engine's data directory, so the memory
+    engine requires a single worker.
+    """
+
+    def __init__(self, event_log: EventLog, snapshot_every: int):
+        self._log = event_log
+        self._snapshot_every = snapshot_every
+        self._events_since_snapshot = 0
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()  # one snapshot at a time
+        self._snapshot_due = threading.Event()
+        self._closing = False
+        self._snapshotter: Optional[threading.Thread] = None
+        # While a snapshot is written: username -> score entry at the snapshot point
+        self._pre_snapshot: Optional[dict] = None
+
+        self._sessions: dict[str, dict] = {}  # insertion (start) order
+        self._attempts: dict[str, list[tuple]] = {}  # session_id -> (username, answer, is_correct, micros)
+        self._active_session_id: Optional[str] = None
+        self._latest_ended_id: Optional[str] = None
+        self._answered: set[str] = set()
+        self._scores: dict[str, tuple] = {}  # username -> (score, first_correct_micros, last_updated_micros)
+        self._usernames: list[str] = []  # self._scores keys in insertion order
+        self._ranking: list[tuple] = []
+        # Ranks captured at the latest session end: username -> [rank, previous rank or None]
+        self._rank_snapshot: Optional[dict] = None
+        self._team_members: dict[str, set[str]] = {}  # team name -> usernames
+        self._team_of: dict[str, str] = {}  # username -> team name
+        self._team_scores: dict[str, list] = {}  # team name -> [score, reached_at_micros]
+        self._team_ranking: list[tuple] = []
+        self._team_members_state: dict[str, list[str]] = {}  # snapshot form, replaced on import
+        self._archived: set[str] = set()  # ended sessions whose attempts are archived
+
+    # Lifecycle
+
+    def load(self) -> None:
+        """Restore state from the latest snapshot and replay the events after it."""
+        started = time.perf_counter()
+        snapshot, events = self._log.open()
+        if snapshot is not None:
+            self._restore(snapshot)
+        for event in events:
+            self._apply(event)
+        self._events_since_snapshot = len(events)
+        logger.info(
+            "Memory engine recovered %d users and %d sessions (%d events replayed) in %.1fms",
+            len(self._scores), len(self._sessions), len(events),
+            (time.perf_counter() - started) * 1000,
+        )
+        self._snapshotter = threading.Thread(target=self._snapshot_loop, name="memory-snapshot", daemon=True)
+        self._snapshotter.start()
+
+    def snapshot(self) -> None:
+        """
+        Write a snapshot of the current state and drop the log it covers.
+
+        Only the cut is taken under the engine lock; answers keep being
+        recorded while the state is serialized.
+        """
+        with self._snapshot_lock:
+            with self._lock:
+                seq, segments = self._log.rotate()
+                self._events_since_snapshot = 0
+                self._pre_snapshot = {}
+                cut = self._snapshot_cut()
+            try:
+                for session_id in cut["archive"]:
+                    self._log.write_archive(
+                        _archive_name(session_id), _encode_members(self._attempts[session_id])
+                    )
+                    self._archived.add(session_id)
+                self._log.write_snapshot(seq, self._snapshot_chunks(cut), segments)
+            finally:
+                with self._lock:
+                    self._pre_snapshot = None
+
+    def close(self) -> None:
+        """Snapshot (so the next start replays nothing) and close the event log."""
+        self._closing = True
+        self._snapshot_due.set()
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        if self._events_since_snapshot:
+            self.snapshot()
+        self._log.close()
+
+    def _snapshot_loop(self) -> None:
+        while True:
+            self._snapshot_due.wait()
+            self._snapshot_due.clear()
+            if self._closing:
+                return
+            try:
+                self.snapshot()
+            except Exception:
+                # The covered log segments are kept, so nothing is lost
+                logger.exception("Memory engine snapshot failed")
+
+    # Sessions
+
+    def start_session(self, question: str, correct_answer: str) -> TriviaSessionORM:
+        with self._lock:
+            if self._active_session_id is not None:
+                raise ActiveSessionExistsError()
+            session_id = str(uuid4())
+            self._record({
+                "type": "start",
+                "session_id": session_id,
+                "question": question,
+                "correct_answer": normalize_answer(correct_answer),
+                "ts": _now_micros(),
+            })
+            return self._session_orm(session_id)
+
+    def end_session(self, analytics: Optional[dict] = None) -> TriviaSessionORM:
+        with self._lock:
+            session_id = self._active_session_id
+            if session_id is None:
+                raise NoActiveSessionError()
+            self._record({
+                "type": "end",
+                "session_id": session_id,
+                "analytics": analytics,
+                "ts": _now_micros(),
+            })
+            return self._session_orm(session_id)
+
+    @property
+    def active_session_id(self) -> Optional[str]:
+        return self._active_session_id
+
+    def get_active_session(self) -> Optional[TriviaSessionORM]:
+        if self._active_session_id is None:
+            return None
+        return self._session_orm(self._active_session_id)
+
+    def get_session(self, session_id: str) -> Optional[TriviaSessionORM]:
+        if session_id not in self._sessions:
+            return None
+        return self._session_orm(session_id)
+
+    def get_current_question(self, reveal_answer: bool = False) -> Optional[dict]:
+        session_id = self._active_session_id or self._latest_ended_id
+        if session_id is None:
+            return None
+        session = self._sessions[session_id]
+        is_active = session["status"] == SessionStatus.ACTIVE.value
+        return {
+            "question": session["question"],
+            "session_id": session_id,
+            "is_active": is_active,
+            "correct_answer": session["correct_answer"] if reveal_answer or not is_active else None,
+        }
+
+    def get_successful_attempts(self, session_id: str) -> list[str]:
+        return [username for username, _, is_correct, _ in self._attempts.get(session_id, ()) if is_correct]
+
+    # Answers and scores
+
+    def has_answered(self, session_id: str, username: str) -> bool:
+        if session_id == self._active_session_id:
+            return username in self._answered
+        return any(row[0] == username for row in self._attempts.get(session_id, ()))
+
+    def submit_answer(self, username: str, answer: str) -> dict:
+        with self._lock:
+            session_id = self._active_session_id
+            if session_id is None:
+                raise NoActiveSessionError()
+            if username in self._answered:
+                raise DuplicateAnswerError()
+
+            is_correct = check_answers_match(answer, self._sessions[session_id]["correct_answer"])
+            self._record({
+                "type": "answer",
+                "session_id": session_id,
+                "username": username,
+                "answer": answer,
+                "correct": is_correct,
+                "ts": _now_micros(),
+            })
+            score = self._scores[username][0] if is_correct else None
+
+        return {
+            "is_correct": is_correct,
+            "message": "Correct!" if is_correct else "Incorrect!",
+            "score": score,
+        }
+
+    def get_or_create_user_score(self, username: str) -> UserScoreORM:
+        with self._lock:
+            if username not in self._scores:
+                self._record({"type": "user", "username": username, "ts": _now_micros()})
+            return self._user_score_orm(username)
+
+    def increment_score(self, username: str) -> UserScoreORM:
+        with self._lock:
+            self._record({"type": "score", "username": username, "ts": _now_micros()})
+            return self._user_score_orm(username)
+
+    def get_user_score(self, username: str) -> int:
+        entry = self._scores.get(username)
+        return entry[0] if entry else 0
+
+    # Teams
+
+    def import_team_members(self, teams: dict[str, list[str]]) -> int:
+        with self._lock:
+            self._record({
+                "type": "teams",
+                "teams": {name: list(members) for name, members in teams.items()},
+                "ts": _now_micros(),
+            })
+        return sum(len(members) for members in teams.values())
+
+    def get_team_leaderboard(self, limit: int = 10, offset: int = 0) -> list:
+        page = self._team_ranking[offset:offset + limit]
+        return [
+            TeamLeaderboardEntry(
+                rank=offset + idx + 1, team=name, score=-negative_score, members=len(self._team_members[name])
+            )
+            for idx, (negative_score, _, name) in enumerate(page)
+        ]
+
+    # Leaderboard and attempts
+
+    def get_leaderboard(self, limit: int = 10, offset: int = 0) -> list:
+        page = self._ranking[offset:offset + limit]
+        return [
+            LeaderboardEntry(rank=offset + idx + 1, username=username, score=-negative_score)
+            for idx, (negative_score, _, username) in enumerate(page)
+        ]
+
+    def get_user_rank(self, username: str) -> Optional[int]:
+        entry = self._scores.get(username)
+        if not entry or entry[0] == 0:
+            return None
+        # Count users strictly ahead: higher score, or same score reached earlier
+        return bisect.bisect_left(self._ranking, (-entry[0], entry[1])) + 1
+
+    def get_user_ranks(self, usernames: List[str]) -> List[UserRankEntry]:
+        return [
+            UserRankEntry(
+                username=username,
+                score=self._scores[username][0] if username in self._scores else 0,
+                rank=self.get_user_rank(username),
+            )
+            for username in usernames
+        ]
+
+    def get_all_attempts(self) -> List[AttemptRecord]:
+        rows = [row for attempts in self._attempts.values() for row in attempts]
+        return [self._attempt_record(row) for row in reversed(rows)]
+
+    def get_attempts_for_session(self, session_id: str) -> List[AttemptRecord]:
+        return [self._attempt_record(row) for row in reversed(self._attempts.get(session_id, []))]
+
+    def export_batches(
+        self,
+        table: str,
+        since: Optional[int],
+        until: Optional[int],
+        session_id: Optional[str],
+        batch_rows: int,
+    ) -> Iterator[list]:
+        """Yield rows in ExportService column order; ids follow insertion order."""
+        with self._lock:
+            sessions = list(self._sessions.items())
+            # Attempt lists only grow, so their current lengths bound a stable view
+            attempt_counts = {sid: len(rows) for sid, rows in self._attempts.items()}
+            user_ids = {username: user_id for user_id, username in enumerate(self._scores, start=1)}
+            scores = [(username, *entry) for username, entry in self._scores.items()] if table == "scores" else []
+
+        def in_range(ts: Optional[int]) -> bool:
+            return ts is not None and (since is None or ts >= since) and (until is None or ts < until)
+
+        if table == "scores":
+            rows = self._export_scores(scores, user_ids, in_range)
+        elif table == "sessions":
+            rows = self._export_sessions(sessions, session_id, in_range)
+        else:
+            rows = self._export_attempts(sessions, attempt_counts, user_ids, session_id, in_range)
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _export_scores(scores: list, user_ids: dict, in_range: Callable) -> Iterator[tuple]:
+        for username, score, first_correct, last_updated in scores:
+            if in_range(last_updated):
+                yield user_ids[username], username, score, first_correct, last_updated
+
+    @staticmethod
+    def _export_sessions(sessions: list, session_id: Optional[str], in_range: Callable) -> Iterator[tuple]:
+        for sid, session in sessions:
+            if session_id in (None, sid) and in_range(session["started_at"]):
+                yield (
+                    sid,
+                    session["question"],
+                    session["correct_answer"],
+                    session["status"],
+                    session["started_at"],
+                    session["ended_at"],
+                )
+
+    def _export_attempts(
+        self,
+        sessions: list,
+        attempt_counts: dict,
+        user_ids: dict,
+        session_id: Optional[str],
+        in_range: Callable,
+    ) -> Iterator[tuple]:
+        attempt_id = 0
+        for sid, _ in sessions:
+            attempts = self._attempts.get(sid, [])[: attempt_counts.get(sid, 0)]
+            if session_id not in (None, sid):
+                attempt_id += len(attempts)
+                continue
+            for username, answer, is_correct, ts in attempts:
+                attempt_id += 1
+                if in_range(ts):
+                    yield attempt_id, sid, user_ids.get(username), username, answer, is_correct, ts
+
+    def get_rank_movement(self, username: str, session_id: Optional[str] = None) -> dict:
+        snapshot = self._rank_snapshot
+        # Only the latest session's snapshot is kept in memory
+        if snapshot is None or session_id not in (None, snapshot["session_id"]):
+            raise SnapshotNotFoundError()
+        rank, previous_rank = snapshot["ranks"].get(username, (None, None))
+        return {
+            "session_id": snapshot["session_id"],
+            "username": username,
+            "rank": rank,
+            "previous_rank": previous_rank,
+            "delta": previous_rank - rank if rank and previous_rank else None,
+        }
+
+    # Event handling
+
+    def _record(self, event: dict) -> None:
+        """Log an event durably, then apply it to the in-memory state."""
+        self._log.append(event)
+        self._apply(event)
+        self._events_since_snapshot += 1
+        if self._events_since_snapshot >= self._snapshot_every:
+            self._snapshot_due.set()
+
+    def _apply(self, event: dict) -> None:
+        kind = event["type"]
+        ts = event["ts"]
+        if kind == "answer":
+            username = event["username"]
+            self._attempts[event["session_id"]].append(
+                (username, event["answer"], event["correct"], ts)
+            )
+            self._answered.add(username)
+            self._ensure_user(username, ts)
+            if event["correct"]:
+                self._increment(username, ts)
+        elif kind == "start":
+            session_id = event["session_id"]
+            self._sessions[session_id] = {
+                "question": event["question"],
+                "correct_answer": event["correct_answer"],
+                "status": SessionStatus.ACTIVE.value,
+                "started_at": ts,
+                "ended_at": None,
+            }
+            self._attempts[session_id] = []
+            self._active_session_id = session_id
+            self._answered = set()
+        elif kind == "end":
+            # Replaced rather than updated, so a snapshot cut can share the old dict
+            self._sessions[event["session_id"]] = {
+                **self._sessions[event["session_id"]],
+                "status": SessionStatus.ENDED.value,
+                "ended_at": ts,
+                "analytics": event.get("analytics"),
+            }
+            self._capture_ranks(event["session_id"])
+            self._active_session_id = None
+            self._latest_ended_id = event["session_id"]
+            self._answered = set()
+        elif kind == "score":
+            self._ensure_user(event["username"], ts)
+            self._increment(event["username"], ts)
+        elif kind == "user":
+            self._ensure_user(event["username"], ts)
+        elif kind == "teams":
+            self._set_teams(event["teams"], ts)
+        else:
+            raise ValueError(f"Unknown event type {kind!r}")
+
+    def _capture_ranks(self, session_id: str) -> None:
+        # Deterministic from the ranking, so replaying the end event rebuilds it
+        previous = self._rank_snapshot["ranks"] if self._rank_snapshot else {}
+        self._rank_snapshot = {
+            "session_id": session_id,
+            "ranks": {
+                username: [rank, previous.get(username, (None,))[0]]
+                for rank, (_, _, username) in enumerate(self._ranking, start=1)
+            },
+        }
+
+    def _ensure_user(self, username: str, ts: int) -> None:
+        if username not in self._scores:
+            self._scores[username] = (0, None, ts)
+            self._usernames.append(username)
+
+    def _increment(self, username: str, ts: int) -> None:
+        entry = self._scores[username]
+        score, first_correct, _ = entry
+        if score > 0:
+            del self._ranking[bisect.bisect_left(self._ranking, (-score, first_correct, username))]
+        else:
+            first_correct = ts
+        if self._pre_snapshot is not None:
+            self._pre_snapshot.setdefault(username, entry)
+        self._scores[username] = (score + 1, first_correct, ts)
+        bisect.insort(self._ranking, (-(score + 1), first_correct, username))
+
+        team = self._team_of.get(username)
+        if team is not None:
+            team_entry = self._team_scores[team]
+            if team_entry[0] > 0:
+                del self._team_ranking[bisect.bisect_left(self._team_ranking, (-team_entry[0], team_entry[1], team))]
+            team_entry[0] += 1
+            team_entry[1] = ts
+            bisect.insort(self._team_ranking, (-team_entry[0], team_entry[1], team))
+
+    def _set_teams(self, teams: dict, ts: int) -> None:
+        # Listed teams get exactly the listed members, who leave their previous teams
+        affected = set(teams)
+        for name in teams:
+            for username in self._team_members.pop(name, ()):
+                del self._team_of[username]
+        for name, members in teams.items():
+            for username in members:
+                previous = self._team_of.get(username)
+                if previous is not None:
+                    self._team_members[previous].discard(username)
+                    affected.add(previous)
+                self._ensure_user(username, ts)
+                self._team_of[username] = name
+            self._team_members[name] = set(members)
+        for name in affected:
+            self._rescore_team(name)
+        self._team_members_state = {name: sorted(members) for name, members in self._team_members.items()}
+
+    def _rescore_team(self, name: str) -> None:
+        # Same sums as TeamService._rebuild_scores: total score, latest scoring time
+        old = self._team_scores.pop(name, None)
+        if old is not None and old[0] > 0:
+            del self._team_ranking[bisect.bisect_left(self._team_ranking, (-old[0], old[1], name))]
+        scored = [self._scores[username] for username in self._team_members.get(name, ()) if self._scores[username][0]]
+        entry = [sum(user[0] for user in scored), max((user[2] for user in scored), default=None)]
+        self._team_scores[name] = entry
+        if entry[0] > 0:
+            bisect.insort(self._team_ranking, (-entry[0], entry[1], name))
+
+    # Snapshots
+
+    def _snapshot_cut(self) -> dict:
+        """Capture what a snapshot needs at this point (under the lock; no per-user or per-attempt work)."""
+        active = self._active_session_id
+        return {
+            "sessions": dict(self._sessions),
+            "active_session_id": active,
+            "active_attempts": len(self._attempts[active]) if active is not None else 0,
+            "latest_ended_id": self._latest_ended_id,
+            "rank_snapshot": self._rank_snapshot,
+            "team_members": self._team_members_state,
+            "users": len(self._usernames),
+            "archive": [
+                session_id
+                for session_id, session in self._sessions.items()
+                if session["status"] == SessionStatus.ENDED.value and session_id not in self._archived
+            ],
+        }
+
+    def _snapshot_chunks(self, cut: dict) -> Iterator[str]:
+        """Encode the state at a cut as JSON, a bounded piece at a time."""
+        active = cut["active_session_id"]
+        rank_snapshot = cut["rank_snapshot"]
+        yield "{"
+        for key in ("sessions", "active_session_id", "latest_ended_id", "team_members"):
+            yield f"{_encode(key)}:{_encode(cut[key])},"
+        if rank_snapshot is None:
+            yield '"rank_snapshot":null,'
+        else:
+            # Replaced, never modified, so it is read without the lock
+            yield f'"rank_snapshot":{{"session_id":{_encode(rank_snapshot["session_id"])},"ranks":{{'
+            yield from _encode_members(rank_snapshot["ranks"].items(), pairs=True)
+            yield "}},"
+        # Ended sessions' attempts are archived; only the active session's are inline
+        yield f'"archived":{_encode(sorted(set(cut["sessions"]) - {active}))},"attempts":{{'
+        if active is not None:
+            yield f"{_encode(active)}:["
+            yield from _encode_members(self._attempts[active][:cut["active_attempts"]])
+            yield "]"
+        yield '},"scores":{'
+        for start in range(0, cut["users"], _SNAPSHOT_CHUNK):
+            with self._lock:
+                usernames = self._usernames[start:min(start + _SNAPSHOT_CHUNK, cut["users"])]
+                changed = self._pre_snapshot
+                entries = [
+                    (username, changed[username] if username in changed else self._scores[username])
+                    for username in usernames
+                ]
+            yield from _encode_members(entries, pairs=True, first=not start)
+        yield "}}"
+
+    def _restore(self, state: dict) -> None:
+        self._sessions = state["sessions"]
+        self._archived = set(state.get("archived", ()))
+        inline = state["attempts"]
+        self._attempts = {
+            session_id: [
+                tuple(row)
+                for row in (
+                    self._log.read_archive(_archive_name(session_id))
+                    if session_id in self._archived
+                    else inline.get(session_id, [])
+                )
+            ]
+            for session_id in self._sessions
+        }
+        self._active_session_id = state["active_session_id"]
+        self._latest_ended_id = state["latest_ended_id"]
+        self._scores = {username: tuple(entry) for username, entry in state["scores"].items()}
+        self._usernames = list(self._scores)
+        self._rank_snapshot = state.get("rank_snapshot")
+        self._ranking = sorted(
+            (-entry[0], entry[1], username) for username, entry in self._scores.items() if entry[0] > 0
+        )
+        if self._active_session_id is not None:
+            self._answered = {row[0] for row in self._attempts[self._active_session_id]}
+        self._team_members = {name: set(members) for name, members in state.get("team_members", {}).items()}
+        self._team_members_state = {name: sorted(members) for name, members in self._team_members.items()}
+        self._team_of = {username: name for name, members in self._team_members.items() for username in members}
+        self._team_scores = {}
+        self._team_ranking = []
+        for name in self._team_members:
+            self._rescore_team(name)
+
+    # Result objects (transient ORM instances keep the service return types)
+
+    def _session_orm(self, session_id: str) -> TriviaSessionORM:
+        session = self._sessions[session_id]
+        return TriviaSessionORM(
+            session_id=session_id,
+            question=session["question"],
+            correct_answer=session["correct_answer"],
+            status=SessionStatus(session["status"]),
+            started_at=from_epoch_micros(session["started_at"]),
+            ended_at=from_epoch_micros(session["ended_at"]) if session["ended_at"] is not None else None,
+            analytics=session.get("analytics"),
+        )
+
+    def _user_score_orm(self, username: str) -> UserScoreORM:
+        score, first_correct, last_updated = self._scores[username]
+        return UserScoreORM(
+            username=username,
+            cumulative_score=score,
+            first_correct_timestamp=from_epoch_micros(first_correct) if first_correct is not None else None,
+            last_updated=from_epoch_micros(last_updated),
+        )
+
+    @staticmethod
+    def _attempt_record(row: tuple) -> AttemptRecord:
+        username, _, is_correct, micros = row
+        return AttemptRecord(username=username, is_correct=is_correct, timestamp=format_epoch_micros(micros))
+
+
+_memory_engine: Optional[MemoryGameEngine] = None
+
+
+def get_memory_engine() -> Optional[MemoryGameEngine]:
+    """Get the running memory engine, or None when the SQL engine is in use."""
+    return _memory_engine
+
+
+def open_memory_engine(settings: Settings) -> MemoryGameEngine:
+    """
+    Open the memory engine configured by settings and recover its state.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        The loaded engine, which the services then delegate to
+
+    Raises:
+        RuntimeError: If another process already owns the data directory
+    """
+    global _memory_engine
+    engine = MemoryGameEngine(
+        EventLog(settings.MEMORY_DATA_DIR, settings.MEMORY_FSYNC_INTERVAL_MS / 1000),
+        settings.MEMORY_SNAPSHOT_EVERY,
+    )
+    engine.load()
+    _memory_engine = engine
+    return engine
+
+
+def close_memory_engine() -> None:
+    """Snapshot and close the running memory engine, if any."""
+    global _memory_engine
+    if _memory_engine is not None:
+        _memory_engine.close()
+        _memory_engine = None
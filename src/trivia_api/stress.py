@@ -0,0 +1,440 @@
+"""Concurrency stress harness checking answer and score invariants.
+
+Fires answer submissions at the real application from threads, event-loop
+tasks and separate processes at once, against a file-backed SQLite database,
+then checks the stored results:
+
+- at most one attempt per (session, user), and exactly one accepted answer
+  per (session, user) that submitted (the rest rejected as duplicates);
+- each accepted answer's correctness matches its stored attempt;
+- ``cumulative_score`` equals the user's number of correct attempts, and the
+  scores reported by accepted answers count up from 1 without gaps;
+- ``first_correct_timestamp`` is set exactly for scoring users and falls
+  between their first and second correct attempts;
+- the leaderboard and batch rank lookups agree with ranks recomputed from the
+  stored rows with the ``first_correct_timestamp`` tie-break.
+
+Environment variables must be set before the application is imported, so
+``run`` configures them and imports ``trivia_api.main`` lazily.
+"""
+import asyncio
+import logging
+import os
+import random
+import secrets
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Optional
+
+# (session index, username, answer)
+Submission = tuple[int, str, str]
+# (session index, username, HTTP status, response body or None, latency seconds)
+Outcome = tuple[int, str, int, Optional[dict], float]
+
+CORRECT_ANSWER = "Ada Lovelace"
+_ANSWER_VARIANTS = ["Ada Lovelace", "  ada lovelace ", "ADA LOVELACE", "Grace Hopper", "Alan Turing"]
+
+
+@dataclass
+class StressReport:
+    """Outcome of a stress run."""
+
+    requests: int = 0
+    elapsed: float = 0.0
+    statuses: Counter = field(default_factory=Counter)
+    latencies: list = field(default_factory=list)
+    violations: list = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True if no invariant was violated and no request failed with 5xx."""
+        server_errors = sum(count for status, count in self.statuses.items() if status >= 500)
+        return not self.violations and not server_errors
+
+    def summary(self) -> str:
+        """Human-readable summary."""
+        lines = [
+            f"{self.requests} answers in {self.elapsed:.2f}s "
+            f"({self.requests / self.elapsed if self.elapsed else 0:.0f}/s)",
+            "statuses: " + ", ".join(f"{status}={count}" for status, count in sorted(self.statuses.items())),
+        ]
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            percentile = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000  # noqa: E731
+            lines.append(
+                f"latency ms: p50={statistics.median(ordered) * 1000:.1f} "
+                f"p95={percentile(0.95):.1f} p99={percentile(0.99):.1f} max={ordered[-1] * 1000:.1f}"
+            )
+        if self.violations:
+            lines.append(f"{len(self.violations)} invariant violations:")
+            lines.extend(f"  - {violation}" for violation in self.violations[:50])
+        else:
+            lines.append("all invariants hold")
+        return "\n".join(lines)
+
+
+def configure_environment(database_path: str, admin_key: str) -> None:
+    """Point the application at the stress database (inherited by worker processes)."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    os.environ["STORAGE_ENGINE"] = "sql"
+    os.environ["DB_STARTUP_MODE"] = "create_all"
+    os.environ["DB_STARTUP_LOCK_PATH"] = f"{database_path}.startup.lock"
+    os.environ["ADMIN_API_KEY"] = admin_key
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    # One log line per request would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _submit(client, submission: Submission) -> Outcome:
+    session_index, username, answer = submission
+    started = time.perf_counter()
+    response = client.post("/api/trivia/answer", json={"username": username, "answer": answer})
+    elapsed = time.perf_counter() - started
+    body = response.json() if response.status_code == 200 else None
+    return session_index, username, response.status_code, body, elapsed
+
+
+def _submit_threaded(client, submissions: list, threads: int) -> list:
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda submission: _submit(client, submission), submissions))
+
+
+async def _submit_async(app, submissions: list, tasks: int) -> list:
+    import httpx
+
+    semaphore = asyncio.Semaphore(tasks)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://stress") as client:
+
+        async def one(submission: Submission) -> Outcome:
+            session_index, username, answer = submission
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/trivia/answer", json={"username": username, "answer": answer}
+                )
+                elapsed = time.perf_counter() - started
+            body = response.json() if response.status_code == 200 else None
+            return session_index, username, response.status_code, body, elapsed
+
+        return await asyncio.gather(*(one(submission) for submission in submissions))
+
+
+# Worker processes keep one started application each
+_worker_client = None
+
+
+def _init_worker() -> None:
+    global _worker_client
+    import atexit
+
+    from fastapi.testclient import TestClient
+
+    from trivia_api.main import app
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    _worker_client = TestClient(app)
+    _worker_client.__enter__()
+    atexit.register(_worker_client.__exit__, None, None, None)
+
+
+def _worker_submit(submissions: list, threads: int) -> list:
+    return _submit_threaded(_worker_client, submissions, threads)
+
+
+def _workload(users: int, answers_per_user: int, session_index: int, rng: random.Random) -> list:
+    submissions = [
+        (session_index, f"stress_user_{user:05d}", rng.choice(_ANSWER_VARIANTS))
+        for user in range(users)
+        for _ in range(answers_per_user)
+    ]
+    rng.shuffle(submissions)
+    return submissions
+
+
+def run(
+    users: int = 200,
+    answers_per_user: int = 3,
+    sessions: int = 3,
+    threads: int = 16,
+    tasks: int = 64,
+    processes: int = 4,
+    database_path: Optional[str] = None,
+    seed: int = 0,
+) -> StressReport:
+    """
+    Run the stress workload and check invariants.
+
+    Each session's submissions are split evenly between a thread pool, an
+    asyncio task group and a pool of worker processes, which all run at once.
+
+    Args:
+        users: Distinct users per session
+        answers_per_user: Submissions per user per session (extras are duplicates)
+        sessions: Sessions to play back to back
+        threads: Concurrent threads in this process (and in each worker process)
+        tasks: Concurrent event-loop tasks
+        processes: Worker processes, each with its own copy of the application
+        database_path: SQLite file to use (default: a new temporary file)
+        seed: Random seed for the workload
+
+    Returns:
+        StressReport with request statistics and any invariant violations
+    """
+    if database_path is None:
+        database_path = os.path.join(tempfile.mkdtemp(prefix="trivia-stress-"), "stress.db")
+    admin_key = secrets.token_hex(16)
+    configure_environment(database_path, admin_key)
+
+    from fastapi.testclient import TestClient
+
+    from trivia_api.main import app
+
+    rng = random.Random(seed)
+    report = StressReport()
+    outcomes: list = []
+    session_ids: list = []
+    admin = {"X-API-Key": admin_key}
+
+    pool = None
+    if processes:
+        pool = ProcessPoolExecutor(
+            max_workers=processes, mp_context=get_context("spawn"), initializer=_init_worker
+        )
+    try:
+        with TestClient(app) as client:
+            if pool is not None:
+                # Start every worker (and its application) before timing anything
+                list(pool.map(_worker_submit, [[] for _ in range(processes)], [1] * processes))
+
+            for session_index in range(sessions):
+                started = client.post(
+                    "/api/trivia/session/start",
+                    json={"question": "Who wrote the first program?", "correct_answer": CORRECT_ANSWER},
+                    headers=admin,
+                )
+                started.raise_for_status()
+                session_ids.append(started.json()["session_id"])
+
+                submissions = _workload(users, answers_per_user, session_index, rng)
+                groups = [submissions[index::3] for index in range(3)]
+                begin = time.perf_counter()
+
+                futures = []
+                if pool is not None:
+                    chunks = [groups[2][index::processes] for index in range(processes)]
+                    futures = [pool.submit(_worker_submit, chunk, threads) for chunk in chunks]
+                else:
+                    groups[0] += groups[2]
+
+                async_results: list = []
+                async_thread = threading.Thread(
+                    target=lambda results, group: results.extend(asyncio.run(_submit_async(app, group, tasks))),
+                    args=(async_results, groups[1]),
+                )
+                async_thread.start()
+                outcomes.extend(_submit_threaded(client, groups[0], threads))
+                async_thread.join()
+                outcomes.extend(async_results)
+                for future in futures:
+                    outcomes.extend(future.result())
+
+                report.elapsed += time.perf_counter() - begin
+                client.post("/api/trivia/session/end", headers=admin).raise_for_status()
+
+            report.requests = len(outcomes)
+            report.statuses = Counter(outcome[2] for outcome in outcomes)
+            report.latencies = [outcome[4] for outcome in outcomes]
+            report.violations = check_invariants(client, session_ids, outcomes)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return report
+
+
+def check_invariants(client, session_ids: list, outcomes: list) -> list:
+    """
+    Check stored attempts, scores and rankings against the answers' outcomes.
+
+    Args:
+        client: TestClient for the running application
+        session_ids: Session ids in play order
+        outcomes: Outcomes of every submission
+
+    Returns:
+        Descriptions of violated invariants (empty if all hold)
+    """
+    from trivia_api.database import SessionLocal, close_session
+
+    db = SessionLocal()
+    try:
+        scores, attempts = _stored_state(db)
+        accepted, failed, submitted = _outcomes_by_key(session_ids, outcomes)
+        ranked, expected_rank = _expected_ranks(scores)
+        return [
+            *_check_statuses(outcomes),
+            *_check_attempts(attempts, accepted, failed, submitted),
+            *_check_scores(scores, attempts, outcomes, {username for _, username in failed}),
+            *_check_leaderboard(db, ranked, expected_rank),
+            *_check_batch_ranks(client, sorted(scores), expected_rank),
+        ]
+    finally:
+        close_session(db)
+
+
+def _stored_state(db) -> tuple[dict, dict]:
+    """Read every user's score row and attempts, keyed by (session_id, username)."""
+    from trivia_api.database import all_shard_sessions
+    from trivia_api.schemas import AttemptRecordORM, UserScoreORM
+
+    scores = {}
+    attempts = defaultdict(list)  # (session_id, username) -> [(is_correct, submitted_at)]
+    for shard in all_shard_sessions(db):
+        for row in shard.query(UserScoreORM):
+            scores[row.username] = row
+        rows = shard.query(
+            AttemptRecordORM.session_id,
+            UserScoreORM.username,
+            AttemptRecordORM.is_correct,
+            AttemptRecordORM.submitted_at,
+        ).join(UserScoreORM, AttemptRecordORM.user_id == UserScoreORM.user_id)
+        for session_id, username, is_correct, submitted_at in rows:
+            attempts[(session_id, username)].append((is_correct, submitted_at))
+    return scores, attempts
+
+
+def _outcomes_by_key(session_ids: list, outcomes: list) -> tuple[dict, set, set]:
+    """Group outcomes by (session_id, username) into accepted bodies, server failures and submissions."""
+    accepted = defaultdict(list)
+    failed = set()
+    submitted = set()
+    for session_index, username, status, body, _ in outcomes:
+        key = (session_ids[session_index], username)
+        submitted.add(key)
+        if status == 200:
+            accepted[key].append(body)
+        elif status >= 500:
+            failed.add(key)
+    return accepted, failed, submitted
+
+
+def _check_statuses(outcomes: list) -> list:
+    """Every answer is accepted, rejected as a duplicate (400) or failed by the server."""
+    return [
+        f"{username}: unexpected status {status}"
+        for _, username, status, _, _ in outcomes
+        if status not in (200, 400) and status < 500
+    ]
+
+
+def _check_attempts(attempts: dict, accepted: dict, failed: set, submitted: set) -> list:
+    """One attempt and exactly one accepted answer per (session, user)."""
+    violations = [
+        f"{key[1]}: {len(stored)} attempts stored in session {key[0]}"
+        for key, stored in attempts.items()
+        if len(stored) > 1
+    ]
+    for key in submitted:
+        bodies = accepted.get(key, [])
+        stored = attempts.get(key, [])
+        if len(bodies) > 1:
+            violations.append(f"{key[1]}: {len(bodies)} answers accepted in session {key[0]}")
+        elif not bodies and key not in failed:
+            violations.append(f"{key[1]}: no answer accepted in session {key[0]}")
+        if bool(bodies) != bool(stored) and key not in failed:
+            violations.append(f"{key[1]}: accepted answers and stored attempts differ in {key[0]}")
+        if bodies and stored and bodies[0]["is_correct"] != stored[0][0]:
+            violations.append(f"{key[1]}: accepted correctness differs from stored attempt in {key[0]}")
+    return violations
+
+
+def _check_scores(scores: dict, attempts: dict, outcomes: list, failed_users: set) -> list:
+    """Scores match correct attempts; reported scores count up without gaps."""
+    correct_times = defaultdict(list)
+    for (_, username), stored in attempts.items():
+        correct_times[username].extend(at for is_correct, at in stored if is_correct)
+    reported = defaultdict(list)
+    for _, username, status, body, _ in outcomes:
+        if status == 200 and body["is_correct"]:
+            reported[username].append(body["score"])
+
+    violations = []
+    for username, row in scores.items():
+        times = sorted(correct_times.get(username, []))
+        if row.cumulative_score != len(times):
+            violations.append(
+                f"{username}: cumulative_score {row.cumulative_score} != {len(times)} correct attempts"
+            )
+        if sorted(reported.get(username, [])) != list(range(1, len(times) + 1)) and username not in failed_users:
+            violations.append(f"{username}: reported scores {sorted(reported.get(username, []))}")
+        violations.extend(_check_first_correct(row, times))
+    return violations
+
+
+def _check_first_correct(row, times: list) -> list:
+    """first_correct_timestamp is set with the first point, within the first correct answer."""
+    first = row.first_correct_timestamp
+    if (first is None) != (row.cumulative_score == 0):
+        return [f"{row.username}: first_correct_timestamp {first} with score {row.cumulative_score}"]
+    if first is not None and times and (first < times[0] or (len(times) > 1 and first > times[1])):
+        return [f"{row.username}: first_correct_timestamp {first} outside first correct answer"]
+    return []
+
+
+def _expected_ranks(scores: dict) -> tuple[list, dict]:
+    """Rank scoring users by (score desc, first_correct_timestamp asc), ties sharing a rank."""
+    ranked = sorted(
+        (row for row in scores.values() if row.cumulative_score > 0),
+        key=lambda row: (-row.cumulative_score, row.first_correct_timestamp),
+    )
+    expected_rank = {}
+    for row in ranked:
+        ahead = sum(
+            1
+            for other in ranked
+            if (other.cumulative_score, -other.first_correct_timestamp.timestamp())
+            > (row.cumulative_score, -row.first_correct_timestamp.timestamp())
+        )
+        expected_rank[row.username] = ahead + 1
+    return ranked, expected_rank
+
+
+def _check_leaderboard(db, ranked: list, expected_rank: dict) -> list:
+    """Rankings follow (score desc, first_correct_timestamp asc)."""
+    from trivia_api.services.leaderboard_service import LeaderboardService
+
+    violations = []
+    leaderboard = LeaderboardService.get_leaderboard(db, limit=len(ranked) + 1)
+    if [entry.username for entry in leaderboard] != [row.username for row in ranked] and (
+        [(entry.score, expected_rank[entry.username]) for entry in leaderboard]
+        != [(row.cumulative_score, expected_rank[row.username]) for row in ranked]
+    ):
+        violations.append("leaderboard order differs from (score desc, first_correct_timestamp asc)")
+    for index, entry in enumerate(leaderboard):
+        if entry.rank != index + 1:
+            violations.append(f"leaderboard position {index + 1} has rank {entry.rank}")
+            break
+    return violations
+
+
+def _check_batch_ranks(client, usernames: list, expected_rank: dict) -> list:
+    """The batch rank endpoint agrees with the expected ranks."""
+    violations = []
+    for start in range(0, len(usernames), 500):
+        response = client.post(
+            "/api/trivia/leaderboard/ranks", json={"usernames": usernames[start:start + 500]}
+        )
+        for entry in response.json()["ranks"]:
+            if entry["rank"] != expected_rank.get(entry["username"]):
+                violations.append(
+                    f"{entry['username']}: batch rank {entry['rank']} != expected "
+                    f"{expected_rank.get(entry['username'])}"
+                )
+    return violations
@@ -0,0 +1,138 @@
+"""Admission control: bounded concurrency with a prioritized, deadline-aware queue."""
+import asyncio
+import heapq
+import itertools
+from typing import Optional
+
+from trivia_api.errors import ServiceOverloadedError
+from trivia_api.utils.metrics import registry
+
+# Lower values are admitted first
+PRIORITY_ADMIN = 0
+PRIORITY_NORMAL = 1
+
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "trivia_admission_in_flight", "Requests currently admitted past admission control"
+)
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    "trivia_admission_queue_depth", "Requests waiting for admission"
+)
+ADMISSION_SHED = registry.counter(
+    "trivia_admission_shed_total",
+    "Requests rejected with 503 by admission control",
+    ("reason",),
+)
+ADMISSION_WAIT = registry.histogram(
+    "trivia_admission_wait_seconds", "Time requests spent waiting for admission"
+)
+
+
+class AdmissionController:
+    """
+    Caps concurrent requests and queues the rest by priority.
+
+    Waiting requests are granted slots in priority order, then FIFO. The
+    average service time is tracked as an exponentially weighted moving
+    average, so a new arrival that could not be admitted within the queue
+    timeout is rejected immediately instead of waiting to fail. Requests
+    still queued when their timeout expires are rejected too.
+
+    Runs on a single event loop; no locking is needed.
+    """
+
+    _EWMA_WEIGHT = 0.1
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.service_time = 0.01
+        self.in_flight = 0
+        self.queued = [0, 0]  # waiting requests per priority
+        self._waiters: list = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+
+    def estimated_wait(self, priority: int) -> float:
+        """
+        Estimate how long a new request of this priority would wait.
+
+        Args:
+            priority: Request priority
+
+        Returns:
+            Estimated seconds until a slot frees up for it
+        """
+        ahead = sum(self.queued[: priority + 1])
+        return (ahead // self.max_in_flight + 1) * self.service_time
+
+    async def acquire(self, priority: int) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            priority: PRIORITY_ADMIN or PRIORITY_NORMAL
+
+        Raises:
+            ServiceOverloadedError: If the queue is full, the estimated wait
+                exceeds the queue timeout, or the timeout passes while queued
+        """
+        if self.in_flight < self.max_in_flight and not any(self.queued):
+            self._admit()
+            return
+
+        # Admin requests are never turned away by queue length, only by time
+        if priority != PRIORITY_ADMIN and sum(self.queued) >= self.max_queue:
+            self._shed("queue_full")
+        estimate = self.estimated_wait(priority)
+        if estimate > self.queue_timeout:
+            self._shed("deadline", estimate)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._set_queued(priority, 1)
+        started = loop.time()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._set_queued(priority, -1)
+            self._shed("timeout")
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot granted just before cancellation
+            self._set_queued(priority, -1)
+            if future.done() and not future.cancelled():
+                self.release(None)
+            raise
+        self._set_queued(priority, -1)
+        ADMISSION_WAIT.observe(value=loop.time() - started)
+
+    def release(self, service_time: Optional[float]) -> None:
+        """
+        Free a slot, handing it straight to the next waiter if there is one.
+
+        Args:
+            service_time: How long the request held its slot, for the moving
+                average (None if it did no work)
+        """
+        if service_time is not None:
+            self.service_time += self._EWMA_WEIGHT * (service_time - self.service_time)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            # Skip waiters that already timed out or disconnected
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(value=self.in_flight)
+
+    def _admit(self) -> None:
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(value=self.in_flight)
+
+    def _set_queued(self, priority: int, delta: int) -> None:
+        self.queued[priority] += delta
+        ADMISSION_QUEUE_DEPTH.set(value=sum(self.queued))
+
+    def _shed(self, reason: str, retry_after: Optional[float] = None) -> None:
+        ADMISSION_SHED.inc(reason)
+        raise ServiceOverloadedError(retry_after if retry_after is not None else self.queue_timeout)
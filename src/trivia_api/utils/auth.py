@@ -1,20 +1,132 @@
 """Admin API key authentication utilities."""
-from fastapi import Header
+import hashlib
+import hmac
+from functools import lru_cache
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Security
+from fastapi.security import APIKeyHeader
 
 from trivia_api.config import get_settings
-from trivia_api.errors import InvalidAPIKeyError
+from trivia_api.errors import InvalidAPIKeyError, TriviaAPIException
+
+# Scope granting access to every admin operation
+ALL_SCOPES = "*"
+
+# Enables the "Authorize" button in Swagger UI; missing keys are rejected by us
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Hash an API key for the ADMIN_API_KEY_HASHES setting.
+
+    Args:
+        api_key: Plaintext API key
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()
 
 
-def verify_admin_api_key(x_api_key: str = Header(None)) -> None:
+class AdminKeyring:
+    """
+    Hashed admin API keys and the scopes each one grants.
+
+    Keys are compared by SHA-256 digest with ``hmac.compare_digest`` against
+    every configured key, so timing does not reveal which key (if any) was
+    close. Stored digests are decoded once at startup, so a lookup is one
+    SHA-256 and a constant-time comparison per configured key.
+    """
+
+    def __init__(self, entries: dict[bytes, frozenset[str]]):
+        self._entries = list(entries.items())
+
+    @classmethod
+    def from_settings(cls, plaintext_key: str, hashed_keys: str) -> "AdminKeyring":
+        """
+        Build a keyring from configuration.
+
+        Args:
+            plaintext_key: Legacy ADMIN_API_KEY value, granted all scopes (empty to disable)
+            hashed_keys: Comma-separated ``<sha256-hex>[:scope+scope]`` entries;
+                entries without scopes are granted all scopes
+
+        Returns:
+            AdminKeyring instance
+        """
+        entries: dict[bytes, frozenset[str]] = {}
+        if plaintext_key:
+            entries[hashlib.sha256(plaintext_key.encode()).digest()] = frozenset({ALL_SCOPES})
+        for item in filter(None, (part.strip() for part in hashed_keys.split(","))):
+            digest, _, scopes = item.partition(":")
+            scope_set = frozenset(filter(None, scopes.split("+"))) or frozenset({ALL_SCOPES})
+            entries[bytes.fromhex(digest.strip())] = scope_set
+        return cls(entries)
+
+    def scopes_for(self, api_key: Optional[str]) -> Optional[frozenset[str]]:
+        """
+        Look up the scopes granted to an API key.
+
+        Args:
+            api_key: Presented API key
+
+        Returns:
+            Granted scopes, or None if the key is missing or unknown
+        """
+        if not api_key:
+            return None
+
+        digest = hashlib.sha256(api_key.encode()).digest()
+        scopes = None
+        for stored_digest, stored_scopes in self._entries:
+            # Compare against every key so timing doesn't depend on which one matches
+            if hmac.compare_digest(digest, stored_digest):
+                scopes = stored_scopes
+        return scopes
+
+
+@lru_cache()
+def get_admin_keyring() -> AdminKeyring:
+    """Get the admin keyring built from settings (loaded once per process)."""
+    settings = get_settings()
+    return AdminKeyring.from_settings(settings.ADMIN_API_KEY, settings.ADMIN_API_KEY_HASHES)
+
+
+def verify_admin_api_key(x_api_key: Optional[str], scope: Optional[str] = None) -> None:
     """
     Verify admin API key from request header.
 
     Args:
         x_api_key: API key from X-API-Key header
+        scope: Scope the operation requires (any valid key if None)
 
     Raises:
-        InvalidAPIKeyError: If API key is missing or invalid
+        InvalidAPIKeyError: If API key is missing, invalid or lacks the scope
     """
-    settings = get_settings()
-    if not x_api_key or x_api_key != settings.ADMIN_API_KEY:
+    scopes = get_admin_keyring().scopes_for(x_api_key)
+    if scopes is None:
+        raise InvalidAPIKeyError()
+    if scope is not None and scope not in scopes and ALL_SCOPES not in scopes:
         raise InvalidAPIKeyError()
+
+
+def require_admin_scope(scope: str) -> Callable:
+    """
+    Build a FastAPI dependency that requires an admin key with the given scope.
+
+    Args:
+        scope: Required scope, e.g. "start", "end" or "import"
+
+    Returns:
+        Dependency to use with ``Depends``
+    """
+
+    async def dependency(x_api_key: Optional[str] = Security(api_key_header)) -> None:
+        try:
+            verify_admin_api_key(x_api_key, scope)
+        except TriviaAPIException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message) from e
+
+    return dependency
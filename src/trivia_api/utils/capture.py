@@ -0,0 +1,164 @@
+"""Request capture log for offline replay (``trivia-api replay``)."""
+import base64
+import glob
+import gzip
+import json
+import logging
+import os
+import random
+import time
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Request headers kept in the log; admin keys are never written
+CAPTURED_HEADERS = ("content-type", "idempotency-key", "x-forwarded-for")
+
+# Session routes are always captured so replay can map session ids
+ALWAYS_CAPTURED_PREFIX = "/api/trivia/session/"
+
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class RequestRecorder:
+    """
+    Appends captured requests to a newline-delimited JSON file.
+
+    Each worker process writes its own ``capture-<pid>-<time>.ndjson`` in
+    ``directory``; the file is opened on the first write, so workers forked
+    after the application was imported do not share one. Lines are buffered
+    and handed to the OS at most every ``FLUSH_INTERVAL_SECONDS`` and on close.
+
+    A line holds the request start time (``ts``, epoch seconds), method, path,
+    query string, matched route, status, duration in seconds, whether an admin
+    key was sent, selected headers and the request body (``body``, or
+    ``body_b64`` when not UTF-8; omitted with ``truncated`` beyond
+    ``max_body_bytes``). Session starts also record the new ``session_id``.
+    """
+
+    def __init__(self, directory: str, sample_rate: float = 1.0, max_body_bytes: int = 65536):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self._file = None
+        self._flushed_at = 0.0
+        self._closed = False
+
+    def should_capture(self, path: str) -> bool:
+        """Decide whether to capture a request to ``path`` (API routes, sampled)."""
+        if self._closed or not path.startswith("/api/"):
+            return False
+        if path.startswith(ALWAYS_CAPTURED_PREFIX):
+            return True
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, entry: dict) -> None:
+        """
+        Append one captured request.
+
+        Args:
+            entry: JSON-serializable request record
+        """
+        if self._closed:
+            return
+        try:
+            if self._file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                name = f"capture-{os.getpid()}-{int(time.time())}.ndjson"
+                self._file = open(os.path.join(self.directory, name), "a", encoding="utf-8")
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            now = time.monotonic()
+            if now - self._flushed_at >= FLUSH_INTERVAL_SECONDS:
+                self._file.flush()
+                self._flushed_at = now
+        except OSError:
+            logger.exception("Request capture failed; capture disabled")
+            self.close()
+
+    def close(self) -> None:
+        """Flush and close the capture file; later requests are not captured."""
+        self._closed = True
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                logger.exception("Closing request capture file failed")
+            self._file = None
+
+
+def encode_body(body: bytes, max_body_bytes: int) -> dict:
+    """
+    Encode a request body for a capture record.
+
+    Args:
+        body: Raw request body
+        max_body_bytes: Largest body kept
+
+    Returns:
+        Fields to merge into the record
+    """
+    if not body:
+        return {}
+    if len(body) > max_body_bytes:
+        return {"truncated": True}
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+def decode_body(entry: dict) -> bytes:
+    """Get the raw request body of a capture record."""
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+def read_captures(paths: Iterable[str]) -> list[dict]:
+    """
+    Read capture files (or directories of them) into one list ordered by start time.
+
+    Args:
+        paths: Capture files (``.ndjson`` or ``.ndjson.gz``) or directories
+
+    Returns:
+        Capture records sorted by ``ts``
+
+    Raises:
+        ValueError: If no capture file was found or a line is not valid JSON
+    """
+    files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.ndjson*"))))
+        else:
+            files.append(path)
+    if not files:
+        raise ValueError("no capture files found")
+
+    entries = []
+    for name in files:
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(name, "rt", encoding="utf-8") as fh:
+            for number, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A worker killed mid-write leaves a partial last line
+                    if fh.readline() == "":
+                        logger.warning("Ignoring partial last line of %s", name)
+                        break
+                    raise ValueError(f"{name}:{number}: invalid capture line") from None
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
+
+
+def session_id_from(body: bytes) -> Optional[str]:
+    """Extract ``session_id`` from a JSON response body, if present."""
+    try:
+        value = json.loads(body).get("session_id")
+    except (ValueError, AttributeError):
+        return None
+    return value if isinstance(value, str) else None
@@ -0,0 +1,195 @@
+"""Per-route time budgets enforced on SQL statements."""
+import sqlite3
+import time
+from contextlib import closing
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+from starlette.requests import Request
+
+from trivia_api.errors import DeadlineExceededError
+from trivia_api.middleware.metrics import route_label
+from trivia_api.utils.metrics import registry
+
+# Time budget in milliseconds for each endpoint ("METHOD /route/template");
+# 0 means unbounded. Writes get room for lock waits, and ending a session
+# ranks every user.
+DEFAULT_TIME_BUDGETS_MS: Dict[str, float] = {
+    "GET /api/trivia/question": 500,
+    "GET /api/trivia/leaderboard": 1000,
+    "GET /api/trivia/attempts": 2000,
+    "POST /api/trivia/answer": 1000,
+    "POST /api/trivia/answers": 2000,
+    "POST /api/trivia/session/start": 2000,
+    "POST /api/trivia/session/end": 10000,
+    "GET /api/trivia/analytics": 2000,
+    "GET /api/trivia/leaderboard/movement": 1000,
+    "POST /api/trivia/leaderboard/ranks": 1000,
+    "GET /api/trivia/leaderboard/teams": 1000,
+    "POST /api/trivia/teams/import": 30000,
+}
+
+# SQLite virtual machine instructions between deadline checks
+SQLITE_PROGRESS_OPS = 1000
+
+# SQLSTATE of a PostgreSQL statement cancelled by statement_timeout
+_QUERY_CANCELED = "57014"
+
+DEADLINE_EXCEEDED = registry.counter(
+    "trivia_deadline_exceeded_total",
+    "Requests failed with 504 at their time budget, by whether SQL was cancelled mid-statement",
+    ("method", "route", "stage"),
+)
+
+
+class TimeBudget:
+    """Resolves the time budget for an endpoint."""
+
+    def __init__(self, default_ms: float, overrides_ms: Optional[Dict[str, float]] = None):
+        self.default = default_ms / 1000
+        self.budgets = {
+            endpoint: limit / 1000 for endpoint, limit in {**DEFAULT_TIME_BUDGETS_MS, **(overrides_ms or {})}.items()
+        }
+
+    def limit_for(self, endpoint: str) -> float:
+        """Return the budget in seconds for ``METHOD /route`` (0 = unbounded)."""
+        return self.budgets.get(endpoint, self.default)
+
+
+class Deadline:
+    """
+    When the current request has to be finished.
+
+    The clock starts when the request arrives; the budget is known once the
+    request has been routed and is bound by ``bind_deadline``.
+    """
+
+    __slots__ = ("budget", "started", "method", "route", "seconds", "expires_at")
+
+    def __init__(self, budget: TimeBudget):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.method = self.route = ""
+        self.seconds = 0.0
+        self.expires_at: Optional[float] = None
+
+    def bind(self, method: str, route: str) -> None:
+        """Apply the budget of the route the request was matched to."""
+        self.method, self.route = method, route
+        self.seconds = self.budget.limit_for(f"{method} {route}")
+        self.expires_at = self.started + self.seconds if self.seconds > 0 else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (negative once expired), or None if unbounded."""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        """True once a bound deadline has passed."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def exceeded(self, stage: str) -> DeadlineExceededError:
+        """Count and build the error for a request that ran out of time."""
+        DEADLINE_EXCEEDED.inc(self.method, self.route, stage)
+        return DeadlineExceededError(self.seconds)
+
+
+# Set by the deadline middleware for the duration of a request
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def bind_deadline(request: Request) -> None:
+    """
+    Start enforcing the current request's time budget on its SQL.
+
+    Called by the database session dependencies, so requests that never touch
+    the database (or stream exports through their own sessions) are unbounded.
+
+    Args:
+        request: Routed request
+    """
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.bind(request.method, route_label(request.scope))
+
+
+def _sqlite_progress() -> int:
+    # Runs in the thread executing the statement, which carries the request context
+    deadline = current_deadline.get()
+    return deadline is not None and deadline.expired()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    deadline = current_deadline.get()
+    if deadline is None:
+        return
+    remaining = deadline.remaining()
+    if remaining is None:
+        return
+    if remaining <= 0:
+        raise deadline.exceeded("before_statement")
+
+    dbapi_connection = conn.connection.dbapi_connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        if not conn.info.get("progress_handler"):
+            dbapi_connection.set_progress_handler(_sqlite_progress, SQLITE_PROGRESS_OPS)
+            conn.info["progress_handler"] = True
+    elif conn.dialect.name == "postgresql" and conn.info.get("statement_timeout_for") is not deadline:
+        # Once per transaction: SET LOCAL ends with it
+        with closing(dbapi_connection.cursor()) as timeout_cursor:
+            timeout_cursor.execute(f"SET LOCAL statement_timeout = {max(1, int(remaining * 1000))}")
+        conn.info["statement_timeout_for"] = deadline
+
+
+def _is_cancellation(error: BaseException) -> bool:
+    if isinstance(error, sqlite3.OperationalError):
+        return str(error) == "interrupted"
+    return _QUERY_CANCELED in (getattr(error, "pgcode", None), getattr(error, "sqlstate", None))
+
+
+def _handle_error(exception_context):
+    deadline = current_deadline.get()
+    if deadline is None or deadline.expires_at is None:
+        return None
+    if _is_cancellation(exception_context.original_exception):
+        return deadline.exceeded("statement")
+    return None
+
+
+def _end_transaction(conn):
+    conn.info.pop("statement_timeout_for", None)
+
+
+def _checkin(dbapi_connection, connection_record):
+    if connection_record is not None:
+        connection_record.info.pop("statement_timeout_for", None)
+
+
+_installed = False
+
+
+def install_deadline_enforcement() -> None:
+    """
+    Enforce request deadlines on every SQLAlchemy engine (idempotent).
+
+    A statement issued after the deadline fails before it reaches the
+    database. A running statement is cancelled at the deadline: SQLite checks
+    it from a progress handler every ``SQLITE_PROGRESS_OPS`` instructions, and
+    PostgreSQL gets a ``statement_timeout`` for the time left when the
+    transaction issued its first statement. Either way the request fails with
+    DeadlineExceededError (504) and its transaction is rolled back.
+    """
+    global _installed
+    if _installed:
+        return
+    # First, so a refused statement is never seen by the timing listeners
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute, insert=True)
+    event.listen(Engine, "handle_error", _handle_error)
+    event.listen(Engine, "commit", _end_transaction)
+    event.listen(Engine, "rollback", _end_transaction)
+    event.listen(Pool, "checkin", _checkin)
+    _installed = True
@@ -0,0 +1,248 @@
+"""Idempotency-Key support for answer submission retries."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from trivia_api.config import get_settings
+from trivia_api.errors import IdempotencyKeyInUseError, IdempotencyKeyMismatchError
+from trivia_api.utils.metrics import record_cache_access
+
+# (request fingerprint, stored response or None while the first request is in flight)
+Entry = Tuple[str, Optional[dict]]
+
+
+class MemoryIdempotencyStore:
+    """
+    Per-process idempotency records with bounded memory.
+
+    Records are kept in insertion order, so expired ones are dropped from the
+    front and the store never holds more than ``max_keys`` records.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._records: OrderedDict[str, list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, fingerprint: str, expires: float, now: float) -> Optional[Entry]:
+        """
+        Return the live record for ``key``, or insert a pending one.
+
+        Args:
+            key: Record key
+            fingerprint: Fingerprint of the request claiming the key
+            expires: Expiry time for a new pending record
+            now: Current time in seconds
+
+        Returns:
+            The existing (fingerprint, response) entry, or None if the caller
+            now owns the key and should process the request
+        """
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None and record[0] > now:
+                return record[1], record[2]
+            self._records.pop(key, None)
+            self._records[key] = [expires, fingerprint, None]
+            self._evict(now)
+            return None
+
+    def complete(self, key: str, fingerprint: str, response: dict, expires: float) -> None:
+        """Store the response for a claimed key until ``expires``."""
+        with self._lock:
+            self._records.pop(key, None)
+            self._records[key] = [expires, fingerprint, response]
+
+    def release(self, key: str) -> None:
+        """Drop a pending record so the request can be retried from scratch."""
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None and record[2] is None:
+                del self._records[key]
+
+    def _evict(self, now: float) -> None:
+        while len(self._records) > self.max_keys:
+            self._records.popitem(last=False)
+        while self._records:
+            oldest = next(iter(self._records.values()))
+            if oldest[0] > now:
+                break
+            self._records.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class SQLiteIdempotencyStore:
+    """
+    Idempotency records shared by all workers on one host through a SQLite file.
+
+    Claims run in a ``BEGIN IMMEDIATE`` transaction, so two workers receiving
+    the same retry concurrently cannot both process it.
+    """
+
+    _SWEEP_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_records (key TEXT PRIMARY KEY, "
+                "fingerprint TEXT NOT NULL, response TEXT, expires REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def claim(self, key: str, fingerprint: str, expires: float, now: float) -> Optional[Entry]:
+        """Return the live record for ``key`` or insert a pending one (see MemoryIdempotencyStore)."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT fingerprint, response FROM idempotency_records "
+                "WHERE key = ? AND expires > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO idempotency_records (key, fingerprint, response, expires) "
+                    "VALUES (?, ?, NULL, ?)",
+                    (key, fingerprint, expires),
+                )
+                self._calls += 1
+                if self._calls % self._SWEEP_EVERY == 0:
+                    conn.execute("DELETE FROM idempotency_records WHERE expires <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]) if row[1] is not None else None
+
+    def complete(self, key: str, fingerprint: str, response: dict, expires: float) -> None:
+        """Store the response for a claimed key until ``expires``."""
+        self._connection().execute(
+            "UPDATE idempotency_records SET response = ?, expires = ? WHERE key = ? AND fingerprint = ?",
+            (json.dumps(response), expires, key, fingerprint),
+        )
+
+    def release(self, key: str) -> None:
+        """Drop a pending record so the request can be retried from scratch."""
+        self._connection().execute(
+            "DELETE FROM idempotency_records WHERE key = ? AND response IS NULL", (key,)
+        )
+
+
+class AnswerIdempotency:
+    """
+    Replays the original answer result for retried requests.
+
+    Keys are scoped to the username, and the submitted answer is fingerprinted
+    so a key cannot be reused for a different request.
+    """
+
+    def __init__(self, store, ttl: float, pending_ttl: float):
+        self.store = store
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+
+    @staticmethod
+    def _key(idempotency_key: str, username: str) -> str:
+        return f"{username}\x00{idempotency_key}"
+
+    @staticmethod
+    def _fingerprint(username: str, answer: str) -> str:
+        return hashlib.sha256(f"{username}\x00{answer}".encode()).hexdigest()
+
+    def begin(self, idempotency_key: str, username: str, answer: str) -> Optional[dict]:
+        """
+        Claim a key before processing, or get the result stored for it.
+
+        Args:
+            idempotency_key: Client-supplied Idempotency-Key header
+            username: Submitting username
+            answer: Submitted answer
+
+        Returns:
+            The stored result of the original request, or None if this request
+            should be processed (and then passed to ``complete`` or ``release``)
+
+        Raises:
+            IdempotencyKeyInUseError: If the original request is still in flight
+            IdempotencyKeyMismatchError: If the key was used for a different answer
+        """
+        now = time.time()
+        fingerprint = self._fingerprint(username, answer)
+        entry = self.store.claim(
+            self._key(idempotency_key, username), fingerprint, now + self.pending_ttl, now
+        )
+        record_cache_access("idempotency", entry is not None)
+        if entry is None:
+            return None
+
+        stored_fingerprint, response = entry
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyMismatchError()
+        if response is None:
+            raise IdempotencyKeyInUseError()
+        return response
+
+    def complete(self, idempotency_key: str, username: str, answer: str, result: dict) -> None:
+        """
+        Store the result of a processed request for replay.
+
+        Args:
+            idempotency_key: Client-supplied Idempotency-Key header
+            username: Submitting username
+            answer: Submitted answer
+            result: Result returned by ``AnswerService.submit_answer``
+        """
+        self.store.complete(
+            self._key(idempotency_key, username),
+            self._fingerprint(username, answer),
+            result,
+            time.time() + self.ttl,
+        )
+
+    def release(self, idempotency_key: str, username: str) -> None:
+        """
+        Forget a claimed key after the request failed.
+
+        Args:
+            idempotency_key: Client-supplied Idempotency-Key header
+            username: Submitting username
+        """
+        self.store.release(self._key(idempotency_key, username))
+
+
+@lru_cache()
+def get_answer_idempotency() -> Optional[AnswerIdempotency]:
+    """Get the configured idempotency cache (cached), or None if disabled."""
+    settings = get_settings()
+    if not settings.IDEMPOTENCY_ENABLED:
+        return None
+
+    if settings.IDEMPOTENCY_BACKEND == "sqlite":
+        store = SQLiteIdempotencyStore(settings.IDEMPOTENCY_SQLITE_PATH)
+    else:
+        store = MemoryIdempotencyStore(settings.IDEMPOTENCY_MAX_KEYS)
+
+    return AnswerIdempotency(
+        store,
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        pending_ttl=settings.IDEMPOTENCY_PENDING_SECONDS,
+    )
@@ -0,0 +1,289 @@
+"""In-process metrics registry with Prometheus text exposition."""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Default latency buckets in seconds (Prometheus client defaults, trimmed for an API)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value per the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a Prometheus label set such as {route="/x",method="GET"}."""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """Base class holding labelled series for one metric name."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def render(self) -> list[str]:
+        """Render this metric in Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            series = list(self._series.items())
+        for labels, value in series:
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+    def _render_series(self, labels: Tuple[str, ...], value) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increment the series identified by the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Return the current value of a series (0 if never incremented)."""
+        return self._series.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, *labels: str, value: float) -> None:
+        """Set the series identified by the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Add to the series identified by the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        """Subtract from the series identified by the given label values."""
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        """Return the current value of a series (0 if never set)."""
+        return self._series.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels: str, value: float) -> None:
+        """Record one observation for the series identified by the given label values."""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts..., +Inf count], sum
+                series = [[0] * (len(self.buckets) + 1), 0.0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+
+    def sum(self, *labels: str) -> float:
+        """Return the sum of observations for the given label values."""
+        series = self._series.get(self._key(labels))
+        return series[1] if series is not None else 0.0
+
+    def _render_series(self, labels: Tuple[str, ...], value) -> list[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        cumulative += counts[-1]
+        le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+        lines.append(f"{self.name}_bucket{le} {cumulative}")
+        plain = _format_labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{plain} {total}")
+        lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics exported together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every registered metric in Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by the /metrics endpoint
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "trivia_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "trivia_db_queries_per_request",
+    "Number of SQL statements executed per HTTP request",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55),
+)
+DB_TIME_PER_REQUEST = registry.histogram(
+    "trivia_db_time_per_request_seconds",
+    "Time spent executing SQL statements per HTTP request",
+    ("method", "route"),
+)
+DB_QUERIES_TOTAL = registry.counter(
+    "trivia_db_queries_total",
+    "SQL statements executed (including those outside a request)",
+)
+CACHE_ACCESSES = registry.counter(
+    "trivia_cache_accesses_total",
+    "Cache lookups by cache name and result",
+    ("cache", "result"),
+)
+
+
+class RequestStats:
+    """Mutable per-request counters shared with engine event listeners."""
+
+    __slots__ = ("query_count", "query_time", "statements")
+
+    def __init__(self, record_statements: bool = False):
+        self.query_count = 0
+        self.query_time = 0.0
+        # (database URL, statement) pairs, in execution order
+        self.statements: Optional[list[tuple[str, str]]] = [] if record_statements else None
+
+
+# Set by the metrics middleware for the duration of a request
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """
+    Count a cache lookup so hit ratios show up on /metrics.
+
+    Args:
+        cache: Cache name used as the metric label
+        hit: Whether the lookup was served from the cache
+    """
+    CACHE_ACCESSES.inc(cache, "hit" if hit else "miss")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    DB_QUERIES_TOTAL.inc()
+    stats = current_request_stats.get()
+    if stats is None:
+        return
+    stats.query_count += 1
+    stats.query_time += time.perf_counter() - started
+    if stats.statements is not None:
+        stats.statements.append((str(conn.engine.url), statement))
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+_listeners_installed = False
+
+
+def install_query_listeners() -> None:
+    """Attach query timing listeners to every SQLAlchemy engine (idempotent)."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _listeners_installed = True
@@ -0,0 +1,115 @@
+"""Sampling profiler that dumps flamegraph-ready stacks for slow requests."""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Trace:
+    """Stack samples collected for one in-flight request."""
+
+    __slots__ = ("thread_id", "samples")
+
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+
+
+class SlowRequestProfiler:
+    """
+    Periodically samples the stacks of threads serving requests.
+
+    A daemon thread wakes every ``interval`` seconds while at least one request
+    is being traced and records the folded stack of each traced thread. When a
+    request finishes slower than ``threshold`` seconds its samples are written
+    in the collapsed format understood by flamegraph.pl and speedscope.
+
+    Requests served concurrently on the same event loop thread share samples,
+    so a dump shows everything the thread did while the slow request was open.
+    """
+
+    def __init__(self, threshold: float, interval: float, output_dir: str):
+        self.threshold = threshold
+        self.interval = interval
+        self.output_dir = output_dir
+        self._traces: dict[int, _Trace] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start_trace(self) -> _Trace:
+        """Begin sampling the calling thread; returns a handle for ``finish_trace``."""
+        trace = _Trace(threading.get_ident())
+        with self._lock:
+            self._traces[id(trace)] = trace
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="slow-request-profiler", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+        return trace
+
+    def finish_trace(self, trace: _Trace, duration: float, label: str) -> Optional[str]:
+        """
+        Stop sampling and dump the stacks if the request was slow.
+
+        Args:
+            trace: Handle returned by ``start_trace``
+            duration: Request duration in seconds
+            label: Short description used in the output file name
+
+        Returns:
+            Path of the written file, or None if the request was fast enough
+        """
+        with self._lock:
+            self._traces.pop(id(trace), None)
+        if duration < self.threshold or not trace.samples:
+            return None
+
+        duration_ms = int(duration * 1000)
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")
+        path = os.path.join(
+            self.output_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{duration_ms}ms-{safe_label}.folded"
+        )
+        with open(path, "w") as fh:
+            for stack, count in trace.samples.most_common():
+                fh.write(f"{stack} {count}\n")
+        logger.warning("Slow request %s took %dms; stacks written to %s", label, duration_ms, path)
+        return path
+
+    def _run(self) -> None:
+        while True:
+            # Clear before looking, so a trace started after the check still
+            # leaves the event set and the wait below returns at once
+            self._wakeup.clear()
+            with self._lock:
+                traces = list(self._traces.values())
+            if not traces:
+                self._wakeup.wait()
+                continue
+
+            frames = sys._current_frames()
+            for trace in traces:
+                frame = frames.get(trace.thread_id)
+                if frame is not None:
+                    trace.samples[_fold(frame)] += 1
+            time.sleep(self.interval)
+
+
+def _fold(frame) -> str:
+    """Render a frame chain root-first as ``function (file);function (file)``."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
@@ -0,0 +1,115 @@
+"""Per-endpoint SQL query budgets and duplicate-statement detection."""
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from trivia_api.utils.metrics import RequestStats, current_request_stats, install_query_listeners
+
+# Maximum statements per request for each endpoint ("METHOD /route/template").
+# These match the current service implementations; raise a budget only together
+# with the change that needs the extra query.
+DEFAULT_QUERY_BUDGETS: Dict[str, int] = {
+    "GET /api/trivia/question": 1,
+    "GET /api/trivia/leaderboard": 1,
+    "GET /api/trivia/attempts": 1,
+    "POST /api/trivia/answer": 6,
+    "POST /api/trivia/answers": 6,
+    "POST /api/trivia/session/start": 2,
+    "POST /api/trivia/session/end": 8,
+    "GET /api/trivia/analytics": 2,
+    "GET /api/trivia/leaderboard/movement": 4,  # a lagging replica falls back to the primary
+    "POST /api/trivia/leaderboard/ranks": 3,
+    "GET /api/trivia/leaderboard/teams": 1,
+}
+
+
+def parse_budget_overrides(value: str, cast: Callable = int) -> Dict[str, float]:
+    """
+    Parse budget overrides such as ``"POST /api/trivia/answer=6,GET /metrics=0"``.
+
+    Args:
+        value: Comma-separated ``METHOD /route=limit`` pairs
+        cast: Type of the limits (``float`` for time budgets)
+
+    Returns:
+        Mapping of endpoint key to limit
+    """
+    budgets = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        endpoint, _, limit = item.rpartition("=")
+        budgets[endpoint.strip()] = cast(limit)
+    return budgets
+
+
+def duplicated_statements(statements: list[tuple[str, str]]) -> Dict[str, int]:
+    """
+    Find statements executed more than once, the usual signature of an N+1 pattern.
+
+    The same statement sent to different databases (shards, or a replica and
+    the primary) is not a repeat.
+
+    Args:
+        statements: (database URL, SQL statement) pairs in execution order
+
+    Returns:
+        Mapping of statement text to its highest execution count on one
+        database, for counts above one
+    """
+    duplicates: Dict[str, int] = {}
+    for (_, sql), count in Counter(statements).items():
+        if count > 1:
+            duplicates[sql] = max(count, duplicates.get(sql, 0))
+    return duplicates
+
+
+class QueryBudget:
+    """Resolves the query budget for an endpoint and describes violations."""
+
+    def __init__(self, default: int, overrides: Optional[Dict[str, int]] = None):
+        self.default = default
+        self.budgets = {**DEFAULT_QUERY_BUDGETS, **(overrides or {})}
+
+    def limit_for(self, endpoint: str) -> int:
+        """Return the query limit for ``METHOD /route`` (the default if unlisted)."""
+        return self.budgets.get(endpoint, self.default)
+
+    def report(self, endpoint: str, stats: RequestStats) -> Optional[str]:
+        """
+        Describe how a request used its budget.
+
+        Args:
+            endpoint: ``METHOD /route`` key
+            stats: Statistics collected while serving the request
+
+        Returns:
+            Human-readable report if the budget was exceeded or statements were
+            repeated, None otherwise
+        """
+        limit = self.limit_for(endpoint)
+        duplicates = duplicated_statements(stats.statements or [])
+        if stats.query_count <= limit and not duplicates:
+            return None
+
+        lines = [f"{endpoint} executed {stats.query_count} queries (budget {limit})"]
+        for sql, count in duplicates.items():
+            lines.append(f"  {count}x {' '.join(sql.split())}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def count_queries() -> Iterator[RequestStats]:
+    """
+    Count statements executed inside the block, for use in tests and scripts.
+
+    Example:
+        with count_queries() as stats:
+            LeaderboardService.get_leaderboard(db)
+        assert stats.query_count == 1
+    """
+    install_query_listeners()
+    stats = RequestStats(record_statements=True)
+    token = current_request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request_stats.reset(token)
@@ -0,0 +1,220 @@
+"""Token-bucket rate limiting for answer submission."""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Request
+
+from trivia_api.config import get_settings
+from trivia_api.errors import RateLimitExceededError
+
+
+class MemoryBucketStore:
+    """
+    Per-process token buckets with bounded memory.
+
+    Buckets are kept in least-recently-used order so idle keys can be evicted
+    from the front in amortized O(1), and the store never holds more than
+    ``max_keys`` buckets.
+    """
+
+    def __init__(self, max_keys: int, idle_seconds: float):
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self._buckets: OrderedDict[str, list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, rate: float, burst: float, now: float) -> float:
+        """
+        Take one token from the bucket for ``key``.
+
+        Args:
+            key: Bucket identifier
+            rate: Refill rate in tokens per second
+            burst: Bucket capacity
+            now: Current monotonic time in seconds
+
+        Returns:
+            0 if the token was granted, otherwise seconds until one is available
+        """
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / rate
+
+            self._buckets[key] = [tokens, now]
+            self._evict(now)
+            return retry_after
+
+    def _evict(self, now: float) -> None:
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if now - oldest[1] < self.idle_seconds:
+                break
+            self._buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets shared by all workers on one host through a SQLite file.
+
+    Each consume runs in a ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers serialize on the file lock and never double-spend a token.
+    """
+
+    _SWEEP_EVERY = 1000
+
+    def __init__(self, path: str, idle_seconds: float):
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self._local = threading.local()
+        self._calls = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key: str, rate: float, burst: float, now: float) -> float:
+        """Take one token from the shared bucket for ``key`` (see MemoryBucketStore)."""
+        # Wall-clock time, since monotonic clocks are not comparable across processes
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / rate
+
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+
+            self._calls += 1
+            if self._calls % self._SWEEP_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated < ?", (now - self.idle_seconds,)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+
+class AnswerRateLimiter:
+    """Applies per-username and per-client-IP token buckets."""
+
+    def __init__(
+        self,
+        store,
+        user_rate: float,
+        user_burst: float,
+        ip_rate: float,
+        ip_burst: float,
+    ):
+        self.store = store
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+
+    def check(self, username: str, client_ip: Optional[str]) -> None:
+        """
+        Consume one token for the client IP and one for the username.
+
+        Args:
+            username: Submitting username
+            client_ip: Client address, or None if unknown
+
+        Raises:
+            RateLimitExceededError: If either bucket is empty
+        """
+        now = time.monotonic()
+        # Check the IP first so floods of random usernames never create user buckets
+        if client_ip and self.ip_rate > 0:
+            retry_after = self.store.consume(f"ip:{client_ip}", self.ip_rate, self.ip_burst, now)
+            if retry_after:
+                raise RateLimitExceededError(retry_after)
+        if self.user_rate > 0:
+            retry_after = self.store.consume(
+                f"user:{username}", self.user_rate, self.user_burst, now
+            )
+            if retry_after:
+                raise RateLimitExceededError(retry_after)
+
+
+def get_client_ip(request: Request) -> Optional[str]:
+    """
+    Get the client address, honouring X-Forwarded-For when configured.
+
+    Each trusted proxy appends the address it received the request from, so
+    the client is the entry RATE_LIMIT_TRUSTED_PROXIES from the right. Entries
+    further left come from the client and could be set to anything.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        Client IP address, or None if unavailable
+    """
+    settings = get_settings()
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            entries = [entry.strip() for entry in forwarded.split(",")]
+            return entries[max(len(entries) - max(settings.RATE_LIMIT_TRUSTED_PROXIES, 1), 0)]
+    return request.client.host if request.client else None
+
+
+@lru_cache()
+def get_answer_rate_limiter() -> Optional[AnswerRateLimiter]:
+    """Get the configured answer rate limiter (cached), or None if disabled."""
+    settings = get_settings()
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        store = SQLiteBucketStore(settings.RATE_LIMIT_SQLITE_PATH, settings.RATE_LIMIT_IDLE_SECONDS)
+    else:
+        store = MemoryBucketStore(settings.RATE_LIMIT_MAX_KEYS, settings.RATE_LIMIT_IDLE_SECONDS)
+
+    return AnswerRateLimiter(
+        store,
+        user_rate=settings.RATE_LIMIT_USER_PER_SECOND,
+        user_burst=settings.RATE_LIMIT_USER_BURST,
+        ip_rate=settings.RATE_LIMIT_IP_PER_SECOND,
+        ip_burst=settings.RATE_LIMIT_IP_BURST,
+    )
@@ -0,0 +1,54 @@
+"""Bounded-memory stream summaries."""
+from typing import Hashable, List, Tuple
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary (Metwally, Agrawal and El Abbadi, 2005).
+
+    Tracks at most ``capacity`` items. When a new item arrives and the summary
+    is full, it replaces the item with the smallest count and inherits that
+    count as its error. Any item occurring more than ``n / capacity`` times in
+    a stream of ``n`` items is guaranteed to be tracked, and reported counts
+    overestimate true counts by at most the recorded error.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._counters: dict = {}  # item -> [count, error]
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        """
+        Count an occurrence of an item.
+
+        Args:
+            item: Item to count
+            count: Number of occurrences
+        """
+        counter = self._counters.get(item)
+        if counter is not None:
+            counter[0] += count
+            return
+        if len(self._counters) < self.capacity:
+            self._counters[item] = [count, 0]
+            return
+        evicted = min(self._counters, key=lambda key: self._counters[key][0])
+        floor = self._counters.pop(evicted)[0]
+        self._counters[item] = [floor + count, floor]
+
+    def top(self, n: int) -> List[Tuple[Hashable, int, int]]:
+        """
+        Get the most frequent items.
+
+        Args:
+            n: Number of items to return
+
+        Returns:
+            ``(item, count, error)`` tuples, highest count first; the true
+            count lies in ``[count - error, count]``
+        """
+        ranked = sorted(self._counters.items(), key=lambda entry: -entry[1][0])
+        return [(item, count, error) for item, (count, error) in ranked[:n]]
+
+    def __len__(self) -> int:
+        return len(self._counters)
@@ -1,5 +1,10 @@
 """ISO 8601 timestamp utilities."""
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Union
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
 
 
 def get_utc_now() -> datetime:
@@ -12,16 +17,69 @@ def get_utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def to_iso8601(dt: datetime) -> str:
+def to_epoch_micros(dt: datetime) -> int:
+    """
+    Convert an aware datetime to integer microseconds since the Unix epoch.
+
+    Args:
+        dt: Timezone-aware datetime
+
+    Returns:
+        Microseconds since 1970-01-01T00:00:00Z
+    """
+    return (dt - _EPOCH) // _ONE_MICROSECOND
+
+
+def from_epoch_micros(micros: int) -> datetime:
+    """
+    Convert integer microseconds since the Unix epoch to an aware UTC datetime.
+
+    Args:
+        micros: Microseconds since 1970-01-01T00:00:00Z
+
+    Returns:
+        Datetime in UTC timezone
+    """
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+@lru_cache(maxsize=4096)
+def _second_prefix(seconds: int) -> str:
+    """Format the whole-second part once per distinct second."""
+    return (_EPOCH + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def format_epoch_micros(micros: int) -> str:
+    """
+    Format epoch microseconds as ISO 8601, identical to ``to_iso8601``.
+
+    Attempts cluster within the same seconds, so the date/time prefix comes
+    from a small cache and only the fractional part is formatted per row.
+
+    Args:
+        micros: Microseconds since 1970-01-01T00:00:00Z
+
+    Returns:
+        ISO 8601 formatted string (e.g., "2025-11-11T14:30:45.123456Z")
+    """
+    seconds, fraction = divmod(micros, 1_000_000)
+    if fraction:
+        return f"{_second_prefix(seconds)}.{fraction:06d}Z"
+    return f"{_second_prefix(seconds)}Z"
+
+
+def to_iso8601(dt: Union[datetime, int]) -> str:
     """
     Convert datetime to ISO 8601 string format.
 
     Args:
-        dt: Datetime object
+        dt: Datetime object, or epoch microseconds as stored on SQLite
 
     Returns:
         ISO 8601 formatted string (e.g., "2025-11-11T14:30:45Z")
     """
+    if isinstance(dt, int):
+        return format_epoch_micros(dt)
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
     return dt.isoformat().replace("+00:00", "Z")